@@ -0,0 +1,69 @@
+"""
+Benchmark of the compact model format against the joblib pickle: artifact size, load time
+and predict latency (one row and a batch), on the Iris forest of model_parameters.json and
+on a larger synthetic forest.
+
+Run from the service folder:
+    python -m benchmarks.bench_compact [--repeat 20]
+"""
+import argparse, json, os, tempfile, time, warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+
+from src.services.compact_model import CompactForest, export_compact_model
+
+
+def best_time(function, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def iris_forest():
+    with open("src/config/model_parameters.json", "r") as file:
+        params = json.load(file)
+    dataset = pd.read_csv("src/data/iris/Iris.csv", index_col=0)
+    X, y = dataset.iloc[:, :4].to_numpy(), dataset.iloc[:, 4].to_numpy()
+    return RandomForestClassifier(**params).fit(X, y), X
+
+
+def synthetic_forest():
+    X, y = make_classification(n_samples=20_000, n_features=20, n_informative=10, n_classes=3, random_state=0)
+    return RandomForestClassifier(n_estimators=100, random_state=0).fit(X, y), X
+
+
+def run(repeat: int):
+    warnings.simplefilter("ignore")
+    print(f"{'model':10} {'format':18} {'KB':>8} {'load ms':>9} {'1 row ms':>9} {'1000 rows ms':>13}")
+    for name, (forest, X) in [("iris", iris_forest()), ("synthetic", synthetic_forest())]:
+        batch = X[:1000] if len(X) >= 1000 else np.resize(X, (1000, X.shape[1]))
+        with tempfile.TemporaryDirectory() as folder:
+            pickle_path = os.path.join(folder, "model.pkl")
+            joblib.dump(forest, pickle_path)
+            paths = {"joblib pickle": pickle_path}
+            for compress in (False, True):
+                path = os.path.join(folder, f"model{'_compressed' if compress else ''}.npz")
+                export_compact_model(forest, X, path, compress=compress)
+                paths["compact" + (" compressed" if compress else "")] = path
+
+            for label, path in paths.items():
+                load = (lambda: joblib.load(path)) if path.endswith(".pkl") else (lambda: CompactForest.load(path))
+                model = load()
+                np.testing.assert_array_equal(model.predict(batch), forest.predict(batch))
+                print(f"{name:10} {label:18} {os.path.getsize(path) / 1024:8.1f} "
+                      f"{best_time(load, repeat) * 1000:9.2f} "
+                      f"{best_time(lambda: model.predict(X[:1]), repeat) * 1000:9.2f} "
+                      f"{best_time(lambda: model.predict(batch), repeat) * 1000:13.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    run(parser.parse_args().repeat)
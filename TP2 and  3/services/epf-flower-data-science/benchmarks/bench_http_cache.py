@@ -0,0 +1,111 @@
+"""
+Benchmark of the conditional GETs and the response compression of /List, /Info and /Load:
+bytes sent and latency of a repeat request without validator (identity and each available
+coding, the /Load bodies coming from the body cache) and of a conditional request answered
+with a 304. The bytes are the body on the wire; the latency of the compressed requests
+includes the decompression by the test client. /Load downloads the Iris dataset and a larger
+synthetic dataset from the fake Kaggle server of the load-test harness, with `--kaggle-latency-ms`
+added to each download. Each /Load is measured twice: downloading on every request
+(`max_age_seconds` 0) and reusing the local copy (the `src/config/download.json` setting).
+
+Run from the service folder:
+    python -m benchmarks.bench_http_cache [--repeat 20] [--rows 50000] [--kaggle-latency-ms 50]
+"""
+import argparse, contextlib, io, os, tempfile, time, warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+import src.api.routes.data as data
+import src.services.load as load
+from benchmarks.loadtest.fakes import FakeKaggleApi, FakeKaggleServer, FaultInjection
+from main import get_application
+from src.services.http_cache import available_encodings
+
+
+def best_time(function, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def synthetic_dataset(path: Path, rows: int):
+    generator = np.random.default_rng(0)
+    pd.DataFrame({
+        "id": np.arange(rows),
+        "x": generator.normal(size=rows).round(4),
+        "y": generator.normal(size=rows).round(4),
+        "label": generator.choice(["alpha", "beta", "gamma"], size=rows),
+    }).to_csv(path, index=False)
+
+
+def quiet_get(client: TestClient, url: str, headers: dict = None):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return client.get(url, headers=headers)
+
+
+def measure(client: TestClient, label: str, mode: str, url: str, encodings: list, repeat: int):
+    first = time.perf_counter()
+    response = quiet_get(client, url)
+    first = time.perf_counter() - first
+    etag = response.headers["etag"]
+    print(f"{label:16} {mode:9} {'first':22} {response.status_code:6d} {len(response.content):10d} {first * 1000:9.2f}")
+
+    cases = [("repeat identity", {"Accept-Encoding": "identity"})]
+    cases += [(f"repeat {encoding}", {"Accept-Encoding": encoding}) for encoding in encodings]
+    cases.append(("repeat If-None-Match", {"If-None-Match": etag, "Accept-Encoding": "gzip"}))
+    for name, headers in cases:
+        response = quiet_get(client, url, headers)
+        sent = int(response.headers.get("content-length", 0))
+        elapsed = best_time(lambda: quiet_get(client, url, headers), repeat)
+        print(f"{'':16} {'':9} {name:22} {response.status_code:6d} {sent:10d} {elapsed * 1000:9.2f}")
+
+
+def run(repeat: int, rows: int, kaggle_latency_ms: float):
+    warnings.simplefilter("ignore")
+    client = TestClient(get_application())
+    encodings = available_encodings(data.http_cache_settings)
+    local_copy = dict(data.download_settings)
+    always_download = dict(data.download_settings, max_age_seconds=0)
+
+    with tempfile.TemporaryDirectory() as folder:
+        kaggle_dir = Path(folder) / "kaggle"
+        iris = kaggle_dir / "iris" / "Iris.csv"
+        iris.parent.mkdir(parents=True)
+        iris.write_bytes(Path("src/data/iris/Iris.csv").read_bytes())
+        synthetic = kaggle_dir / "synthetic" / "data.csv"
+        synthetic.parent.mkdir()
+        synthetic_dataset(synthetic, rows)
+        load.DATA_DIR = str(Path(folder) / "data")
+        load.KaggleApi = FakeKaggleApi
+
+        endpoints = [
+            ("/List", "/List", local_copy),
+            ("/Info", "/Info?dataset_name=iris", local_copy),
+            ("/Load iris", "/Load?dataset_name=iris", always_download),
+            ("/Load iris", "/Load?dataset_name=iris", local_copy),
+            ("/Load synthetic", "/Load?url=https://www.kaggle.com/datasets/local/synthetic", always_download),
+            ("/Load synthetic", "/Load?url=https://www.kaggle.com/datasets/local/synthetic", local_copy),
+        ]
+        with FakeKaggleServer(str(kaggle_dir), FaultInjection(latency_ms=kaggle_latency_ms)) as server:
+            os.environ["LOADTEST_KAGGLE_URL"] = server.url
+            print(f"{'endpoint':16} {'download':9} {'request':22} {'status':>6} {'bytes':>10} {'ms':>9}")
+            for label, url, download_settings in endpoints:
+                data.download_settings = download_settings
+                mode = "-" if not label.startswith("/Load") else (
+                    "always" if download_settings["max_age_seconds"] == 0 else "reused")
+                measure(client, label, mode, url, encodings, repeat)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--kaggle-latency-ms", type=float, default=50)
+    arguments = parser.parse_args()
+    run(arguments.repeat, arguments.rows, arguments.kaggle_latency_ms)
@@ -0,0 +1,61 @@
+"""
+Benchmark of the prediction payload formats: encode/decode time and payload size of a
+100k rows feature matrix, and of the matching 100k predictions.
+
+Run from the service folder:
+    python -m benchmarks.bench_payloads [--rows 100000] [--repeat 5]
+"""
+import argparse, io, json, time
+
+import numpy as np
+
+from src.services import payloads
+
+
+def best_time(function, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def json_features(features: np.ndarray):
+    body = json.dumps({"features": features.tolist()}).encode()
+    return body, lambda: payloads.decode_features(body, payloads.JSON)
+
+
+def run(rows: int, repeat: int):
+    rng = np.random.default_rng(42)
+    features = np.round(rng.uniform(0, 8, size=(rows, 4)), 1)
+    predictions = rng.choice(np.array(["Iris-setosa", "Iris-versicolor", "Iris-virginica"], dtype=object), size=rows)
+
+    print(f"{rows} rows x {features.shape[1]} features, best of {repeat}")
+    print(f"{'format':40} {'features KB':>12} {'encode ms':>10} {'decode ms':>10} {'predictions KB':>15} {'encode ms':>10}")
+
+    for media_type in payloads.available_formats():
+        if media_type == payloads.JSON:
+            encode = lambda: json.dumps({"features": features.tolist()}).encode()
+            encode_predictions = lambda: json.dumps({"prediction": predictions.tolist()}).encode()
+        else:
+            encode = lambda: payloads.encode_array(features, media_type)
+            encode_predictions = lambda: payloads.encode_array(predictions, media_type)
+
+        body = encode()
+        predictions_body = encode_predictions()
+        encode_time = best_time(encode, repeat)
+        decode_time = best_time(lambda: payloads.decode_features(body, media_type), repeat)
+        predictions_time = best_time(encode_predictions, repeat)
+
+        np.testing.assert_array_equal(payloads.decode_features(body, media_type), features)
+        print(f"{media_type:40} {len(body) / 1024:12.0f} {encode_time * 1000:10.1f} {decode_time * 1000:10.1f} "
+              f"{len(predictions_body) / 1024:15.0f} {predictions_time * 1000:10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    arguments = parser.parse_args()
+    run(arguments.rows, arguments.repeat)
@@ -0,0 +1,64 @@
+"""
+Benchmark of the sustained prediction throughput: one HTTP /Predict call per row against
+the /PredictStream WebSocket with server-side micro-batching.
+
+Both run in-process through the Starlette test client, so the numbers leave out the network
+but keep the request handling, validation and model calls.
+
+Run from the service folder:
+    python -m benchmarks.bench_streaming [--rows 2000] [--max-batch-size 256] [--max-wait-ms 5]
+"""
+import argparse, time, warnings
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from main import app
+
+
+def bench_http(client: TestClient, rows: np.ndarray) -> float:
+    start = time.perf_counter()
+    for features in rows:
+        response = client.post("/Predict", json={"features": features.tolist()})
+        response.raise_for_status()
+    return len(rows) / (time.perf_counter() - start)
+
+
+def bench_stream(client: TestClient, rows: np.ndarray, max_batch_size: int, max_wait_ms: float) -> tuple:
+    url = f"/PredictStream?max_batch_size={max_batch_size}&max_wait_ms={max_wait_ms}"
+    with client.websocket_connect(url) as websocket:
+        start = time.perf_counter()
+        for row_id, features in enumerate(rows):
+            websocket.send_json({"id": row_id, "features": features.tolist()})
+
+        received, batches = 0, 0
+        while received < len(rows):
+            results = websocket.receive_json()["results"]
+            received += len(results)
+            batches += 1
+        elapsed = time.perf_counter() - start
+    return len(rows) / elapsed, batches
+
+
+def run(rows: int, max_batch_size: int, max_wait_ms: float):
+    warnings.simplefilter("ignore")
+    features = np.round(np.random.default_rng(42).uniform(0, 8, size=(rows, 4)), 1)
+    client = TestClient(app)
+
+    http_throughput = bench_http(client, features)
+    stream_throughput, batches = bench_stream(client, features, max_batch_size, max_wait_ms)
+
+    print(f"{rows} rows")
+    print(f"{'HTTP /Predict':26}{http_throughput:10.0f} rows/s")
+    print(f"{'WebSocket /PredictStream':26}{stream_throughput:10.0f} rows/s ({batches} batches, "
+          f"max_batch_size={max_batch_size}, max_wait_ms={max_wait_ms})")
+    print(f"{'speedup':26}{stream_throughput / http_throughput:10.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--max-batch-size", type=int, default=256)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    arguments = parser.parse_args()
+    run(arguments.rows, arguments.max_batch_size, arguments.max_wait_ms)
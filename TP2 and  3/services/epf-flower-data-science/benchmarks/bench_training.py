@@ -0,0 +1,49 @@
+"""
+Benchmark of the sharded training engine: fit time of the same forest with 1 to N worker
+processes, and the speedup against 1 worker. The merged forest is the same for every number
+of workers, which the benchmark checks.
+
+Run from the service folder:
+    python -m benchmarks.bench_training [--rows 20000] [--features 20] [--trees 200] [--shards 8]
+"""
+import argparse, time
+
+import numpy as np
+from sklearn.datasets import make_classification
+
+from src.services.parallel_training import available_cores, fit_sharded
+
+
+def run(rows: int, features: int, trees: int, shards: int, max_workers: int):
+    X, y = make_classification(n_samples=rows, n_features=features, n_informative=features // 2,
+                               n_classes=3, random_state=42)
+    params = {"n_estimators": trees, "max_features": "sqrt", "random_state": 42}
+
+    print(f"{rows} rows x {features} features, {trees} trees in {shards} shards, {available_cores()} cores available")
+    print(f"{'workers':>8} {'fit s':>8} {'speedup':>8}")
+
+    reference, reference_time = None, None
+    for n_workers in range(1, max_workers + 1):
+        if n_workers > 1:
+            fit_sharded(X[:100], y[:100], dict(params, n_estimators=shards), shards, n_workers)
+
+        start = time.perf_counter()
+        model = fit_sharded(X, y, params, shards, n_workers)
+        elapsed = time.perf_counter() - start
+
+        probabilities = model.predict_proba(X[:1000])
+        if reference is None:
+            reference, reference_time = probabilities, elapsed
+        np.testing.assert_array_equal(probabilities, reference)
+        print(f"{n_workers:8d} {elapsed:8.2f} {reference_time / elapsed:8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--features", type=int, default=20)
+    parser.add_argument("--trees", type=int, default=200)
+    parser.add_argument("--shards", type=int, default=8)
+    parser.add_argument("--max-workers", type=int, default=available_cores())
+    arguments = parser.parse_args()
+    run(arguments.rows, arguments.features, arguments.trees, arguments.shards, arguments.max_workers)
@@ -0,0 +1,150 @@
+"""
+End-to-end load test of the API. The app of `main.py` is started in a copy of the service
+folder, with Kaggle replaced by a local file server and Firestore by an in-memory fake, both
+with configurable latency and error injection. Mixed traffic profiles (predict-heavy,
+load-heavy, admin) are sent by concurrent clients, and the throughput, p50/p95/p99 latency
+and error rate of each profile and operation are reported and saved as JSON, named after
+the current commit, to compare runs across commits.
+
+Run from the service folder:
+    python -m benchmarks.loadtest run [--profiles predict-heavy load-heavy admin]
+        [--concurrency 8] [--duration 20] [--warmup 3] [--seed 42]
+        [--kaggle-latency-ms 50] [--kaggle-error-rate 0] [--firestore-latency-ms 10]
+        [--firestore-error-rate 0] [--output report.json]
+    python -m benchmarks.loadtest compare before.json after.json
+"""
+import argparse, json, os, platform, shutil, socket, subprocess, sys, tempfile, time, urllib.request
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.loadtest.fakes import FakeKaggleServer, FaultInjection
+from benchmarks.loadtest.report import build_report, compare_reports, format_report, load_report, save_report
+from benchmarks.loadtest.traffic import PROFILES, run_profile
+
+SERVICE_DIR = Path(__file__).resolve().parents[2]
+REPORTS_DIR = Path(__file__).resolve().parent / "reports"
+
+
+def current_commit() -> str:
+    """
+    Returns the short hash of the current commit, with `-dirty` when the tree has changes.
+    """
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=SERVICE_DIR, capture_output=True, text=True).stdout.strip()
+
+    commit = git("rev-parse", "--short", "HEAD") or "unknown"
+    return commit + ("-dirty" if git("status", "--porcelain", "--untracked-files=no") else "")
+
+
+def copy_service(destination: Path):
+    """
+    Copies the files the app needs, so that the load test does not change the service folder.
+    """
+    ignore = shutil.ignore_patterns("__pycache__", "*.pyc", "reports")
+    shutil.copy2(SERVICE_DIR / "main.py", destination / "main.py")
+    shutil.copytree(SERVICE_DIR / "src", destination / "src", ignore=ignore)
+    shutil.copytree(SERVICE_DIR / "benchmarks" / "loadtest", destination / "benchmarks" / "loadtest", ignore=ignore)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(process: subprocess.Popen, port: int, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"The app exited with status {process.returncode}:\n{process.stderr.read()}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/List", timeout=5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"The app did not answer within {timeout} seconds.")
+
+
+def run(arguments):
+    kaggle_faults = FaultInjection(arguments.kaggle_latency_ms, arguments.kaggle_jitter_ms,
+                                   arguments.kaggle_error_rate, arguments.seed)
+    firestore_faults = FaultInjection(arguments.firestore_latency_ms, arguments.firestore_jitter_ms,
+                                      arguments.firestore_error_rate, arguments.seed)
+    with open(SERVICE_DIR / "src" / "config" / "model_parameters.json", "r") as file:
+        firestore_data = {"parameters/parameters": json.load(file)}
+
+    with tempfile.TemporaryDirectory(prefix="loadtest-") as folder:
+        workdir = Path(folder)
+        copy_service(workdir)
+        with FakeKaggleServer(str(workdir / "src" / "data"), kaggle_faults) as kaggle:
+            port = free_port()
+            env = dict(os.environ,
+                       LOADTEST_KAGGLE_URL=kaggle.url,
+                       LOADTEST_FIRESTORE=json.dumps(firestore_faults.to_dict()),
+                       LOADTEST_FIRESTORE_DATA=json.dumps(firestore_data),
+                       PYTHONPATH=str(workdir))
+            process = subprocess.Popen([sys.executable, "-m", "benchmarks.loadtest.serve", "--port", str(port)],
+                                       cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+            try:
+                wait_until_ready(process, port)
+                results = []
+                for profile in arguments.profiles:
+                    print(f"Running {profile} for {arguments.warmup + arguments.duration:.0f}s...", file=sys.stderr)
+                    results.append(run_profile(port, profile, arguments.concurrency, arguments.duration,
+                                               arguments.warmup, arguments.seed))
+            finally:
+                process.terminate()
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+    report = build_report(results, {
+        "commit": current_commit(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "concurrency": arguments.concurrency,
+        "duration": arguments.duration,
+        "warmup": arguments.warmup,
+        "seed": arguments.seed,
+        "kaggle": kaggle_faults.to_dict(),
+        "firestore": firestore_faults.to_dict(),
+    })
+    output = arguments.output or REPORTS_DIR / f"{report['run']['commit']}.json"
+    save_report(report, str(output))
+    print(format_report(report))
+    print(f"\nReport saved to {output}")
+
+
+def compare(arguments):
+    print(compare_reports(load_report(arguments.before), load_report(arguments.after)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the load test.")
+    run_parser.add_argument("--profiles", nargs="+", choices=list(PROFILES), default=list(PROFILES))
+    run_parser.add_argument("--concurrency", type=int, default=8)
+    run_parser.add_argument("--duration", type=float, default=20.0)
+    run_parser.add_argument("--warmup", type=float, default=3.0)
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--kaggle-latency-ms", type=float, default=50.0)
+    run_parser.add_argument("--kaggle-jitter-ms", type=float, default=10.0)
+    run_parser.add_argument("--kaggle-error-rate", type=float, default=0.0)
+    run_parser.add_argument("--firestore-latency-ms", type=float, default=10.0)
+    run_parser.add_argument("--firestore-jitter-ms", type=float, default=2.0)
+    run_parser.add_argument("--firestore-error-rate", type=float, default=0.0)
+    run_parser.add_argument("--output", help="Report file, benchmarks/loadtest/reports/<commit>.json by default.")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="Compare two reports.")
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+    compare_parser.set_defaults(handler=compare)
+
+    arguments = parser.parse_args()
+    arguments.handler(arguments)
@@ -0,0 +1,214 @@
+"""
+Local stand-ins for the external services of the API, with latency and error injection:
+a Kaggle file server serving the datasets of a `src/data` folder as zip archives, the
+Kaggle client downloading from it, and an in-memory Firestore client.
+"""
+import copy, io, json, os, random, threading, time, urllib.error, urllib.request, zipfile
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+@dataclass
+class FaultInjection:
+    """
+    Latency and errors added to every call of a fake service.
+
+    Args:
+        latency_ms (float): The mean added latency.
+        jitter_ms (float): The latency varies uniformly in `latency_ms ± jitter_ms`.
+        error_rate (float): The fraction of the calls failing.
+        seed (int): The seed of the random draws, for reproducible runs.
+    """
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    seed: int = 0
+
+    def __post_init__(self):
+        self._random = random.Random(self.seed)
+        self._lock = threading.Lock()
+
+    def apply(self) -> bool:
+        """
+        Sleeps for the injected latency.
+
+        Returns:
+            bool: Whether this call must fail.
+        """
+        with self._lock:
+            delay = max(self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms), 0.0)
+            fail = self._random.random() < self.error_rate
+        if delay:
+            time.sleep(delay / 1000)
+        return fail
+
+    def to_dict(self) -> dict:
+        return {"latency_ms": self.latency_ms, "jitter_ms": self.jitter_ms, "error_rate": self.error_rate, "seed": self.seed}
+
+
+def dataset_archive(dataset_dir: Path) -> bytes:
+    """
+    Zips the CSV files of a dataset folder, like a Kaggle dataset download.
+    """
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for csv_file in sorted(dataset_dir.glob("*.csv")):
+            archive.write(csv_file, csv_file.name)
+    return buffer.getvalue()
+
+
+class FakeKaggleServer:
+    """
+    A local HTTP server answering `GET /datasets/<owner>/<name>.zip` with the CSV files of
+    `data_dir/<name>` (the folder `/Load` downloads the dataset `<owner>/<name>` to).
+    Unknown datasets get a 404 and injected errors a 503.
+
+    Args:
+        data_dir (str): The folder of the datasets.
+        faults (FaultInjection): The latency and errors of the server.
+    """
+
+    def __init__(self, data_dir: str, faults: FaultInjection):
+        self.archives = {
+            path.name: dataset_archive(path) for path in sorted(Path(data_dir).iterdir())
+            if path.is_dir() and any(path.glob("*.csv"))
+        }
+        self.faults = faults
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                name = self.path.rsplit("/", 1)[-1].removesuffix(".zip")
+                if server.faults.apply():
+                    self.send_error(503, "Injected Kaggle error")
+                elif not self.path.startswith("/datasets/") or name not in server.archives:
+                    self.send_error(404, "Dataset not found")
+                else:
+                    body = server.archives[name]
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/zip")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def __enter__(self) -> "FakeKaggleServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class FakeKaggleApi:
+    """
+    Replaces `KaggleApi` in the app: datasets are downloaded from the fake Kaggle server
+    whose URL is in the `LOADTEST_KAGGLE_URL` environment variable.
+    """
+
+    def authenticate(self):
+        pass
+
+    def dataset_download_files(self, dataset: str, path: str = ".", unzip: bool = False, **kwargs):
+        url = f"{os.environ['LOADTEST_KAGGLE_URL']}/datasets/{dataset}.zip"
+        try:
+            with urllib.request.urlopen(url, timeout=30) as response:
+                content = response.read()
+        except urllib.error.HTTPError as e:
+            raise RuntimeError(f"Kaggle download of '{dataset}' failed with status {e.code}.") from e
+        os.makedirs(path, exist_ok=True)
+        if unzip:
+            with zipfile.ZipFile(io.BytesIO(content)) as archive:
+                archive.extractall(path)
+        else:
+            with open(os.path.join(path, f"{dataset.split('/')[-1]}.zip"), "wb") as file:
+                file.write(content)
+
+
+class FakeFirestoreError(Exception):
+    """
+    An injected Firestore failure.
+    """
+
+
+class FakeDocumentSnapshot:
+    def __init__(self, data):
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self):
+        return copy.deepcopy(self._data)
+
+
+class FakeDocumentReference:
+    def __init__(self, client: "FakeFirestoreClient", key: tuple):
+        self._client = client
+        self._key = key
+
+    def get(self) -> FakeDocumentSnapshot:
+        self._client._call()
+        with self._client._lock:
+            return FakeDocumentSnapshot(copy.deepcopy(self._client.documents.get(self._key)))
+
+    def set(self, data: dict, merge: bool = False):
+        self._client._call()
+        with self._client._lock:
+            current = self._client.documents.get(self._key) if merge else None
+            self._client.documents[self._key] = dict(current or {}, **copy.deepcopy(data))
+
+
+class FakeCollectionReference:
+    def __init__(self, client: "FakeFirestoreClient", name: str):
+        self._client = client
+        self._name = name
+
+    def document(self, name: str) -> FakeDocumentReference:
+        return FakeDocumentReference(self._client, (self._name, name))
+
+
+class FakeFirestoreClient:
+    """
+    An in-memory Firestore client with the calls the API uses (`collection().document()`,
+    `get()` and `set(merge=)`). All the clients of a process share the same documents.
+    """
+    documents = {}
+    faults = FaultInjection()
+    _lock = threading.Lock()
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    @classmethod
+    def seed(cls, documents: dict, faults: FaultInjection):
+        """
+        Sets the initial documents, as `{"collection/document": data}`, and the fault injection.
+        """
+        cls.documents = {tuple(path.split("/", 1)): copy.deepcopy(data) for path, data in documents.items()}
+        cls.faults = faults
+
+    def _call(self):
+        if self.faults.apply():
+            raise FakeFirestoreError("Injected Firestore error")
+
+    def collection(self, name: str) -> FakeCollectionReference:
+        return FakeCollectionReference(self, name)
+
+
+def fault_injection_from_env(name: str) -> FaultInjection:
+    """
+    Reads a fault injection from the JSON environment variable `name`.
+    """
+    return FaultInjection(**json.loads(os.environ.get(name, "{}")))
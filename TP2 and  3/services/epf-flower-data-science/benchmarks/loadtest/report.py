@@ -0,0 +1,120 @@
+"""
+Load-test reports: throughput, latency percentiles and error rate per profile and per
+operation, saved as JSON and compared between two runs.
+"""
+import json, math
+
+from benchmarks.loadtest.traffic import ProfileResult
+
+REPORT_FORMAT_VERSION = 1
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    """
+    Returns the `q` percentile (0-100) of sorted values, with the nearest-rank method.
+    """
+    if not sorted_values:
+        return float("nan")
+    rank = max(math.ceil(q / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(samples: list, duration: float) -> dict:
+    """
+    Summarizes requests: count, throughput, error rate (status 0 or >= 500) and latency
+    percentiles in milliseconds.
+    """
+    latencies = sorted(sample.seconds * 1000 for sample in samples)
+    errors = sum(1 for sample in samples if sample.status == 0 or sample.status >= 500)
+    return {
+        "requests": len(samples),
+        "throughput_rps": len(samples) / duration if duration else 0.0,
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": latencies[-1] if latencies else float("nan"),
+        "statuses": {str(status): sum(1 for sample in samples if sample.status == status)
+                     for status in sorted({sample.status for sample in samples})},
+    }
+
+
+def profile_report(result: ProfileResult) -> dict:
+    operations = sorted({sample.operation for sample in result.samples})
+    return {
+        "total": summarize(result.samples, result.duration),
+        "operations": {
+            operation: summarize([sample for sample in result.samples if sample.operation == operation], result.duration)
+            for operation in operations
+        },
+    }
+
+
+def build_report(results: list, run_info: dict) -> dict:
+    """
+    Builds the report of a load test.
+
+    Args:
+        results (list): The ProfileResult of each profile.
+        run_info (dict): The commit, settings and environment of the run.
+
+    Returns:
+        dict: The report.
+    """
+    return {
+        "format_version": REPORT_FORMAT_VERSION,
+        "run": run_info,
+        "profiles": {result.profile: profile_report(result) for result in results},
+    }
+
+
+def save_report(report: dict, path: str):
+    with open(path, "w") as file:
+        json.dump(report, file, indent=4)
+
+
+def load_report(path: str) -> dict:
+    with open(path, "r") as file:
+        return json.load(file)
+
+
+def format_report(report: dict) -> str:
+    """
+    Formats a report as one table per profile.
+    """
+    lines = [f"commit {report['run'].get('commit')}  concurrency {report['run'].get('concurrency')}  "
+             f"duration {report['run'].get('duration')}s"]
+    for profile, summary in report["profiles"].items():
+        lines.append("")
+        lines.append(f"{profile:18} {'requests':>9} {'req/s':>8} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for name, row in [("total", summary["total"])] + list(summary["operations"].items()):
+            lines.append(f"  {name:16} {row['requests']:9d} {row['throughput_rps']:8.1f} {row['error_rate']:7.1%} "
+                         f"{row['p50_ms']:8.1f} {row['p95_ms']:8.1f} {row['p99_ms']:8.1f}")
+    return "\n".join(lines)
+
+
+def _change(before: float, after: float) -> str:
+    if before is None or after is None or math.isnan(before) or math.isnan(after) or before == 0:
+        return "   n/a"
+    return f"{(after - before) / before:+6.0%}"
+
+
+def compare_reports(before: dict, after: dict) -> str:
+    """
+    Formats the change of throughput, latency and error rate between two reports, for the
+    profiles and operations present in both.
+    """
+    lines = [f"{before['run'].get('commit')} -> {after['run'].get('commit')}"]
+    for profile in [name for name in before["profiles"] if name in after["profiles"]]:
+        lines.append("")
+        lines.append(f"{profile:18} {'req/s':>15} {'p50 ms':>15} {'p95 ms':>15} {'p99 ms':>15} {'errors':>17}")
+        rows_before, rows_after = before["profiles"][profile], after["profiles"][profile]
+        names = ["total"] + [name for name in rows_before["operations"] if name in rows_after["operations"]]
+        for name in names:
+            old = rows_before["total"] if name == "total" else rows_before["operations"][name]
+            new = rows_after["total"] if name == "total" else rows_after["operations"][name]
+            cells = [f"{new[key]:8.1f} {_change(old[key], new[key])}"
+                     for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")]
+            errors = f"{old['error_rate']:6.1%} -> {new['error_rate']:6.1%}"
+            lines.append(f"  {name:16} " + " ".join(f"{cell:>15}" for cell in cells) + f" {errors:>17}")
+    return "\n".join(lines)
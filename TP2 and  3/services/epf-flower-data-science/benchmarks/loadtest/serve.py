@@ -0,0 +1,43 @@
+"""
+Starts the app of `main.py` with the external services replaced by the fakes of
+`benchmarks/loadtest/fakes.py`. Started by the load-test harness in a copy of the service
+folder, with the settings in environment variables:
+
+    LOADTEST_KAGGLE_URL       URL of the fake Kaggle server
+    LOADTEST_FIRESTORE        JSON fault injection of the Firestore fake
+    LOADTEST_FIRESTORE_DATA   JSON initial documents, {"collection/document": data}
+
+Run from the service folder:
+    python -m benchmarks.loadtest.serve --port 8081
+"""
+import argparse, json, os
+
+import uvicorn
+
+from benchmarks.loadtest.fakes import FakeFirestoreClient, FakeKaggleApi, fault_injection_from_env
+
+
+def install_fakes():
+    """
+    Replaces the Kaggle and Firestore clients used by the services.
+    """
+    import src.services.firestore as firestore_service
+    import src.services.load as load_service
+
+    FakeFirestoreClient.seed(json.loads(os.environ.get("LOADTEST_FIRESTORE_DATA", "{}")),
+                             fault_injection_from_env("LOADTEST_FIRESTORE"))
+    firestore_service.firestore.Client = FakeFirestoreClient
+    load_service.KaggleApi = FakeKaggleApi
+
+
+def main(port: int):
+    install_fakes()
+    from main import app
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8081)
+    main(parser.parse_args().port)
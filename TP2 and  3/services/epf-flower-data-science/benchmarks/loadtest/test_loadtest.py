@@ -0,0 +1,98 @@
+import math
+import pytest
+from benchmarks.loadtest.fakes import FakeFirestoreClient, FakeFirestoreError, FakeKaggleApi, FakeKaggleServer, FaultInjection
+from benchmarks.loadtest.report import build_report, compare_reports, format_report, percentile, summarize
+from benchmarks.loadtest.traffic import ProfileResult, Sample
+
+
+def samples(operation, latencies_ms, status=200):
+    return [Sample(operation, latency / 1000, status, 0.0) for latency in latencies_ms]
+
+
+def test_percentile_nearest_rank():
+    """
+    Test the nearest-rank percentiles.
+    """
+    values = list(range(1, 101))
+
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([7], 95) == 7
+    assert math.isnan(percentile([], 50))
+
+
+def test_summarize_counts_server_errors():
+    """
+    Test that connection failures (status 0) and 5xx are errors, and 4xx are not.
+    """
+    summary = summarize(samples("load", [10, 20]) + samples("load", [30], 500) + samples("load", [40], 0)
+                        + samples("load", [50], 404), duration=5)
+
+    assert summary["requests"] == 5
+    assert summary["throughput_rps"] == 1
+    assert summary["error_rate"] == pytest.approx(0.4)
+    assert summary["p50_ms"] == pytest.approx(30)
+    assert summary["statuses"] == {"0": 1, "200": 2, "404": 1, "500": 1}
+
+
+def test_report_and_compare():
+    """
+    Test that a report has every operation of a profile and that two reports are compared.
+    """
+    before = build_report([ProfileResult("admin", 10, samples("list", [10] * 10) + samples("metrics", [20] * 10))],
+                          {"commit": "before"})
+    after = build_report([ProfileResult("admin", 10, samples("list", [5] * 20) + samples("metrics", [20] * 10))],
+                         {"commit": "after"})
+
+    assert set(before["profiles"]["admin"]["operations"]) == {"list", "metrics"}
+    assert "list" in format_report(before)
+    comparison = compare_reports(before, after)
+    assert comparison.splitlines()[0] == "before -> after"
+    assert "-50%" in comparison
+
+
+def test_fault_injection_is_reproducible():
+    """
+    Test that the same seed fails the same calls.
+    """
+    first = FaultInjection(error_rate=0.5, seed=3)
+    second = FaultInjection(error_rate=0.5, seed=3)
+
+    assert [first.apply() for _ in range(20)] == [second.apply() for _ in range(20)]
+    assert FaultInjection(error_rate=0.0).apply() is False
+
+
+def test_fake_kaggle_download(tmp_path, monkeypatch):
+    """
+    Test that the fake Kaggle client downloads and extracts a dataset served by the fake server.
+    """
+    data_dir = tmp_path / "data" / "iris"
+    data_dir.mkdir(parents=True)
+    (data_dir / "Iris.csv").write_text("a,b\n1,2\n")
+
+    with FakeKaggleServer(str(tmp_path / "data"), FaultInjection()) as server:
+        monkeypatch.setenv("LOADTEST_KAGGLE_URL", server.url)
+        FakeKaggleApi().dataset_download_files("uciml/iris", path=str(tmp_path / "out"), unzip=True)
+        with pytest.raises(RuntimeError):
+            FakeKaggleApi().dataset_download_files("uciml/unknown", path=str(tmp_path / "out"), unzip=True)
+
+    assert (tmp_path / "out" / "Iris.csv").read_text() == "a,b\n1,2\n"
+    assert server.requests == 2
+
+
+def test_fake_firestore_documents(monkeypatch):
+    """
+    Test the documents shared by the fake Firestore clients and the injected errors.
+    """
+    FakeFirestoreClient.seed({"parameters/parameters": {"n_estimators": 100}}, FaultInjection())
+    document = FakeFirestoreClient().collection("parameters").document("parameters")
+
+    document.set({"max_depth": 3}, merge=True)
+
+    assert FakeFirestoreClient().collection("parameters").document("parameters").get().to_dict() == {
+        "n_estimators": 100, "max_depth": 3}
+    assert not FakeFirestoreClient().collection("parameters").document("missing").get().exists
+    FakeFirestoreClient.seed({}, FaultInjection(error_rate=1.0))
+    with pytest.raises(FakeFirestoreError):
+        document.get()
+    FakeFirestoreClient.seed({}, FaultInjection())
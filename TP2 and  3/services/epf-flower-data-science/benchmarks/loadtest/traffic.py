@@ -0,0 +1,120 @@
+"""
+Traffic profiles of the load test and the closed-loop driver sending them.
+"""
+import http.client, json, random, threading, time
+from dataclasses import dataclass, field
+from typing import Optional
+
+IRIS_ROW = [5.1, 3.5, 1.4, 0.2]
+
+
+@dataclass(frozen=True)
+class Operation:
+    """
+    One kind of request of a traffic profile.
+    """
+    method: str
+    path: str
+    body: Optional[dict] = None
+
+
+OPERATIONS = {
+    "predict": Operation("POST", "/Predict", {"features": IRIS_ROW}),
+    "predict_batch": Operation("POST", "/Predict/iris", {"features": [IRIS_ROW] * 256}),
+    "load_iris": Operation("GET", "/Load?dataset_name=iris"),
+    "load_cityride": Operation("GET", "/Load?dataset_name=dataset2"),
+    "stats": Operation("GET", "/Stats?dataset_name=iris"),
+    "list": Operation("GET", "/List"),
+    "info": Operation("GET", "/Info?dataset_name=iris"),
+    "see_collection": Operation("GET", "/SeeCollection"),
+    "update_collection": Operation("PUT", "/UpdateCollection", {"params": {"criterion": "gini"}}),
+    "metrics": Operation("GET", "/Metrics"),
+    "models": Operation("GET", "/Models"),
+}
+
+# Weights of the operations in each profile.
+PROFILES = {
+    "predict-heavy": {"predict": 70, "predict_batch": 20, "list": 5, "see_collection": 5},
+    "load-heavy": {"load_iris": 45, "load_cityride": 15, "stats": 20, "info": 10, "list": 10},
+    "admin": {"metrics": 30, "models": 20, "see_collection": 25, "update_collection": 15, "list": 10},
+}
+
+
+@dataclass
+class Sample:
+    operation: str
+    seconds: float
+    status: int
+    started: float
+
+
+@dataclass
+class ProfileResult:
+    profile: str
+    duration: float
+    samples: list = field(default_factory=list)
+
+
+def _send(connection: http.client.HTTPConnection, operation: Operation) -> int:
+    body = None if operation.body is None else json.dumps(operation.body)
+    headers = {} if body is None else {"Content-Type": "application/json"}
+    connection.request(operation.method, operation.path, body=body, headers=headers)
+    response = connection.getresponse()
+    response.read()
+    return response.status
+
+
+def run_profile(base_port: int, profile: str, concurrency: int, duration: float, warmup: float,
+                seed: int, timeout: float = 60.0) -> ProfileResult:
+    """
+    Sends the requests of a profile from `concurrency` clients, each sending its next request
+    when the previous one is answered, for `warmup + duration` seconds. Only the requests
+    sent after the warmup are kept.
+
+    Args:
+        base_port (int): The port of the app on 127.0.0.1.
+        profile (str): The name of the profile in `PROFILES`.
+        concurrency (int): The number of concurrent clients.
+        duration (float): The measured time in seconds.
+        warmup (float): The time in seconds before the measure.
+        seed (int): The seed of the operation draws; client `i` uses `seed + i`.
+        timeout (float): The timeout of a request in seconds.
+
+    Returns:
+        ProfileResult: The measured requests.
+    """
+    weights = PROFILES[profile]
+    names, name_weights = list(weights), list(weights.values())
+    start = time.perf_counter()
+    measure_start, end = start + warmup, start + warmup + duration
+    result = ProfileResult(profile, duration)
+    lock = threading.Lock()
+
+    def client(index: int):
+        draws = random.Random(seed + index)
+        connection = http.client.HTTPConnection("127.0.0.1", base_port, timeout=timeout)
+        samples = []
+        while True:
+            now = time.perf_counter()
+            if now >= end:
+                break
+            name = draws.choices(names, name_weights)[0]
+            try:
+                status = _send(connection, OPERATIONS[name])
+            except (OSError, http.client.HTTPException):
+                status = 0
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", base_port, timeout=timeout)
+            finished = time.perf_counter()
+            if now >= measure_start:
+                samples.append(Sample(name, finished - now, status, now - measure_start))
+        connection.close()
+        with lock:
+            result.samples += samples
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return result
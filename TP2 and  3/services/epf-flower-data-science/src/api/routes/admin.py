@@ -0,0 +1,77 @@
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from src.services import metrics
+from src.services.profiling import is_admin_token, list_profiles, load_profiling_settings, read_profile_report
+
+router = APIRouter()
+
+
+def check_admin_token(token: Optional[str]):
+    """
+    Rejects the request if the token is not the profiling admin token.
+
+    Raises:
+        HTTPException: 403 if the token is missing or wrong.
+    """
+    if not is_admin_token(token, load_profiling_settings()):
+        raise HTTPException(status_code=403, detail="Admin token required.")
+
+
+@router.get("/Profiles", name="List stored profiles")
+def get_profiles(x_profile_token: Optional[str] = Header(None)):
+    """
+    Lists the profiles stored by the opt-in profiler, most recent first.
+
+    A request is profiled when it carries the admin token in the `X-Profile-Token` header
+    (or the `profile_token` query parameter), or when it is sampled with the rates of
+    `src/config/profiling.json`. Its profile id is sent back in the `X-Profile-Id` header.
+
+    Args:
+        x_profile_token (str): The admin token.
+
+    Raises:
+        HTTPException: If the admin token is missing or wrong.
+
+    Returns:
+        dict: The ids of the stored profiles.
+    """
+    check_admin_token(x_profile_token)
+    return {"profiles": list_profiles(load_profiling_settings().output_dir)}
+
+
+@router.get("/Profiles/{profile_id}", name="Get a stored profile", response_class=PlainTextResponse)
+def get_profile(profile_id: str, sort_by: str = "cumulative", limit: int = 40,
+                x_profile_token: Optional[str] = Header(None)):
+    """
+    Returns the pstats report of a stored profile.
+
+    Args:
+        profile_id (str): The id sent back in the `X-Profile-Id` header.
+        sort_by (str): The pstats sort key (cumulative, tottime, calls...).
+        limit (int): The number of functions in the report.
+        x_profile_token (str): The admin token.
+
+    Raises:
+        HTTPException: If the admin token is wrong or the profile does not exist.
+
+    Returns:
+        str: The text report.
+    """
+    check_admin_token(x_profile_token)
+    try:
+        return read_profile_report(load_profiling_settings().output_dir, profile_id, sort_by, limit)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get("/Metrics", name="Get service metrics")
+def get_metrics():
+    """
+    Returns the metrics collected by the service: memory peak and retained bytes per job
+    and per stage, ceiling aborts...
+
+    Returns:
+        dict: The counters, gauges and summaries.
+    """
+    return metrics.snapshot()
@@ -1,15 +1,31 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends, Header, Request, Response, WebSocket
+from starlette.concurrency import run_in_threadpool
 from src.schemas.message import MessageResponse
 from pydantic import BaseModel
 from fastapi import Query
 from typing import Optional
-import json, os, joblib
+import json, os, threading, time
 import pandas as pd
 from src.services.load import *
 from src.services.loading_config import *
 import src.services.PST as PST
 from src.services.PST import *
 from src.services.firestore import *
+from src.services.profiling import profiled
+from src.services.memory import MemoryTracker, MemoryLimitExceeded, load_memory_settings
+import src.services.payloads as payloads
+from src.services.streaming import (stream_predictions, clamp_stream_parameters, load_streaming_settings,
+                                    DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_WAIT_MS, DEFAULT_MAX_PENDING)
+from src.services import metrics
+from src.services.model_store import train_with_cache, artifact_paths, load_store_settings, read_evaluation
+from src.services.evaluation import UnknownLabels, evaluate_forest, load_evaluation_settings
+from src.services.parameter_sync import ParameterSync, DebouncedTrigger, load_sync_settings
+from src.services.compact_model import export_compact_model
+from src.services.model_catalog import ModelCache, get_model_entry, load_catalog, register_model, forget_fingerprints
+from src.services.parallel_training import load_training_settings, make_fit, engine_fingerprint, shutdown_executor
+from src.services.http_cache import (BodyCache, conditional_response, file_digest, load_http_cache_settings,
+                                     render_json, strong_etag)
+from src.services.stats import STATS_FORMAT, compute_statistics, conform_rows, update_statistics, read_statistics, write_statistics
 
 os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "src/config/abelleapi-firebase.json"
 os.environ["KAGGLE_CONFIG_DIR"] = "src/config/kaggle.json"
@@ -19,11 +35,20 @@ router = APIRouter()
 
 IRIS_DATASET_URL = "https://www.kaggle.com/datasets/uciml/iris"
 MODEL_PATH = "src/models/random_forest_model.pkl"
+DEFAULT_MODEL = "iris"
 CONFIG_FILE_PATH = "src/config/config.json"
 MODEL_PARAMS_FILE_PATH = "src/config/model_parameters.json"
 KAGGLE_CONFIG_PATH = "src/config/kaggle.json"
 DATA_DIR = "src/data"
 
+memory_settings = load_memory_settings()
+download_settings = load_download_settings()
+streaming_settings = load_streaming_settings()
+model_cache = ModelCache.from_settings()
+http_cache_settings = load_http_cache_settings()
+body_cache = BodyCache(http_cache_settings["cache_bytes"])
+_training_lock = threading.Lock()
+
 class Dataset(BaseModel):
     name: str
     url: str
@@ -34,16 +59,177 @@ class PredictionRequest(BaseModel):
 class ParametersRequest(BaseModel):
     params: dict
 
+class AppendRowsRequest(BaseModel):
+    rows: list
+
+
+BINARY_BODY_SCHEMA = {"schema": {"type": "string", "format": "binary"}}
+
+PREDICTION_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            payloads.JSON: {"schema": PredictionRequest.schema()},
+            payloads.NPY: BINARY_BODY_SCHEMA,
+            payloads.MSGPACK: BINARY_BODY_SCHEMA,
+            payloads.ARROW: BINARY_BODY_SCHEMA,
+        },
+    }
+}
+
+
+def load_catalog_model(model: str, version: Optional[str] = None, batch_rows: Optional[int] = None) -> tuple:
+    """
+    Returns a model of the catalog, from the in-memory cache or loaded from disk.
+
+    Args:
+        model (str): The model name.
+        version (str, optional): The model version, the active one by default.
+        batch_rows (int, optional): The number of rows predicted at once, which selects the
+            compact copy or the pickled model (see `src/config/serving.json`).
+
+    Raises:
+        HTTPException: 404 if the model or the version is not in the catalog.
+
+    Returns:
+        tuple: The loaded model and its catalog entry.
+    """
+    try:
+        version, entry = get_model_entry(model, version)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    return model_cache.get(model, version, entry["versions"][version], batch_rows), dict(entry, version=version)
+
+
+def check_feature_shape(features, loaded_model, entry: dict):
+    """
+    Checks that a feature matrix has at least one row and the width the model was fitted with.
+
+    Raises:
+        HTTPException: 422 if the matrix does not fit the model.
+    """
+    n_features = getattr(loaded_model, "n_features_in_", None) or len(entry["features"])
+    if features.ndim != 2 or features.shape[0] == 0:
+        raise HTTPException(status_code=422, detail="Invalid features: at least one row is required.")
+    if features.shape[1] != n_features:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Invalid features: the model expects {n_features} features per row, got {features.shape[1]}."
+        )
+
+
+def predict_rows(model: str, version: Optional[str], features, accept: Optional[str]):
+    """
+    Predicts the rows of `features` with a model of the catalog and encodes the predictions
+    in the format asked in the Accept header. The prediction latency is recorded per model.
+    Rows that do not have the width of the model get a 422.
+    """
+    media_type = negotiate_format(accept, payloads.available_formats())
+    try:
+        with MemoryTracker.for_job("predict", memory_settings) as tracker:
+            with tracker.stage("load"):
+                loaded_model, entry = load_catalog_model(model, version, len(features))
+            check_feature_shape(features, loaded_model, entry)
+
+            tracker.ensure_fits(8 * len(features) * len(entry["features"]), "predict")
+            with tracker.stage("predict"):
+                input_data = pd.DataFrame(features, columns=entry["features"])
+
+                start = time.perf_counter()
+                prediction = loaded_model.predict(input_data)
+                metrics.observe("predict_latency_seconds", time.perf_counter() - start, model=model)
+                metrics.increment("predicted_rows", len(input_data), model=model)
+
+        if media_type != payloads.JSON:
+            return Response(content=payloads.encode_array(prediction, media_type), media_type=media_type)
+
+        return {"message": "Prediction successful", "model": model, "version": entry["version"],
+                "prediction": prediction.tolist()}
+
+    except HTTPException as e:
+        raise e
+    except MemoryLimitExceeded as e:
+        raise HTTPException(status_code=507, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"An error occurred during prediction: {str(e)}"
+        )
+
+
+async def read_prediction_features(request: Request):
+    """
+    Reads the feature matrix of a prediction request according to its Content-Type
+    (JSON by default, or NPY, MessagePack and Arrow IPC, see `src/services/payloads.py`).
+
+    Raises:
+        HTTPException: 415 if the format is not supported, 422 if the payload is invalid.
+
+    Returns:
+        np.ndarray: The (n_rows, n_features) feature matrix.
+    """
+    body = await request.body()
+    try:
+        return payloads.decode_features(body, request.headers.get("content-type", payloads.JSON))
+    except payloads.UnsupportedFormat as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"Invalid features: {str(e)}")
+
+
+def refresh_statistics(csv_file, tracker: Optional[MemoryTracker] = None) -> dict:
+    """
+    Returns the statistics of a dataset from its sidecar, computed again from the file when
+    the sidecar is missing, was written in an older format, or was computed from another
+    version of the file (the digest stored in the sidecar differs), e.g. after a download
+    replaced it. The caller holds
+    `dataset_lock`.
+
+    Args:
+        csv_file (Path): The dataset CSV.
+        tracker (MemoryTracker, optional): Checks the memory ceiling before reading the file.
+
+    Returns:
+        dict: The statistics.
+    """
+    destination = csv_file.parent
+    digest = file_digest(csv_file)
+    stats = read_statistics(destination)
+    if stats is None or stats.get("format") != STATS_FORMAT or stats.get("source_digest") != digest:
+        if tracker is not None:
+            tracker.ensure_fits(csv_file.stat().st_size, "stats")
+        stats = compute_statistics(read_dataset(csv_file))
+        stats["source_digest"] = digest
+        write_statistics(stats, destination)
+    return stats
+
+
+def negotiate_format(accept: Optional[str], supported: list) -> str:
+    """
+    Picks the response format from the Accept header.
+
+    Raises:
+        HTTPException: 406 if none of the accepted formats is supported.
+    """
+    try:
+        return payloads.negotiate(accept, supported)
+    except payloads.UnsupportedFormat as e:
+        raise HTTPException(status_code=406, detail=str(e))
+
 
 @router.get("/List", name="List All Datasets")
-def list_datasets():
+def list_datasets(request: Request):
     """
     Lists all datasets present in the configuration file along with their names and URLs.
 
+    The response has a strong ETag derived from the configuration file: a request with the
+    same `If-None-Match` gets a 304 until the configuration changes.
+
     Returns:
         dict: A list of datasets with their names and URLs if found, or a message indicating no datasets are found.
     """
     try:
+        config_version = file_digest(CONFIG_FILE_PATH)
         config = load_config(CONFIG_FILE_PATH)
 
         if not config:
@@ -51,7 +237,11 @@ def list_datasets():
 
         datasets = [{"name": key, "url": value["url"]} for key, value in config.items()]
         
-        return {"message": "Datasets listés avec succès.", "datasets": datasets}
+        return conditional_response(
+            request, "List", strong_etag(config_version, "List"), payloads.JSON,
+            lambda: render_json({"message": "Datasets listés avec succès.", "datasets": datasets}),
+            http_cache_settings,
+        )
     
     except FileNotFoundError:
         raise HTTPException(
@@ -66,9 +256,10 @@ def list_datasets():
 
 
 @router.get("/Info", name="Get dataset info", response_model=MessageResponse)
-def get_dataset(dataset_name: str) -> MessageResponse:
+def get_dataset(dataset_name: str, request: Request) -> MessageResponse:
     """
     Retrieves information about a specific dataset from the configuration file.
+    Like `/List`, the response has a strong ETag derived from the configuration file.
 
     Args:
         dataset_name (str): The name of the dataset to retrieve information for.
@@ -80,6 +271,7 @@ def get_dataset(dataset_name: str) -> MessageResponse:
         MessageResponse: A message indicating the dataset's information or an error if not found.
     """
     try:
+        config_version = file_digest(CONFIG_FILE_PATH)
         config = load_config(CONFIG_FILE_PATH)
         
         if dataset_name not in config:
@@ -89,8 +281,10 @@ def get_dataset(dataset_name: str) -> MessageResponse:
             )
         
         dataset_info = config[dataset_name]
-        return MessageResponse(
-            message=f"Dataset '{dataset_name}' found: {dataset_info}"
+        return conditional_response(
+            request, "Info", strong_etag(config_version, "Info", dataset_name), payloads.JSON,
+            lambda: render_json(MessageResponse(message=f"Dataset '{dataset_name}' found: {dataset_info}").dict()),
+            http_cache_settings,
         )
     
     except FileNotFoundError:
@@ -187,14 +381,29 @@ def update_dataset(name: str, new_url: str):
         )
 
 @router.get("/Load", name="Load Dataset")
-def load_dataset(url: Optional[str] = Query(None, description="URL of the dataset to load"),
-                          dataset_name: Optional[str] = Query(None, description="Name of the dataset to load")):
+@profiled
+def load_dataset(request: Request,
+                          url: Optional[str] = Query(None, description="URL of the dataset to load"),
+                          dataset_name: Optional[str] = Query(None, description="Name of the dataset to load"),
+                          accept: Optional[str] = Header(None)):
     """
     Loads a dataset either by its URL or by its name from the configuration file.
     
     This endpoint allows you to load a dataset either by directly providing its URL or by specifying its name,
     in which case the URL will be retrieved from the configuration file. The dataset is then loaded as a CSV and returned 
-    in JSON format.
+    in JSON format. A dataset downloaded less than `max_age_seconds` ago (see
+    `src/config/download.json`) is served from the local copy, and the rows added with
+    `/Append` are kept across downloads. The statistics of the dataset are computed again
+    when the file changed, and stored next to it for the `/Stats` endpoint.
+
+    With an `Accept: application/vnd.apache.arrow.stream` or `application/x-msgpack` header,
+    the dataset is sent in that binary format instead of JSON.
+
+    The response has a strong ETag derived from the content of the dataset file: when it
+    matches `If-None-Match`, a 304 is sent without reading the dataset. Large bodies are
+    compressed (gzip, brotli or zstd, see `src/config/http_cache.json`), and the rendered and
+    compressed bodies of each dataset version are kept in memory for the next requests. The
+    memory used by each stage is in the `X-Memory-Report` header.
 
     Args:
         url (str, optional): The `url` where the dataset is located. If not provided, the `dataset_name` must be specified.
@@ -230,12 +439,37 @@ def load_dataset(url: Optional[str] = Query(None, description="URL of the datase
                 detail="Either 'url' or 'dataset_name' must be provided."
             )
 
-        dataset_json = download_kaggle_dataset(url)
-
-        return {"message": "Dataset loaded successfully.", "data": dataset_json}
+        supported = [media_type for media_type in payloads.available_formats() if media_type != payloads.NPY]
+        media_type = negotiate_format(accept, supported)
+
+        with MemoryTracker.for_job("load", memory_settings) as tracker:
+            with tracker.stage("download"):
+                csv_file = download_kaggle_files(url, download_settings["max_age_seconds"])
+                etag = strong_etag(file_digest(csv_file), "Load", media_type)
+            with tracker.stage("stats"), dataset_lock(csv_file.parent):
+                refresh_statistics(csv_file, tracker)
+
+            def render() -> bytes:
+                tracker.ensure_fits(csv_file.stat().st_size, "load")
+                with tracker.stage("load"):
+                    dataset_df = read_dataset(csv_file)
+                tracker.ensure_fits(payloads.estimate_encoded_bytes(dataset_df, media_type), "process")
+                with tracker.stage("process"):
+                    if media_type != payloads.JSON:
+                        return payloads.encode_dataframe(dataset_df, media_type)
+                    return render_json({"message": "Dataset loaded successfully.",
+                                        "data": dataset_df.to_dict(orient="records")})
+
+            response = conditional_response(request, "Load", etag, media_type, render, http_cache_settings,
+                                            cache=body_cache, vary="Accept, Accept-Encoding")
+
+        response.headers["X-Memory-Report"] = json.dumps(tracker.report(), separators=(",", ":"))
+        return response
 
     except HTTPException as e:
         raise e  
+    except MemoryLimitExceeded as e:
+        raise HTTPException(status_code=507, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -243,27 +477,282 @@ def load_dataset(url: Optional[str] = Query(None, description="URL of the datase
         )
     
 
+@router.get("/Stats", name="Get dataset statistics")
+def get_dataset_statistics(dataset_name: str):
+    """
+    Returns the statistics of a dataset (row count, column types, min/max, means, null counts,
+    histograms, approximate quantiles and category frequencies) from the sidecar stored next
+    to the dataset, without reading the data.
+
+    The sidecar is written by `/Load` and updated by `/Append`. For a dataset already present
+    in `src/data` without sidecar, or whose file changed since the sidecar was written, it is
+    computed again on the first call.
+
+    Args:
+        dataset_name (str): The name of the dataset in the configuration file.
+
+    Raises:
+        HTTPException: If the dataset is not in the configuration file or has not been downloaded.
+
+    Returns:
+        dict: The statistics of the dataset.
+    """
+    try:
+        config = load_config(CONFIG_FILE_PATH)
+
+        dataset_info = config.get(dataset_name)
+        if not dataset_info or "url" not in dataset_info:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Dataset '{dataset_name}' not found in configuration or URL missing."
+            )
+
+        destination = dataset_directory(dataset_info["url"])
+        csv_file = find_csv_file(destination)
+        if csv_file is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Dataset '{dataset_name}' has not been downloaded yet, use /Load first."
+            )
+        with dataset_lock(destination):
+            stats = refresh_statistics(csv_file)
+
+        return {"message": f"Statistics of dataset '{dataset_name}'.", "stats": stats}
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"An error occurred while reading the statistics: {str(e)}"
+        )
+
+
+@router.post("/Append", name="Append rows to a dataset")
+def append_rows(dataset_name: str, request: AppendRowsRequest):
+    """
+    Appends rows to a downloaded dataset and updates its statistics incrementally,
+    from the new rows only. The values are cast to the kinds of the columns first; the file
+    and the statistics are only written when all the rows fit. The rows are kept apart too,
+    and added again to the file downloaded by the next `/Load`.
+
+    Args:
+        dataset_name (str): The name of the dataset in the configuration file.
+        request (AppendRowsRequest): The rows to append, as a list of records.
+
+    Raises:
+        HTTPException: If the dataset is unknown or not downloaded, if the rows are empty, or
+        if a value does not fit the kind of its column (400).
+
+    Returns:
+        dict: A message with the new number of rows.
+
+    Example : {"rows": [{"Id": 151, "SepalLengthCm": 5.9, "SepalWidthCm": 3.0, "PetalLengthCm": 5.1, "PetalWidthCm": 1.8, "Species": "Iris-virginica"}]}
+    """
+    try:
+        config = load_config(CONFIG_FILE_PATH)
+
+        dataset_info = config.get(dataset_name)
+        if not dataset_info or "url" not in dataset_info:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Dataset '{dataset_name}' not found in configuration or URL missing."
+            )
+
+        destination = dataset_directory(dataset_info["url"])
+        csv_file = find_csv_file(destination)
+        if csv_file is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Dataset '{dataset_name}' has not been downloaded yet, use /Load first."
+            )
+        if not request.rows:
+            raise HTTPException(status_code=400, detail="No rows to append.")
+
+        with dataset_lock(destination):
+            stats = refresh_statistics(csv_file)
+
+            try:
+                new_rows = conform_rows(stats, request.rows, list(pd.read_csv(csv_file, nrows=0).columns))
+                stats = update_statistics(stats, new_rows)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+            append_to_dataset(csv_file, new_rows)
+            stats["source_digest"] = file_digest(csv_file)
+            write_statistics(stats, destination)
+
+        return {"message": f"{len(new_rows)} rows appended to dataset '{dataset_name}'.", "rows": stats["rows"]}
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"An error occurred while appending the rows: {str(e)}"
+        )
+
+
+def train_iris_model(model_params: dict) -> dict:
+    """
+    Processes, splits and trains the Iris model with the given parameters, evaluates it,
+    and registers it in the model catalog. Runs one training at a time.
+
+    Args:
+        model_params (dict): The RandomForest parameters.
+
+    Returns:
+        dict: The training cache result, the model fingerprint and version, its evaluation and
+        the memory used by each stage.
+    """
+    with _training_lock, MemoryTracker.for_job("pst", memory_settings) as tracker:
+        with tracker.stage("load"):
+            dataset_df = pd.read_csv("src/data/iris/Iris.csv", index_col=0)
+        tracker.ensure_fits(payloads.estimate_encoded_bytes(dataset_df, payloads.JSON), "process")
+        with tracker.stage("process"):
+            dataset_json = dataset_df.to_json(orient="records")
+            del dataset_df
+            data = PST.process_dataset(dataset_json)
+        with tracker.stage("split"):
+            X_train, X_test, y_train, y_test = PST.split_train_test(data)
+        with tracker.stage("fit"):
+            training_settings = load_training_settings()
+            store_settings = load_store_settings()
+            evaluation_settings = load_evaluation_settings()
+            resolved_params = dict(PST.resolve_model_parameters(model_params), **engine_fingerprint(training_settings))
+
+            def evaluate(model, fit_seconds):
+                return evaluate_forest(model, X_train, y_train, X_test, y_test, fit_seconds, evaluation_settings)
+
+            training = train_with_cache(X_train, y_train, model_params, resolved_params,
+                                        make_fit(PST.fit_model, training_settings), MODEL_PATH,
+                                        settings=store_settings, export=export_compact_model, evaluate=evaluate)
+        metrics.increment("training_cache", result=training["cache"])
+        evaluation = training["evaluation"]
+        if training["cache"] == "miss":
+            metrics.observe("evaluation_overhead_pct", evaluation["overhead_pct"], model=DEFAULT_MODEL)
+            if not evaluation["within_budget"]:
+                metrics.increment("evaluation_over_budget", model=DEFAULT_MODEL)
+
+        model_path, compact_model_path = artifact_paths(training["fingerprint"], store_settings["store_dir"])
+        version = register_model(DEFAULT_MODEL, "iris", [str(column) for column in X_train.columns], str(y_train.name),
+                                 model_path, compact_model_path if os.path.exists(compact_model_path) else None,
+                                 training["fingerprint"])
+        forget_fingerprints(training["removed"])
+
+    return {
+        "cache": training["cache"],
+        "fingerprint": training["fingerprint"],
+        "model": DEFAULT_MODEL,
+        "version": version,
+        "evaluation": evaluation,
+        "memory": tracker.report(),
+    }
+
+
+def training_parameters() -> dict:
+    """
+    Returns the parameters the Iris model is trained with, by `/PST` and by the retrains:
+    those of `model_parameters.json` overridden by the RandomForest parameters of the
+    Firestore snapshot, when there is one.
+
+    Returns:
+        dict: The parameters, or an empty dictionary if they are invalid.
+    """
+    return PST.merge_model_parameters(PST.load_model_parameters(MODEL_PARAMS_FILE_PATH),
+                                      parameter_sync.snapshot().data or {})
+
+
+def retrain_from_parameters():
+    """
+    Retrains the Iris model with `training_parameters()`. Scheduled by `retrain_trigger`.
+    """
+    model_params = training_parameters()
+    if not model_params:
+        metrics.increment("retrains", result="invalid_parameters")
+        return
+    try:
+        result = train_iris_model(model_params)
+        metrics.increment("retrains", result=result["cache"])
+    except Exception:
+        metrics.increment("retrains", result="error")
+
+
+def on_parameters_change(previous, snapshot):
+    if sync_settings["retrain_on_change"]:
+        retrain_trigger.schedule()
+
+
+sync_settings = load_sync_settings()
+parameter_sync = ParameterSync(sync_settings)
+retrain_trigger = DebouncedTrigger(sync_settings["retrain_debounce_seconds"], retrain_from_parameters)
+parameter_sync.add_listener(on_parameters_change)
+
+
+@router.on_event("startup")
+def start_parameter_sync():
+    parameter_sync.start()
+
+
+@router.on_event("shutdown")
+def stop_parameter_sync():
+    parameter_sync.stop()
+    retrain_trigger.cancel()
+
+
+@router.on_event("shutdown")
+def stop_training_workers():
+    shutdown_executor()
+
+
 @router.post("/PST", name="Process, split and train dataset")
+@profiled
 def process_dataset():
     """
     Processes, splits, and trains a model on the dataset. This function processes the dataset,
     splits it into training data, and trains a machine learning model.
 
+    The parameters are those of `model_parameters.json` overridden by the RandomForest
+    parameters stored in Firestore, as for the retrains that follow `/UpdateCollection`, so
+    both give the same model.
+
+    The training is skipped when the processed data, the resolved parameters and the library
+    versions are the same as for a model already in `src/models/store`: that model is
+    activated instead, with the evaluation stored when it was trained. With the opt-in
+    "sharded" engine of `src/config/training.json`, the trees are fitted in parallel worker
+    processes and merged. A compact copy of the new model, checked to give the same
+    predictions, is exported next to it.
+
+    The model is evaluated in the same pass: accuracy, per-class precision and recall and
+    confusion matrix on the held-out 20% and on the out-of-bag rows, within the time budget
+    of `src/config/evaluation.json`. The evaluation is stored with the model and served by
+    `/Evaluate`.
+
+    The model is registered in the model catalog as the active version of the "iris" model,
+    served by `/Predict` and `/Predict/iris`.
+
     Raises:
-        HTTPException: If an error occurs during the processing, splitting, or training of the dataset.
+        HTTPException: If an error occurs during the processing, splitting, or training of the dataset,
+        422 if the held-out labels include a class the model was not trained on.
     
     Returns:
-        str: A message confirming the completion of the processing, splitting, and training tasks.
+        dict: A message confirming the completion of the processing, splitting, and training tasks,
+        whether the training cache was hit, the model fingerprint and version, its evaluation and
+        the memory used by each stage.
     """
     try: 
-        dataset_df = pd.read_csv("src/data/iris/Iris.csv", header=None, index_col=0)
-        print(dataset_df.head())
-        dataset_json = dataset_df.to_json(orient="records")
-        data = PST.process_dataset(dataset_json)
-        X_train, y_train = PST.split_dataset(data)
-        PST.train_model(X_train,y_train)
-        return "PST done"
+        model_params = training_parameters()
+        if not model_params:
+            raise HTTPException(status_code=500, detail="Invalid model parameters.")
 
+        return dict({"message": "PST done"}, **train_iris_model(model_params))
+
+    except HTTPException as e:
+        raise e
+    except MemoryLimitExceeded as e:
+        raise HTTPException(status_code=507, detail=str(e))
+    except UnknownLabels as e:
+        raise HTTPException(status_code=422, detail=f"The model cannot be evaluated on this dataset: {str(e)}")
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -271,54 +760,182 @@ def process_dataset():
         )    
 
 
-@router.post("/Predict", name="Predict with Trained Model")
-def make_prediction(request: PredictionRequest):
+@router.get("/Evaluate", name="Get the evaluation of a model")
+def get_model_evaluation(model: str = Query(DEFAULT_MODEL, description="Model name"),
+                         version: Optional[str] = Query(None, description="Model version, the active one by default")):
+    """
+    Returns the evaluation stored when a model version was trained by `/PST`: held-out and
+    out-of-bag accuracy, per-class precision, recall and F1, confusion matrices, and the time
+    the evaluation added to the training. Nothing is recomputed.
+
+    Args:
+        model (str): The model name, "iris" by default.
+        version (str, optional): The model version, the active one by default.
+
+    Raises:
+        HTTPException: 404 if the model, the version or its evaluation is not found.
+
+    Returns:
+        dict: The model, its version, its fingerprint and its evaluation.
+    """
+    try:
+        version, entry = get_model_entry(model, version)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+    fingerprint = entry["versions"][version].get("fingerprint")
+    evaluation = read_evaluation(fingerprint, load_store_settings()["store_dir"]) if fingerprint else None
+    if evaluation is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No evaluation stored for version '{version}' of model '{model}', train it with /PST."
+        )
+    return {"model": model, "version": version, "fingerprint": fingerprint, "evaluation": evaluation}
+
+
+@router.get("/Models", name="List the served models")
+def list_models():
     """
-    Makes a prediction using the trained model based on the provided feature values.
+    Lists the models of the catalog (dataset, features, target, active version and versions)
+    and the models currently loaded in memory.
+
+    Returns:
+        dict: The catalog and the loaded models, the least recently used first.
+    """
+    return {
+        "models": load_catalog()["models"],
+        "loaded": model_cache.loaded(),
+        "max_cache_bytes": model_cache.max_bytes,
+    }
+
+
+@router.post("/Predict", name="Predict with Trained Model", openapi_extra=PREDICTION_OPENAPI)
+@profiled
+def make_prediction(features=Depends(read_prediction_features), accept: Optional[str] = Header(None)):
+    """
+    Makes a prediction with the active version of the Iris model, see `/Predict/{model}`.
+
+    The features are sent as JSON (`{"features": [5.1, 3.5, 1.4, 0.2]}`, or a list of rows) or,
+    for large batches, as a NPY, MessagePack or Arrow IPC matrix with the matching Content-Type.
+    The predictions are sent back in the format asked in the Accept header, JSON by default.
 
     Args:
-        request (PredictionRequest): A request containing the feature values for prediction.
+        features (np.ndarray): The feature matrix read from the request body.
+        accept (str, optional): The Accept header.
     
     Raises:
-        HTTPException: If an error occurs during the prediction process.
+        HTTPException: 422 if the rows do not have the 4 features of the model, or if an error
+        occurs during the prediction process.
     
     Returns:
         dict: A message confirming the prediction and the predicted values.
     """
-    try:
-        model = joblib.load(MODEL_PATH)
+    return predict_rows(DEFAULT_MODEL, None, features, accept)
 
-        column_names = ['sepal_length', 'sepal_width', 'petal_length', 'petal_width']
 
-        input_data = pd.DataFrame([request.features], columns=column_names)
+@router.post("/Predict/{model}", name="Predict with a model of the catalog", openapi_extra=PREDICTION_OPENAPI)
+@profiled
+def make_model_prediction(model: str, version: Optional[str] = Query(None, description="Model version, the active one by default"),
+                          features=Depends(read_prediction_features), accept: Optional[str] = Header(None)):
+    """
+    Makes a prediction with a model of the catalog (see `/Models`). The features are the columns
+    of the model's feature schema, in the same order, in any of the formats of `/Predict`.
+
+    The loaded models are kept in memory within the budget of `src/config/serving.json`; the
+    least recently used ones are evicted and loaded again on their next request.
 
-        prediction = model.predict(input_data)
-        print(prediction)
+    Args:
+        model (str): The model name.
+        version (str, optional): The model version, the active one by default.
+        features (np.ndarray): The feature matrix read from the request body.
+        accept (str, optional): The Accept header.
 
-        return {"message": "Prediction successful", "prediction": prediction.tolist()}
+    Raises:
+        HTTPException: 404 if the model is not in the catalog, or if an error occurs during the prediction.
+
+    Returns:
+        dict: A message confirming the prediction, the model version and the predicted values.
+    """
+    return predict_rows(model, version, features, accept)
 
+
+@router.websocket("/PredictStream")
+async def predict_stream(websocket: WebSocket,
+                         model: str = DEFAULT_MODEL,
+                         max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                         max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+                         max_pending: int = DEFAULT_MAX_PENDING):
+    """
+    Streams predictions over a WebSocket, for clients sending many rows per second.
+
+    Send one message per row: `{"id": "event-1", "features": [5.1, 3.5, 1.4, 0.2]}`. The rows
+    are grouped in batches of at most `max_batch_size` rows or `max_wait_ms` milliseconds,
+    predicted in one call, and answered with `{"results": [{"id": "event-1", "prediction": "Iris-setosa"}]}`.
+    Invalid rows and binary frames are answered with `{"id": ..., "error": ...}` results.
+    When more than `max_pending` rows are waiting, the server stops reading the socket until
+    the client has caught up. The three parameters are bounded by the limits of
+    `src/config/streaming.json`.
+
+    Args:
+        websocket (WebSocket): The WebSocket connection.
+        model (str): The model of the catalog, "iris" by default.
+        max_batch_size (int): The maximum number of rows predicted together.
+        max_wait_ms (float): The maximum time a row waits for its batch.
+        max_pending (int): The maximum number of rows waiting for a batch.
+    """
+    parameters = clamp_stream_parameters(streaming_settings, max_batch_size, max_wait_ms, max_pending)
+    await websocket.accept()
+    try:
+        loaded_model, entry = await run_in_threadpool(load_catalog_model, model, None, parameters["max_batch_size"])
     except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"An error occurred during prediction: {str(e)}"
-        )
+        await websocket.close(code=1011, reason=f"An error occurred while loading the model: {getattr(e, 'detail', str(e))}")
+        return
+
+    def predict_batch(matrix):
+        start = time.perf_counter()
+        prediction = loaded_model.predict(pd.DataFrame(matrix, columns=entry["features"]))
+        metrics.observe("predict_latency_seconds", time.perf_counter() - start, model=model)
+        metrics.increment("predicted_rows", len(matrix), model=model)
+        return prediction
+
+    await stream_predictions(websocket, predict_batch, len(entry["features"]), **parameters)
 
 
 @router.get("/SeeCollection", name="See firestore collection parameters")
-def get_parameters_collection():
+def get_parameters_collection(response: Response):
     """
     Retrieves collection parameters stored in Firestore.
 
+    The parameters are read from the in-memory snapshot kept up to date by the Firestore
+    listener (or by polling, see `src/config/parameter_sync.json`); Firestore is only read
+    when no snapshot has been received yet or when the sync is off. The snapshot version is
+    in the `X-Parameters-Version` header.
+
+    Raises:
+        HTTPException: If the parameters are not found.
+
     Returns:
         dict: A list of parameters stored in Firestore.
     """
-    return get_parameters()
+    snapshot = parameter_sync.snapshot()
+    if snapshot.version == 0 or parameter_sync.mode == "off":
+        read_at = time.monotonic()
+        parameter_sync.apply(get_parameters(), "read", read_at)
+        snapshot = parameter_sync.snapshot()
+
+    if not snapshot.exists:
+        raise HTTPException(status_code=404, detail="Parameters not found.")
+
+    response.headers["X-Parameters-Version"] = str(snapshot.version)
+    return snapshot.data
 
 
 @router.put("/UpdateCollection", name="Update parameters in Firestore")
 def update_parameters_endpoint(request: ParametersRequest):
     """
     Updates collection parameters in Firestore with the new parameters provided in the request.
+    The in-memory snapshot is updated with the written document. With `retrain_on_change`,
+    the model is retrained once the updates have stopped for `retrain_debounce_seconds`.
 
     Args:
         request (ParametersRequest): A request containing the parameters to update in Firestore.
@@ -328,13 +945,17 @@ def update_parameters_endpoint(request: ParametersRequest):
 
     Example : {"params": {"criterion":"gini"}}    
     """
-    return update_parameters(request.params)
+    result = update_parameters(request.params)
+    if "response" in result:
+        parameter_sync.apply(result["response"], "write")
+    return result
 
 
 @router.post("/AddCollection", name="Add new parameters to Firestore")
 def add_parameters_endpoint(request: ParametersRequest):
     """
-    Adds new collection parameters to Firestore.
+    Adds new collection parameters to Firestore. Like `/UpdateCollection`, the in-memory
+    snapshot is updated with the written document.
 
     Args:
         request (ParametersRequest): A request containing the parameters to add to Firestore.
@@ -344,4 +965,6 @@ def add_parameters_endpoint(request: ParametersRequest):
 
     Example : {"params": {"n_samples":20}}        
     """
-    return add_parameters(request.params)
+    result = add_parameters(request.params)
+    parameter_sync.apply(result.pop("parameters"), "write")
+    return result
@@ -2,6 +2,7 @@ from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 
 from src.api.router import router
+from src.services.profiling import ProfilingMiddleware, load_profiling_settings
 
 
 def get_application() -> FastAPI:
@@ -20,5 +21,9 @@ def get_application() -> FastAPI:
         allow_headers=["*"],
     )
 
+    profiling_settings = load_profiling_settings()
+    if profiling_settings.enabled:
+        application.add_middleware(ProfilingMiddleware, settings=profiling_settings)
+
     application.include_router(router)
     return application
@@ -6,6 +6,7 @@ from sklearn.ensemble import RandomForestClassifier
 
 MODEL_SAVE_PATH = "src/models/random_forest_model.pkl"
 PARAMETERS_FILE_PATH = "src/config/model_parameters.json"
+RUNTIME_PARAMETERS = ("n_jobs", "verbose")
 
 def process_dataset(dataset_json: str) -> pd.DataFrame:
     """
@@ -34,14 +35,23 @@ def process_dataset(dataset_json: str) -> pd.DataFrame:
     except Exception as e:
         raise ValueError(f"Error processing the dataset: {str(e)}")
 
-def split_dataset(iris_df):
+def split_train_test(iris_df):
     """
-    Splits the Iris dataset into training and test sets and returns them.
+    Splits the Iris dataset into training and test sets.
+
+    Returns:
+        tuple: X_train, X_test, y_train, y_test.
     """
     numeric_columns = ['sepal_length', 'sepal_width', 'petal_length', 'petal_width']
     X = iris_df[numeric_columns]
     y = iris_df['species'].astype('category')
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    return train_test_split(X, y, test_size=0.2, random_state=42)
+
+def split_dataset(iris_df):
+    """
+    Splits the Iris dataset into training and test sets and returns the training set.
+    """
+    X_train, X_test, y_train, y_test = split_train_test(iris_df)
     return X_train, y_train
 
 def load_model_parameters(file_path: str):
@@ -58,15 +68,80 @@ def load_model_parameters(file_path: str):
         with open(file_path, 'r') as f:
             params = json.load(f)
         
-        if isinstance(params.get("n_estimators", None), int) and \
-           isinstance(params.get("max_depth", None), (int, type(None))) and \
-           isinstance(params.get("max_features", None), (str, int, float)):
-            return params
-        else:
-            return {}
+        return validate_model_parameters(params)
     except Exception as e:
         return {}
 
+def validate_model_parameters(params: dict) -> dict:
+    """
+    Checks the types of the main RandomForest parameters.
+
+    Args:
+        params (dict): The parameters.
+
+    Returns:
+        dict: The parameters, or an empty dictionary if they are invalid.
+    """
+    if isinstance(params.get("n_estimators", None), int) and \
+       isinstance(params.get("max_depth", None), (int, type(None))) and \
+       isinstance(params.get("max_features", None), (str, int, float, type(None))) and \
+       isinstance(params.get("n_jobs", None), (int, type(None))):
+        return params
+    return {}
+
+def merge_model_parameters(base_params: dict, overrides: dict) -> dict:
+    """
+    Overrides parameters with the RandomForest parameters of another source (the Firestore
+    document), ignoring its other keys.
+
+    Args:
+        base_params (dict): The parameters from the JSON file.
+        overrides (dict): The parameters taking precedence.
+
+    Returns:
+        dict: The validated parameters, or an empty dictionary if they are invalid.
+    """
+    known = RandomForestClassifier().get_params()
+    return validate_model_parameters(dict(base_params, **{key: value for key, value in overrides.items() if key in known}))
+
+def resolve_model_parameters(model_params: dict) -> dict:
+    """
+    Returns all the parameters of the RandomForest, the defaults of the installed
+    scikit-learn included, so that two equivalent parameter sets compare equal. The
+    parameters that do not change the fitted forest (`RUNTIME_PARAMETERS`: the number of
+    jobs and the verbosity) are left out, so changing them does not force a refit.
+
+    Args:
+        model_params (dict): The parameters from the JSON file.
+
+    Returns:
+        dict: The resolved parameters.
+    """
+    params = RandomForestClassifier(**model_params).get_params()
+    return {key: value for key, value in params.items() if key not in RUNTIME_PARAMETERS}
+
+def fit_model(X_train, y_train, model_params: dict):
+    """
+    Fits a RandomForest model with the given parameters.
+
+    Args:
+        X_train (DataFrame): Training data (features).
+        y_train (Series): Training labels (target).
+        model_params (dict): The RandomForest parameters.
+
+    Returns:
+        RandomForestClassifier: The fitted model.
+
+    Raises:
+        ValueError: If the features and labels have different lengths.
+    """
+    if len(X_train) != len(y_train):
+        raise ValueError("X_train and y_train must have the same number of rows.")
+
+    model = RandomForestClassifier(**model_params)
+    model.fit(X_train, y_train)
+    return model
+
 def train_model(X_train, y_train):
     """
     Trains a RandomForest model using parameters defined in the JSON file.
@@ -74,6 +149,9 @@ def train_model(X_train, y_train):
     Args:
         X_train (DataFrame): Training data (features).
         y_train (Series): Training labels (target).
+
+    Returns:
+        RandomForestClassifier: The saved model, or None if the training failed.
     """
     model_params = load_model_parameters(PARAMETERS_FILE_PATH)
 
@@ -81,16 +159,12 @@ def train_model(X_train, y_train):
         return
 
     try:
-        model = RandomForestClassifier(**model_params)
-
-        if len(X_train) != len(y_train):
-            return
-        
-        model.fit(X_train, y_train)
+        model = fit_model(X_train, y_train, model_params)
 
         if not os.path.exists(os.path.dirname(MODEL_SAVE_PATH)):
             os.makedirs(os.path.dirname(MODEL_SAVE_PATH))
 
         joblib.dump(model, MODEL_SAVE_PATH)
+        return model
     except Exception as e:
         pass
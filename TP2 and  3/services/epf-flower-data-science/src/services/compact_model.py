@@ -0,0 +1,230 @@
+import numpy as np
+
+COMPACT_FORMAT_VERSION = 1
+
+
+def _narrow_int_dtype(max_value: int, signed: bool = False):
+    for dtype in ((np.int8, np.int16, np.int32, np.int64) if signed else (np.uint8, np.uint16, np.uint32, np.uint64)):
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+    raise ValueError(f"{max_value} does not fit in a 64 bits integer.")
+
+
+def _float32_thresholds(thresholds: np.ndarray) -> np.ndarray:
+    """
+    Converts thresholds to the largest float32 lower or equal to them. The trees compare float32
+    features, so `x <= float32 threshold` then gives the same branch as `x <= float64 threshold`.
+    """
+    rounded = thresholds.astype(np.float32)
+    too_high = rounded.astype(np.float64) > thresholds
+    rounded[too_high] = np.nextafter(rounded[too_high], np.float32(-np.inf))
+    return rounded
+
+
+class CompactForest:
+    """
+    A RandomForestClassifier reduced to flat NumPy arrays for a small artifact and a fast load.
+
+    All the trees share one node table: float32 thresholds, the smallest integer types for
+    the feature and child indexes, and a table of the distinct leaf probabilities. Identical
+    subtrees (within a tree or between trees) are stored once, and splits whose two branches
+    are identical are removed. The predictions are the ones of the original forest.
+
+    Build it with `CompactForest.from_forest(model)`, then `save` / `load` it.
+    """
+
+    def __init__(self, classes, feature, threshold, left, right, leaf_value, values, roots, feature_names=None):
+        self.classes_ = np.asarray(classes)
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.leaf_value = leaf_value
+        self.values = values
+        self.roots = roots
+        self.feature_names_in_ = None if feature_names is None else np.asarray(feature_names, dtype=object)
+        self.n_features_in_ = None if feature_names is None else len(feature_names)
+
+    @classmethod
+    def from_forest(cls, forest) -> "CompactForest":
+        """
+        Exports a fitted RandomForestClassifier (single output).
+
+        Args:
+            forest (RandomForestClassifier): The fitted forest.
+
+        Returns:
+            CompactForest: The compact forest.
+        """
+        node_ids = {}
+        value_ids = {}
+        nodes = []
+        values = []
+
+        def leaf_value_id(value_row):
+            normalizer = value_row.sum()
+            probabilities = value_row / (normalizer if normalizer != 0.0 else 1.0)
+            key = probabilities.tobytes()
+            if key not in value_ids:
+                value_ids[key] = len(values)
+                values.append(probabilities)
+            return value_ids[key]
+
+        def node_id(key):
+            if key not in node_ids:
+                node_ids[key] = len(nodes)
+                nodes.append(key)
+            return node_ids[key]
+
+        roots = []
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            thresholds = _float32_thresholds(tree.threshold)
+            canonical = np.empty(tree.node_count, dtype=np.int64)
+            # Children always have a larger index than their parent, so going backwards
+            # visits both children before the node itself.
+            for index in range(tree.node_count - 1, -1, -1):
+                left, right = tree.children_left[index], tree.children_right[index]
+                if left == -1:
+                    canonical[index] = node_id(("leaf", leaf_value_id(tree.value[index, 0])))
+                elif canonical[left] == canonical[right]:
+                    canonical[index] = canonical[left]
+                else:
+                    canonical[index] = node_id(("split", int(tree.feature[index]), thresholds[index].tobytes(),
+                                                int(canonical[left]), int(canonical[right])))
+            roots.append(canonical[0])
+
+        n_nodes = len(nodes)
+        index_dtype = _narrow_int_dtype(n_nodes)
+        feature = np.full(n_nodes, -1, dtype=_narrow_int_dtype(forest.n_features_in_, signed=True))
+        threshold = np.zeros(n_nodes, dtype=np.float32)
+        left = np.arange(n_nodes, dtype=index_dtype)
+        right = np.arange(n_nodes, dtype=index_dtype)
+        leaf_value = np.zeros(n_nodes, dtype=_narrow_int_dtype(len(values)))
+        for index, key in enumerate(nodes):
+            if key[0] == "leaf":
+                leaf_value[index] = key[1]
+            else:
+                feature[index] = key[1]
+                threshold[index] = np.frombuffer(key[2], dtype=np.float32)[0]
+                left[index], right[index] = key[3], key[4]
+
+        return cls(
+            classes=forest.classes_,
+            feature=feature,
+            threshold=threshold,
+            left=left,
+            right=right,
+            leaf_value=leaf_value,
+            values=np.asarray(values, dtype=np.float64),
+            roots=np.asarray(roots, dtype=index_dtype),
+            feature_names=getattr(forest, "feature_names_in_", None),
+        )
+
+    def _leaves(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if np.isnan(X).any():
+            raise ValueError("Input contains NaN.")
+
+        n_samples = X.shape[0]
+        nodes = np.repeat(self.roots.astype(np.intp), n_samples)
+        samples = np.tile(np.arange(n_samples, dtype=np.intp), len(self.roots))
+        active = np.flatnonzero(self.feature[nodes] >= 0)
+        while active.size:
+            current = nodes[active]
+            go_left = X[samples[active], self.feature[current]] <= self.threshold[current]
+            current = np.where(go_left, self.left[current], self.right[current])
+            nodes[active] = current
+            active = active[self.feature[current] >= 0]
+        return nodes.reshape(len(self.roots), n_samples)
+
+    def predict_proba(self, X) -> np.ndarray:
+        """
+        Returns the class probabilities, averaged over the trees in the same order as scikit-learn.
+        """
+        leaves = self.leaf_value[self._leaves(X)]
+        probabilities = np.zeros((leaves.shape[1], self.values.shape[1]), dtype=np.float64)
+        for tree_leaves in leaves:
+            probabilities += self.values[tree_leaves]
+        probabilities /= len(self.roots)
+        return probabilities
+
+    def predict(self, X) -> np.ndarray:
+        """
+        Returns the predicted classes.
+        """
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in (self.feature, self.threshold, self.left, self.right,
+                                              self.leaf_value, self.values, self.roots))
+
+    def save(self, path: str, compress: bool = False):
+        """
+        Writes the forest as a `.npz` file, optionally compressed.
+        """
+        arrays = {
+            "format_version": np.array(COMPACT_FORMAT_VERSION),
+            "classes": self.classes_.astype(str) if self.classes_.dtype == object else self.classes_,
+            "feature": self.feature,
+            "threshold": self.threshold,
+            "left": self.left,
+            "right": self.right,
+            "leaf_value": self.leaf_value,
+            "values": self.values,
+            "roots": self.roots,
+        }
+        if self.feature_names_in_ is not None:
+            arrays["feature_names"] = self.feature_names_in_.astype(str)
+        with open(path, "wb") as file:
+            (np.savez_compressed if compress else np.savez)(file, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "CompactForest":
+        """
+        Reads a forest written by `save`.
+
+        Raises:
+            ValueError: If the file was written by another version of the format.
+        """
+        with np.load(path, allow_pickle=False) as arrays:
+            if int(arrays["format_version"]) != COMPACT_FORMAT_VERSION:
+                raise ValueError(f"Unsupported compact model format {int(arrays['format_version'])}.")
+            return cls(
+                classes=arrays["classes"],
+                feature=arrays["feature"],
+                threshold=arrays["threshold"],
+                left=arrays["left"],
+                right=arrays["right"],
+                leaf_value=arrays["leaf_value"],
+                values=arrays["values"],
+                roots=arrays["roots"],
+                feature_names=arrays["feature_names"].tolist() if "feature_names" in arrays.files else None,
+            )
+
+
+def export_compact_model(forest, X_check, path: str, compress: bool = False) -> CompactForest:
+    """
+    Exports a fitted forest in the compact format after checking that it gives the same
+    predictions on `X_check`.
+
+    Args:
+        forest (RandomForestClassifier): The fitted forest.
+        X_check (DataFrame or array): Rows used to compare the predictions (the training data).
+        path (str): The `.npz` file to write.
+        compress (bool): Whether to compress the file.
+
+    Returns:
+        CompactForest: The exported forest.
+
+    Raises:
+        ValueError: If the predictions of the compact forest differ.
+    """
+    compact = CompactForest.from_forest(forest)
+    if not np.array_equal(compact.predict(X_check), forest.predict(X_check)):
+        raise ValueError("The compact model does not give the same predictions as the forest.")
+    compact.save(path, compress=compress)
+    return compact
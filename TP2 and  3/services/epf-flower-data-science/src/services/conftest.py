@@ -0,0 +1,9 @@
+import sys
+from pathlib import Path
+
+# The services import each other as `src.services.<module>`, like the app does; the tests import
+# the module they test by its bare name. Putting the service folder on the path lets both work
+# when pytest is run from this folder as well as from the service folder.
+SERVICE_DIR = str(Path(__file__).resolve().parents[2])
+if SERVICE_DIR not in sys.path:
+    sys.path.insert(0, SERVICE_DIR)
@@ -0,0 +1,210 @@
+import json, os, time
+from typing import Optional
+
+import numpy as np
+
+EVALUATION_CONFIG_PATH = "src/config/evaluation.json"
+
+
+def load_evaluation_settings(config_file_path: str = EVALUATION_CONFIG_PATH) -> dict:
+    """
+    Loads the evaluation settings.
+
+    Returns:
+        dict: `oob` (whether the out-of-bag scores are computed) and `budget_pct` (the
+        maximum evaluation time, in percent of the fit time).
+    """
+    settings = {"oob": True, "budget_pct": 10.0}
+    if os.path.exists(config_file_path):
+        with open(config_file_path, "r") as file:
+            settings.update(json.load(file))
+    return settings
+
+
+class UnknownLabels(ValueError):
+    """
+    Raised when labels to evaluate are not classes of the model, e.g. a class only present
+    in the held-out rows.
+    """
+
+    def __init__(self, labels: list):
+        self.labels = labels
+        super().__init__(f"Labels not known to the model: {', '.join(labels)}.")
+
+
+def classification_metrics(y_true, y_pred, classes) -> dict:
+    """
+    Computes the accuracy, the per-class precision, recall and F1 and the confusion matrix,
+    with one `bincount` over the (true, predicted) class index pairs.
+
+    Args:
+        y_true (array): The true labels.
+        y_pred (array): The predicted labels.
+        classes (array): The labels of the model, in the order of the matrix.
+
+    Raises:
+        UnknownLabels: If a true or predicted label is not in `classes`.
+
+    Returns:
+        dict: `accuracy`, `per_class` ({label: precision, recall, f1, support}) and
+        `confusion_matrix` (rows are the true labels, columns the predicted ones).
+    """
+    classes = np.asarray(classes)
+    y_true, y_pred = np.asarray(y_true), np.asarray(y_pred)
+    unknown = [labels[~np.isin(labels, classes)] for labels in (y_true, y_pred)]
+    if any(labels.size for labels in unknown):
+        raise UnknownLabels(sorted({str(label) for labels in unknown for label in labels}))
+
+    n_classes = len(classes)
+    order = np.argsort(classes)
+    true_index = order[np.searchsorted(classes, y_true, sorter=order)]
+    pred_index = order[np.searchsorted(classes, y_pred, sorter=order)]
+    confusion = np.bincount(true_index * n_classes + pred_index, minlength=n_classes ** 2).reshape(n_classes, n_classes)
+
+    correct = np.diag(confusion)
+    support = confusion.sum(axis=1)
+    predicted = confusion.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(predicted > 0, correct / predicted, 0.0)
+        recall = np.where(support > 0, correct / support, 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+
+    labels = [str(label) for label in classes]
+    return {
+        "accuracy": float(correct.sum() / max(confusion.sum(), 1)),
+        "per_class": {
+            label: {"precision": float(precision[i]), "recall": float(recall[i]), "f1": float(f1[i]), "support": int(support[i])}
+            for i, label in enumerate(labels)
+        },
+        "confusion_matrix": {"labels": labels, "matrix": confusion.tolist()},
+    }
+
+
+def _n_samples_bootstrap(forest, n_samples: int) -> int:
+    if getattr(forest, "_n_samples_bootstrap", None):
+        return forest._n_samples_bootstrap
+    max_samples = forest.max_samples
+    if max_samples is None:
+        return n_samples
+    if isinstance(max_samples, int):
+        return max_samples
+    return max(round(n_samples * max_samples), 1)
+
+
+def forest_pass(forest, X_train, X_test, oob: bool = True, deadline: Optional[float] = None) -> dict:
+    """
+    Predicts the held-out rows and the out-of-bag training rows in one pass over the trees.
+    Each training row is predicted by the trees whose bootstrap sample did not contain it;
+    the bootstrap samples are drawn again from the `random_state` of each tree, so this also
+    works on forests merged from shards, which have no `oob_decision_function_`.
+
+    Args:
+        forest (RandomForestClassifier): The fitted forest (without sample weights).
+        X_train (DataFrame or array): The training data the forest was fitted on.
+        X_test (DataFrame or array): The held-out data.
+        oob (bool): Whether the out-of-bag predictions are computed.
+        deadline (float, optional): A `time.perf_counter()` value after which the out-of-bag
+            predictions stop; the held-out ones are always completed.
+
+    Returns:
+        dict: `test` (the averaged class probabilities of the held-out rows), `oob` (the
+        class probabilities of the training rows summed over the trees, and the number of trees
+        predicting each row), or None if they are not computed, the forest has no bootstrap or
+        the deadline passed.
+    """
+    X_train = np.ascontiguousarray(X_train, dtype=np.float32)
+    X_test = np.ascontiguousarray(X_test, dtype=np.float32).reshape(-1, X_train.shape[1])
+    n_samples, n_test = X_train.shape[0], X_test.shape[0]
+    n_classes = len(forest.classes_)
+    oob = oob and forest.bootstrap and getattr(forest, "_sample_weight", None) is None
+    n_samples_bootstrap = _n_samples_bootstrap(forest, n_samples) if oob else 0
+
+    test_probabilities = np.zeros((n_test, n_classes), dtype=np.float64)
+    oob_probabilities = np.zeros((n_samples, n_classes), dtype=np.float64)
+    counts = np.zeros(n_samples, dtype=np.int64)
+    # Reseeding one generator draws the same indexes as scikit-learn's RandomState(seed),
+    # for a fraction of the cost of creating a generator per tree.
+    generator = np.random.RandomState()
+
+    for estimator in forest.estimators_:
+        if oob and deadline is not None and time.perf_counter() > deadline:
+            oob = False
+        unsampled = np.empty(0, dtype=np.intp)
+        if oob:
+            generator.seed(estimator.random_state)
+            sampled = generator.randint(0, n_samples, n_samples_bootstrap)
+            unsampled = np.flatnonzero(np.bincount(sampled, minlength=n_samples) == 0)
+        rows = np.concatenate([X_test, X_train[unsampled]]) if unsampled.size else X_test
+        if not len(rows):
+            continue
+        probabilities = estimator.predict_proba(rows, check_input=False)
+        test_probabilities += probabilities[:n_test]
+        if unsampled.size:
+            oob_probabilities[unsampled] += probabilities[n_test:]
+            counts[unsampled] += 1
+
+    return {
+        "test": test_probabilities / max(len(forest.estimators_), 1),
+        "oob": (oob_probabilities, counts) if oob else None,
+    }
+
+
+def evaluate_forest(forest, X_train, y_train, X_test, y_test, fit_seconds: float,
+                    settings: Optional[dict] = None) -> dict:
+    """
+    Evaluates a freshly fitted forest in one pass over its trees (see `forest_pass`): metrics
+    on the held-out rows and, if the time budget allows it, on the out-of-bag training rows.
+
+    The budget is `budget_pct` percent of `fit_seconds`. The held-out metrics are always
+    computed; the out-of-bag ones are reported as skipped when they would exceed the budget.
+
+    Args:
+        forest (RandomForestClassifier): The fitted forest.
+        X_train (DataFrame): Training data (features).
+        y_train (Series): Training labels (target).
+        X_test (DataFrame): Held-out data (features).
+        y_test (Series): Held-out labels (target).
+        fit_seconds (float): The fit time of the forest.
+        settings (dict, optional): The evaluation settings, read from the JSON file by default.
+
+    Returns:
+        dict: `holdout` and `oob` metrics (see `classification_metrics`, `oob` also has the
+        `coverage` of the training rows, or a `skipped` reason), `fit_seconds`,
+        `evaluation_seconds`, `overhead_pct`, `budget_pct` and `within_budget`.
+    """
+    settings = settings or load_evaluation_settings()
+    start = time.perf_counter()
+    deadline = start + fit_seconds * settings["budget_pct"] / 100
+
+    predictions = forest_pass(forest, X_train, X_test, settings["oob"], deadline)
+
+    holdout = None
+    if len(X_test):
+        predicted = forest.classes_.take(np.argmax(predictions["test"], axis=1), axis=0)
+        holdout = classification_metrics(y_test, predicted, forest.classes_)
+        holdout["rows"] = int(len(X_test))
+
+    if not settings["oob"]:
+        oob = {"skipped": "disabled"}
+    elif not forest.bootstrap:
+        oob = {"skipped": "no bootstrap"}
+    elif predictions["oob"] is None:
+        oob = {"skipped": "over budget"}
+    else:
+        probabilities, counts = predictions["oob"]
+        covered = counts > 0
+        predicted = forest.classes_.take(np.argmax(probabilities[covered], axis=1), axis=0)
+        oob = classification_metrics(np.asarray(y_train)[covered], predicted, forest.classes_)
+        oob["coverage"] = float(covered.mean())
+
+    evaluation_seconds = time.perf_counter() - start
+    overhead_pct = 100 * evaluation_seconds / fit_seconds if fit_seconds > 0 else 0.0
+    return {
+        "holdout": holdout,
+        "oob": oob,
+        "fit_seconds": fit_seconds,
+        "evaluation_seconds": evaluation_seconds,
+        "overhead_pct": overhead_pct,
+        "budget_pct": settings["budget_pct"],
+        "within_budget": overhead_pct <= settings["budget_pct"],
+    }
@@ -79,7 +79,8 @@ def add_parameters(params: dict):
         params (dict): A dictionary of parameters to be added to Firestore.
         
     Returns:
-        dict: A message indicating whether parameters were added or already exist.
+        dict: A message indicating whether parameters were added or already exist, and the
+        parameters written.
         
     Raises:
         HTTPException: If there is an error adding the parameters to Firestore.
@@ -104,6 +105,6 @@ def add_parameters(params: dict):
 
         doc_ref.set(current_params, merge=True)
 
-        return {"message": "Parameters processed.", "response": response}
+        return {"message": "Parameters processed.", "response": response, "parameters": current_params}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error adding parameters: {e}")
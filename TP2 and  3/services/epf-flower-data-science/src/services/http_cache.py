@@ -0,0 +1,248 @@
+import gzip, hashlib, json, os, threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from fastapi import Request, Response
+
+from src.services import metrics
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+HTTP_CACHE_CONFIG_PATH = "src/config/http_cache.json"
+IDENTITY = "identity"
+
+_digest_lock = threading.Lock()
+_digests = {}
+
+
+def load_http_cache_settings(config_file_path: str = HTTP_CACHE_CONFIG_PATH) -> dict:
+    """
+    Loads the response compression and caching settings.
+
+    Returns:
+        dict: `min_compress_bytes` (smaller bodies are sent uncompressed), `gzip_level`,
+        `brotli_quality`, `zstd_level`, `encodings` (the content codings offered, preferred
+        first) and `cache_bytes` (memory budget of the cached response bodies).
+    """
+    settings = {
+        "min_compress_bytes": 1024,
+        "gzip_level": 6,
+        "brotli_quality": 5,
+        "zstd_level": 3,
+        "encodings": ["br", "zstd", "gzip"],
+        "cache_bytes": 64 * 1024 * 1024,
+    }
+    if os.path.exists(config_file_path):
+        with open(config_file_path, "r") as file:
+            settings.update(json.load(file))
+    return settings
+
+
+def available_encodings(settings: dict) -> list:
+    """
+    Returns the configured content codings whose library is installed. gzip only needs the
+    standard library, brotli needs `brotli` and zstd needs `zstandard`.
+    """
+    installed = {"gzip": True, "br": brotli is not None, "zstd": zstandard is not None}
+    return [encoding for encoding in settings["encodings"] if installed.get(encoding)]
+
+
+def file_digest(path) -> str:
+    """
+    Returns the sha256 of a file. The digest is kept until the size or the modification time
+    of the file changes, so an unchanged file is only read once.
+    """
+    stat = os.stat(path)
+    key = (str(path), stat.st_size, stat.st_mtime_ns)
+    with _digest_lock:
+        if key in _digests:
+            return _digests[key]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+
+    with _digest_lock:
+        for stale in [cached for cached in _digests if cached[0] == key[0]]:
+            del _digests[stale]
+        _digests[key] = digest.hexdigest()
+        return _digests[key]
+
+
+def strong_etag(*parts) -> str:
+    """
+    Builds a strong ETag from the version of the content (a file digest) and what selects
+    the representation (route, query, media type).
+    """
+    digest = hashlib.sha256("\0".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """
+    Returns the ETag of a compressed representation, `"<etag>-<encoding>"`, so that each
+    content coding has its own strong validator.
+    """
+    return etag if encoding == IDENTITY else f'{etag[:-1]}-{encoding}"'
+
+
+def not_modified(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Checks an If-None-Match header against an ETag, ignoring the content coding suffix and
+    the weak prefix (If-None-Match uses the weak comparison).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip().removeprefix("W/")
+        for encoding in ("gzip", "br", "zstd"):
+            suffix = f'-{encoding}"'
+            if candidate.endswith(suffix):
+                candidate = candidate[:-len(suffix)] + '"'
+        if candidate == etag:
+            return True
+    return False
+
+
+def negotiate_encoding(accept_encoding: Optional[str], available: list) -> str:
+    """
+    Picks the content coding from an Accept-Encoding header: the available one with the
+    highest q-value, ties going to the order of `available`. Identity when none is accepted.
+    """
+    if not accept_encoding:
+        return IDENTITY
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, *params = [part.strip() for part in item.split(";")]
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        accepted[name.lower()] = q
+
+    best, best_q = IDENTITY, 0.0
+    for encoding in available:
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str, settings: dict) -> bytes:
+    """
+    Compresses a body with a content coding.
+    """
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=settings["gzip_level"], mtime=0)
+    if encoding == "br":
+        return brotli.compress(body, quality=settings["brotli_quality"])
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=settings["zstd_level"]).compress(body)
+    return body
+
+
+class BodyCache:
+    """
+    Keeps rendered and compressed response bodies, keyed by ETag and content coding, within
+    a byte budget; the least recently used bodies are removed first. Only bodies whose ETag
+    identifies an immutable content (a dataset digest) belong here.
+
+    Args:
+        max_bytes (int): The memory budget of the bodies.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._bodies = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, etag: str, encoding: str) -> Optional[bytes]:
+        with self._lock:
+            body = self._bodies.get((etag, encoding))
+            if body is not None:
+                self._bodies.move_to_end((etag, encoding))
+            return body
+
+    def put(self, etag: str, encoding: str, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._bodies.pop((etag, encoding), None)
+            self.total_bytes -= len(previous) if previous is not None else 0
+            self._bodies[(etag, encoding)] = body
+            self.total_bytes += len(body)
+            while self.total_bytes > self.max_bytes:
+                _, removed = self._bodies.popitem(last=False)
+                self.total_bytes -= len(removed)
+
+
+def render_json(content) -> bytes:
+    """
+    Serializes a JSON body exactly like FastAPI's JSONResponse.
+    """
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def conditional_response(request: Request, route: str, etag: str, media_type: str, render: Callable[[], bytes],
+                         settings: dict, cache: Optional[BodyCache] = None, vary: str = "Accept-Encoding",
+                         headers: Optional[dict] = None) -> Response:
+    """
+    Answers a GET with a 304 when the client already has the representation, or with the
+    body, compressed when it is large enough and the client accepts a coding.
+
+    Args:
+        request (Request): The request, for If-None-Match and Accept-Encoding.
+        route (str): The route name used in the metrics.
+        etag (str): The strong ETag of the uncompressed representation.
+        media_type (str): The media type of the body.
+        render (callable): Returns the uncompressed body; not called for a 304 or a cached body.
+        settings (dict): The compression settings.
+        cache (BodyCache, optional): Where the bodies of immutable representations are kept.
+        vary (str): The Vary header.
+        headers (dict, optional): Additional headers of a 200 response.
+
+    Returns:
+        Response: The 304 or 200 response.
+    """
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"), available_encodings(settings))
+
+    if not_modified(request.headers.get("if-none-match"), etag):
+        metrics.increment("conditional_requests", route=route, result="not_modified")
+        return Response(status_code=304, headers={"ETag": encoded_etag(etag, encoding), "Vary": vary})
+
+    body = cache.get(etag, encoding) if cache is not None else None
+    metrics.increment("conditional_requests", route=route, result="cached" if body is not None else "rendered")
+    if body is None:
+        raw = cache.get(etag, IDENTITY) if cache is not None else None
+        if raw is None:
+            raw = render()
+            if cache is not None:
+                cache.put(etag, IDENTITY, raw)
+        if len(raw) < settings["min_compress_bytes"]:
+            encoding = IDENTITY
+        body = compress(raw, encoding, settings)
+        if cache is not None and encoding != IDENTITY:
+            cache.put(etag, encoding, body)
+        if encoding != IDENTITY:
+            metrics.increment("compressed_bytes_saved", len(raw) - len(body), route=route, encoding=encoding)
+
+    response_headers = dict(headers or {}, ETag=encoded_etag(etag, encoding), Vary=vary)
+    response_headers["Cache-Control"] = "no-cache"
+    if encoding != IDENTITY:
+        response_headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=media_type, headers=response_headers)
@@ -1,5 +1,5 @@
 import pandas as pd
-import os
+import json, os, shutil, tempfile, threading, time
 from pathlib import Path
 from fastapi import HTTPException
 os.environ["KAGGLE_CONFIG_DIR"] = "src/config"
@@ -7,48 +7,206 @@ from kaggle.api.kaggle_api_extended import KaggleApi
 
 DATA_DIR = 'src/data/'  
 CONFIG_FILE_PATH = 'src/config/config.json'  
+DOWNLOAD_CONFIG_PATH = 'src/config/download.json'
+DOWNLOAD_FILE_NAME = '.download.json'
 
-def download_kaggle_dataset(url: str):
+_dataset_locks_lock = threading.Lock()
+_dataset_locks = {}
+_downloaded_at = {}
+
+def load_download_settings(config_file_path: str = DOWNLOAD_CONFIG_PATH) -> dict:
     """
-    Downloads a Kaggle dataset from the specified URL, extracts the files, 
-    and returns the data as a JSON object.
+    Loads the dataset download settings.
+
+    Returns:
+        dict: `max_age_seconds`, how long a downloaded dataset is used before `/Load`
+        downloads it again (0 downloads on every request).
+    """
+    settings = {"max_age_seconds": 3600}
+    if os.path.exists(config_file_path):
+        with open(config_file_path, "r") as file:
+            settings.update(json.load(file))
+    return settings
+
+
+def dataset_directory(url: str) -> Path:
+    """
+    Returns the folder of a Kaggle dataset, `src/data/<dataset name>`.
+
+    Args:
+    - url (str): The URL of the Kaggle dataset.
+
+    Returns:
+    - Path: The folder where the dataset is downloaded.
+    """
+    return Path(DATA_DIR) / url.split('/')[-1]
+
+
+def dataset_lock(destination: Path) -> threading.Lock:
+    """
+    Returns the lock serializing the downloads and the writes of a dataset folder.
+
+    Args:
+    - destination (Path): The dataset folder.
+
+    Returns:
+    - threading.Lock: The lock of the folder, the same for every caller.
+    """
+    key = os.path.abspath(destination)
+    with _dataset_locks_lock:
+        return _dataset_locks.setdefault(key, threading.Lock())
+
+
+def find_csv_file(destination: Path):
+    """
+    Returns the first CSV file of a dataset folder, or None if there is none.
+    """
+    return next((file for file in sorted(Path(destination).glob("*.csv"))), None)
+
+
+def appended_rows_path(csv_file: Path) -> Path:
+    """
+    Returns the file keeping the rows appended to a dataset CSV, `.<csv name>.appended`.
+    """
+    return Path(csv_file).with_name(f".{Path(csv_file).name}.appended")
+
+
+def append_to_dataset(csv_file: Path, rows: pd.DataFrame):
+    """
+    Appends rows to a dataset CSV, and keeps them in its appended rows file so that they are
+    added again to the file of the next download. The caller holds `dataset_lock`.
+
+    Args:
+    - csv_file (Path): The dataset CSV.
+    - rows (pd.DataFrame): The rows, with the columns of the CSV in the same order.
+    """
+    rows.to_csv(csv_file, mode="a", header=False, index=False)
+    rows.to_csv(appended_rows_path(csv_file), mode="a", header=False, index=False)
+
+
+def _reapply_appended_rows(downloaded: Path, target: Path):
+    appended = appended_rows_path(target)
+    if not appended.exists():
+        return
+    with open(downloaded, "rb+") as file:
+        file.seek(0, os.SEEK_END)
+        if file.tell():
+            file.seek(-1, os.SEEK_END)
+            if file.read(1) != b"\n":
+                file.write(b"\n")
+        with open(appended, "rb") as rows:
+            shutil.copyfileobj(rows, file)
+
+
+def _downloaded_recently(destination: Path, max_age_seconds: float) -> bool:
+    if max_age_seconds <= 0 or find_csv_file(destination) is None:
+        return False
+    try:
+        with open(destination / DOWNLOAD_FILE_NAME, "r") as file:
+            downloaded_at = json.load(file)["downloaded_at"]
+    except (OSError, ValueError, KeyError):
+        return False
+    return 0 <= time.time() - downloaded_at < max_age_seconds
+
+
+def download_kaggle_files(url: str, max_age_seconds: float = 0) -> Path:
+    """
+    Downloads and extracts a Kaggle dataset in `src/data/<dataset name>`.
+
+    The archive is extracted in a temporary folder next to the dataset, then each file is
+    moved into place with `os.replace`: a concurrent reader sees the previous file or the new
+    one, never a partly extracted one. The rows appended with `append_to_dataset` are added
+    to the downloaded CSV before it replaces the previous one. Downloads of the same dataset
+    run one at a time, and the requests that waited for a download use it instead of
+    downloading again. A dataset downloaded less than `max_age_seconds` ago is not
+    downloaded again.
 
     Args:
     - url (str): The URL of the Kaggle dataset to download.
+    - max_age_seconds (float): How long a downloaded dataset is used, 0 to always download.
 
     Returns:
-    - json_data (list): A list of records (dict) representing the dataset.
+    - Path: The first CSV file of the dataset.
 
     Raises:
-    - HTTPException: If any error occurs during the download or data processing.
+    - HTTPException: If the dataset contains no CSV file.
     """
-    try:
-        os.environ['KAGGLE_CONFIG_DIR'] = 'src/config/kaggle.json'  
-        api = KaggleApi()
-        api.authenticate()
+    os.environ['KAGGLE_CONFIG_DIR'] = 'src/config/kaggle.json'  
+    api = KaggleApi()
+    api.authenticate()
+
+    dataset_spec = url.split('/')[-2] + '/' + url.split('/')[-1]
 
-        dataset_spec = url.split('/')[-2] + '/' + url.split('/')[-1]
+    destination = dataset_directory(url)
+    destination.mkdir(parents=True, exist_ok=True) 
 
-        dataset_name = url.split('/')[-1]
-        destination = Path(DATA_DIR) / dataset_name  
-        destination.mkdir(parents=True, exist_ok=True) 
+    key = os.path.abspath(destination)
+    requested_at = time.monotonic()
+    with dataset_lock(destination):
+        if (_downloaded_at.get(key, float("-inf")) < requested_at
+                and not _downloaded_recently(destination, max_age_seconds)):
+            staging = Path(tempfile.mkdtemp(prefix=f".{destination.name}-", dir=destination.parent))
+            try:
+                print(f"Downloading dataset {dataset_spec} to {destination}...")
+                api.dataset_download_files(dataset_spec, path=str(staging), unzip=True)
 
-        print(f"Downloading dataset {dataset_spec} to {destination}...")
-        api.dataset_download_files(dataset_spec, path=str(destination), unzip=True)
+                for file in sorted(path for path in staging.rglob("*") if path.is_file()):
+                    target = destination / file.relative_to(staging)
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    if target.suffix == ".csv":
+                        _reapply_appended_rows(file, target)
+                    os.replace(file, target)
+            finally:
+                shutil.rmtree(staging, ignore_errors=True)
+            _downloaded_at[key] = time.monotonic()
+            with open(destination / DOWNLOAD_FILE_NAME, "w") as file:
+                json.dump({"url": url, "downloaded_at": time.time()}, file)
 
-        print(f"Dataset downloaded to: {destination}")
-        csv_file = next((file for file in destination.glob("*.csv")), None)
-        
-        if csv_file is None:
-            raise HTTPException(status_code=404, detail="No CSV file found in the downloaded dataset.")
+            print(f"Dataset downloaded to: {destination}")
+        csv_file = find_csv_file(destination)
+    
+    if csv_file is None:
+        raise HTTPException(status_code=404, detail="No CSV file found in the downloaded dataset.")
 
-        df = pd.read_csv(csv_file)
-        if df.empty:
-            raise HTTPException(status_code=404, detail="The CSV file is empty.")
+    return csv_file
 
-        json_data = df.to_dict(orient="records")
 
-        return json_data
+def read_dataset(csv_file: Path) -> pd.DataFrame:
+    """
+    Reads a downloaded CSV file as a DataFrame.
+
+    Args:
+    - csv_file (Path): The CSV file.
+
+    Returns:
+    - pd.DataFrame: The dataset.
+
+    Raises:
+    - HTTPException: If the CSV file is empty.
+    """
+    df = pd.read_csv(csv_file)
+    if df.empty:
+        raise HTTPException(status_code=404, detail="The CSV file is empty.")
+    return df
+
+
+def download_kaggle_dataset(url: str):
+    """
+    Downloads a Kaggle dataset from the specified URL, extracts the files, 
+    and returns the data as a JSON object.
+
+    Args:
+    - url (str): The URL of the Kaggle dataset to download.
+
+    Returns:
+    - json_data (list): A list of records (dict) representing the dataset.
+
+    Raises:
+    - HTTPException: If any error occurs during the download or data processing.
+    """
+    try:
+        csv_file = download_kaggle_files(url)
+        return read_dataset(csv_file).to_dict(orient="records")
 
     except HTTPException as e:
         raise e  
@@ -0,0 +1,210 @@
+import json, os, threading, tracemalloc
+from contextlib import contextmanager
+from typing import Optional
+
+from src.services import metrics
+
+MEMORY_CONFIG_PATH = "src/config/memory.json"
+
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+
+
+class MemoryLimitExceeded(MemoryError):
+    """
+    Raised when an operation goes over its memory ceiling.
+    """
+
+    def __init__(self, job: str, stage: str, used_bytes: int, ceiling_bytes: int):
+        self.job = job
+        self.stage = stage
+        self.used_bytes = used_bytes
+        self.ceiling_bytes = ceiling_bytes
+        super().__init__(
+            f"Memory ceiling exceeded during '{job}/{stage}': {used_bytes} bytes used, ceiling is {ceiling_bytes} bytes."
+        )
+
+
+def load_memory_settings(config_file_path: str = MEMORY_CONFIG_PATH) -> dict:
+    """
+    Loads the memory accounting settings.
+
+    Args:
+        config_file_path (str): The path of the JSON file.
+
+    Returns:
+        dict: `ceiling_bytes` (default ceiling), `job_ceilings` (ceiling per job) and
+        `tracemalloc_jobs` (jobs traced with tracemalloc, the others only use the RSS). None
+        by default: tracing slows down every allocation of the process while a traced job
+        runs, concurrent requests included (a 200k-row `/Load` JSON render takes about 5
+        times longer), so it is only meant to be turned on to investigate a job.
+    """
+    settings = {"ceiling_bytes": None, "job_ceilings": {}, "tracemalloc_jobs": []}
+    if os.path.exists(config_file_path):
+        with open(config_file_path, "r") as file:
+            settings.update(json.load(file))
+    return settings
+
+
+def current_rss() -> Optional[int]:
+    """
+    Returns the resident set size of the process in bytes, or None when /proc is not available.
+    """
+    try:
+        with open("/proc/self/statm", "r") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _start_tracemalloc():
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracemalloc_users += 1
+
+
+def _stop_tracemalloc():
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+class MemoryTracker:
+    """
+    Measures the memory used by the stages of one job (a dataset load, a training run...).
+
+    With tracemalloc, the peak and retained bytes of each stage are the Python allocations
+    made during the stage. Without it they are RSS deltas, which are coarser but free; this
+    is the default, tracing being several times slower.
+
+    tracemalloc is process-wide: the figures of concurrent jobs overlap, and
+    `tracemalloc.reset_peak()` resets the peak of every job. A stage therefore only resets the
+    peak when its job is the only one traced; otherwise its peak includes the earlier ones,
+    which overestimates it rather than hiding an allocation from the ceiling.
+
+    The ceiling is checked at the end of every stage, and must be checked with `ensure_fits`
+    before each stage that allocates a lot (reading a CSV, rendering a body): going over it
+    raises MemoryLimitExceeded instead of letting the worker be killed.
+
+    Args:
+        job (str): The job name, used as metrics label.
+        ceiling_bytes (int, optional): The maximum memory the job may use above its starting point.
+        use_tracemalloc (bool): Whether to trace the Python allocations.
+    """
+
+    def __init__(self, job: str, ceiling_bytes: Optional[int] = None, use_tracemalloc: bool = False):
+        self.job = job
+        self.ceiling_bytes = ceiling_bytes
+        self.use_tracemalloc = use_tracemalloc
+        self.stages = []
+        self._baseline = 0
+        self._rss_baseline = None
+        self._peak = 0
+        self._retained = 0
+
+    @classmethod
+    def for_job(cls, job: str, settings: Optional[dict] = None) -> "MemoryTracker":
+        """
+        Builds a tracker with the ceiling and tracing mode configured for `job`. Callers on a
+        hot path should load the settings once and pass them.
+        """
+        settings = settings if settings is not None else load_memory_settings()
+        ceiling = settings.get("job_ceilings", {}).get(job) or settings.get("ceiling_bytes")
+        return cls(job, ceiling_bytes=ceiling, use_tracemalloc=job in settings.get("tracemalloc_jobs", []))
+
+    def __enter__(self):
+        if self.use_tracemalloc:
+            _start_tracemalloc()
+            self._baseline = tracemalloc.get_traced_memory()[0]
+        self._rss_baseline = current_rss()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.use_tracemalloc:
+            _stop_tracemalloc()
+        report = self.report()
+        metrics.observe("memory_peak_bytes", report["peak_bytes"], job=self.job)
+        metrics.observe("memory_retained_bytes", report["retained_bytes"], job=self.job)
+        if isinstance(exc, MemoryLimitExceeded):
+            metrics.increment("memory_ceiling_aborts", job=self.job, stage=exc.stage)
+        return False
+
+    def _used_bytes(self, rss: Optional[int] = None) -> tuple:
+        if self.use_tracemalloc:
+            current, peak = tracemalloc.get_traced_memory()
+            return current - self._baseline, peak - self._baseline
+        if rss is None or self._rss_baseline is None:
+            return 0, 0
+        return rss - self._rss_baseline, rss - self._rss_baseline
+
+    def ensure_fits(self, estimated_bytes: int, stage: str):
+        """
+        Aborts before an allocation of `estimated_bytes` that would go over the ceiling.
+
+        Raises:
+            MemoryLimitExceeded: If the current usage plus the estimate is over the ceiling.
+        """
+        if self.ceiling_bytes is None:
+            return
+        current, _ = self._used_bytes(current_rss())
+        if current + estimated_bytes > self.ceiling_bytes:
+            raise MemoryLimitExceeded(self.job, stage, current + estimated_bytes, self.ceiling_bytes)
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Measures one stage of the job.
+
+        Args:
+            name (str): The stage name (load, process, split, fit, predict...).
+
+        Raises:
+            MemoryLimitExceeded: If the job went over its ceiling during the stage.
+        """
+        if self.use_tracemalloc:
+            with _tracemalloc_lock:
+                if _tracemalloc_users == 1:
+                    tracemalloc.reset_peak()
+        rss_start = current_rss()
+        start, _ = self._used_bytes(rss_start)
+        yield self
+
+        rss_end = current_rss()
+        current, peak = self._used_bytes(rss_end)
+        stage_peak = max(peak, current, start) - start
+        retained = current - start
+        self.stages.append({
+            "stage": name,
+            "peak_bytes": stage_peak,
+            "retained_bytes": retained,
+            "rss_bytes": rss_end,
+            "rss_delta_bytes": rss_end - rss_start if rss_end is not None and rss_start is not None else None,
+        })
+        self._peak = max(self._peak, peak, current)
+        self._retained = current
+        metrics.observe("memory_stage_peak_bytes", stage_peak, job=self.job, stage=name)
+        metrics.observe("memory_stage_retained_bytes", retained, job=self.job, stage=name)
+
+        if self.ceiling_bytes is not None and max(peak, current) > self.ceiling_bytes:
+            raise MemoryLimitExceeded(self.job, name, max(peak, current), self.ceiling_bytes)
+
+    def report(self) -> dict:
+        """
+        Returns the memory report of the job.
+
+        Returns:
+            dict: The job, the tracing mode, the ceiling, the peak and retained bytes of the
+            whole job (relative to its start) and the figures of every stage.
+        """
+        return {
+            "job": self.job,
+            "mode": "tracemalloc" if self.use_tracemalloc else "rss",
+            "ceiling_bytes": self.ceiling_bytes,
+            "peak_bytes": self._peak,
+            "retained_bytes": self._retained,
+            "stages": list(self.stages),
+        }
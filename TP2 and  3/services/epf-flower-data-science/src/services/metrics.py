@@ -0,0 +1,77 @@
+import threading
+
+_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+_summaries = {}
+
+
+def _key(name: str, labels: dict) -> tuple:
+    return (name, tuple(sorted(labels.items())))
+
+
+def increment(name: str, value: float = 1, **labels):
+    """
+    Adds `value` to a counter.
+
+    Args:
+        name (str): The metric name.
+        value (float): The increment.
+        **labels: The labels of the serie (job, stage, model...).
+    """
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def set_gauge(name: str, value: float, **labels):
+    """
+    Sets the current value of a gauge.
+    """
+    with _lock:
+        _gauges[_key(name, labels)] = value
+
+
+def observe(name: str, value: float, **labels):
+    """
+    Records one observation of a summary (count, sum, max and last value).
+    """
+    key = _key(name, labels)
+    with _lock:
+        summary = _summaries.setdefault(key, {"count": 0, "sum": 0.0, "max": None, "last": None})
+        summary["count"] += 1
+        summary["sum"] += value
+        summary["max"] = value if summary["max"] is None else max(summary["max"], value)
+        summary["last"] = value
+
+
+def _series(store: dict) -> list:
+    return [
+        {"name": name, "labels": dict(labels), "value": value}
+        for (name, labels), value in sorted(store.items(), key=lambda item: (item[0][0], item[0][1]))
+    ]
+
+
+def snapshot() -> dict:
+    """
+    Returns a copy of all the metrics.
+
+    Returns:
+        dict: The counters, gauges and summaries, each as a list of series.
+    """
+    with _lock:
+        return {
+            "counters": _series(_counters),
+            "gauges": _series(_gauges),
+            "summaries": _series({key: dict(value) for key, value in _summaries.items()}),
+        }
+
+
+def reset():
+    """
+    Clears all the metrics.
+    """
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _summaries.clear()
@@ -0,0 +1,277 @@
+import json, os, shutil, threading, time
+from collections import OrderedDict
+from typing import Optional
+
+import joblib
+
+from src.services import metrics
+from src.services.compact_model import CompactForest
+
+CATALOG_PATH = "src/models/catalog.json"
+SERVING_CONFIG_PATH = "src/config/serving.json"
+
+_catalog_lock = threading.Lock()
+_catalog_cache = {}
+
+
+def load_serving_settings(config_file_path: str = SERVING_CONFIG_PATH) -> dict:
+    """
+    Loads the model serving settings.
+
+    Returns:
+        dict: `max_cache_bytes` (memory budget of the loaded models), `max_models`
+        (maximum number of loaded models) and `compact_max_batch_rows` (larger batches are
+        predicted with the pickled model, whose compiled traversal is faster on big batches;
+        null to always use the compact copy).
+    """
+    settings = {"max_cache_bytes": 256 * 1024 * 1024, "max_models": 8, "compact_max_batch_rows": 256}
+    if os.path.exists(config_file_path):
+        with open(config_file_path, "r") as file:
+            settings.update(json.load(file))
+    return settings
+
+
+def catalog_template_path(catalog_path: str) -> str:
+    """
+    Returns the tracked template the catalog is created from, `<catalog>.default.json`.
+    """
+    return f"{os.path.splitext(catalog_path)[0]}.default.json"
+
+
+def _create_catalog_file(catalog_path: str):
+    # The catalog is runtime state (it points into the untracked model store), so it is not
+    # tracked: it is created from the template, which only lists the tracked model.
+    template_path = catalog_template_path(catalog_path)
+    if os.path.exists(catalog_path) or not os.path.exists(template_path):
+        return
+    temporary_path = f"{catalog_path}.{threading.get_ident()}.tmp"
+    shutil.copyfile(template_path, temporary_path)
+    os.replace(temporary_path, catalog_path)
+
+
+def load_catalog(catalog_path: str = CATALOG_PATH) -> dict:
+    """
+    Reads the model catalog. The file is only parsed again when it has changed. A missing
+    catalog is created from its template (see `catalog_template_path`), or is empty.
+
+    Returns:
+        dict: `{"models": {name: {"dataset", "features", "target", "active_version", "versions"}}}`.
+    """
+    _create_catalog_file(catalog_path)
+    if not os.path.exists(catalog_path):
+        return {"models": {}}
+    mtime = os.path.getmtime(catalog_path)
+    with _catalog_lock:
+        cached = _catalog_cache.get(catalog_path)
+        if cached is None or cached[0] != mtime:
+            with open(catalog_path, "r") as file:
+                cached = (mtime, json.load(file))
+            _catalog_cache[catalog_path] = cached
+        return json.loads(json.dumps(cached[1]))
+
+
+def save_catalog(catalog: dict, catalog_path: str = CATALOG_PATH):
+    """
+    Writes the model catalog atomically.
+    """
+    os.makedirs(os.path.dirname(catalog_path) or ".", exist_ok=True)
+    temporary_path = f"{catalog_path}.tmp"
+    with open(temporary_path, "w") as file:
+        json.dump(catalog, file, indent=4)
+    os.replace(temporary_path, catalog_path)
+
+
+def register_model(name: str, dataset: str, features: list, target: str, model_path: str,
+                   compact_model_path: Optional[str] = None, fingerprint: Optional[str] = None,
+                   catalog_path: str = CATALOG_PATH) -> str:
+    """
+    Registers a trained model in the catalog and makes it the active version of `name`.
+    A model with the fingerprint of an existing version activates that version instead.
+
+    Args:
+        name (str): The model name, used in `/Predict/{model}`.
+        dataset (str): The dataset it was trained on.
+        features (list): The feature columns, in the order the model expects them.
+        target (str): The predicted column.
+        model_path (str): The joblib pickle of the model.
+        compact_model_path (str, optional): Its compact copy, loaded instead when present.
+        fingerprint (str, optional): The training fingerprint.
+        catalog_path (str): The catalog file.
+
+    Returns:
+        str: The active version.
+    """
+    with _catalog_lock:
+        catalog = _read_catalog_file(catalog_path)
+        entry = catalog["models"].setdefault(name, {"versions": {}})
+        entry.update({"dataset": dataset, "features": list(features), "target": target})
+
+        version = next((
+            existing for existing, info in entry["versions"].items()
+            if fingerprint is not None and info.get("fingerprint") == fingerprint
+        ), None)
+        if version is None:
+            version = str(max((int(existing) for existing in entry["versions"]), default=0) + 1)
+            entry["versions"][version] = {
+                "model_path": model_path,
+                "compact_model_path": compact_model_path,
+                "fingerprint": fingerprint,
+                "registered_at": time.time(),
+            }
+        entry["active_version"] = version
+        save_catalog(catalog, catalog_path)
+        return version
+
+
+def forget_fingerprints(fingerprints: list, catalog_path: str = CATALOG_PATH):
+    """
+    Removes the versions whose artifacts were deleted from the store, except the active ones.
+    """
+    if not fingerprints:
+        return
+    with _catalog_lock:
+        catalog = _read_catalog_file(catalog_path)
+        for entry in catalog["models"].values():
+            entry["versions"] = {
+                version: info for version, info in entry["versions"].items()
+                if info.get("fingerprint") not in fingerprints or version == entry.get("active_version")
+            }
+        save_catalog(catalog, catalog_path)
+
+
+def _read_catalog_file(catalog_path: str) -> dict:
+    _create_catalog_file(catalog_path)
+    if not os.path.exists(catalog_path):
+        return {"models": {}}
+    with open(catalog_path, "r") as file:
+        return json.load(file)
+
+
+def get_model_entry(name: str, version: Optional[str] = None, catalog_path: str = CATALOG_PATH) -> tuple:
+    """
+    Finds a model in the catalog.
+
+    Args:
+        name (str): The model name.
+        version (str, optional): The version, the active one by default.
+
+    Returns:
+        tuple: The version and the catalog entry of the model.
+
+    Raises:
+        KeyError: If the model or the version is not in the catalog.
+    """
+    entry = load_catalog(catalog_path)["models"].get(name)
+    if entry is None:
+        raise KeyError(f"Model '{name}' not found in the catalog.")
+    version = version or entry.get("active_version")
+    if version not in entry["versions"]:
+        raise KeyError(f"Version '{version}' of model '{name}' not found in the catalog.")
+    return version, entry
+
+
+def load_model_file(version_info: dict, compact: bool = True) -> tuple:
+    """
+    Loads a model version, from its compact copy when it exists and `compact` is set.
+
+    Returns:
+        tuple: The model and its size in bytes (arrays for a compact model, file size for a pickle).
+    """
+    compact_model_path = version_info.get("compact_model_path")
+    if compact and compact_model_path and os.path.exists(compact_model_path):
+        model = CompactForest.load(compact_model_path)
+        return model, model.nbytes
+    return joblib.load(version_info["model_path"]), os.path.getsize(version_info["model_path"])
+
+
+class ModelCache:
+    """
+    Keeps the loaded models in memory, within a byte budget and a maximum number of models.
+    When a new model does not fit, the least recently used ones are evicted; they are loaded
+    again from disk on their next prediction.
+
+    The compact copy of a version serves small batches; batches over `compact_max_batch_rows`
+    rows get the pickled model, which is cached separately.
+
+    Args:
+        max_bytes (int): The memory budget of the loaded models.
+        max_models (int): The maximum number of loaded models.
+        compact_max_batch_rows (int, optional): The largest batch served by the compact copy.
+    """
+
+    def __init__(self, max_bytes: int, max_models: int, compact_max_batch_rows: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self.max_models = max_models
+        self.compact_max_batch_rows = compact_max_batch_rows
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading = {}
+
+    @classmethod
+    def from_settings(cls, settings: Optional[dict] = None) -> "ModelCache":
+        settings = settings or load_serving_settings()
+        return cls(settings["max_cache_bytes"], settings["max_models"], settings.get("compact_max_batch_rows"))
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(size for _, size in self._models.values())
+
+    def get(self, name: str, version: str, version_info: dict, batch_rows: Optional[int] = None):
+        """
+        Returns a loaded model, loading it if needed.
+
+        Args:
+            name (str): The model name.
+            version (str): The model version.
+            version_info (dict): The catalog information of the version (paths).
+            batch_rows (int, optional): The number of rows the model will predict at once.
+
+        Returns:
+            The model.
+        """
+        compact = bool(version_info.get("compact_model_path")) and (
+            batch_rows is None or self.compact_max_batch_rows is None or batch_rows <= self.compact_max_batch_rows
+        )
+        key = (name, version, "compact" if compact else "pickle")
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                metrics.increment("model_cache_hits", model=name)
+                return self._models[key][0]
+            loading = self._loading.setdefault(key, threading.Lock())
+
+        with loading:
+            try:
+                with self._lock:
+                    if key in self._models:
+                        self._models.move_to_end(key)
+                        return self._models[key][0]
+
+                start = time.perf_counter()
+                model, size = load_model_file(version_info, compact)
+                metrics.increment("model_loads", model=name)
+                metrics.observe("model_load_seconds", time.perf_counter() - start, model=name)
+
+                with self._lock:
+                    self._models[key] = (model, size)
+                    self._evict()
+                    metrics.set_gauge("model_cache_bytes", self.total_bytes)
+                    metrics.set_gauge("model_cache_models", len(self._models))
+                return model
+            finally:
+                with self._lock:
+                    if self._loading.get(key) is loading:
+                        del self._loading[key]
+
+    def _evict(self):
+        while len(self._models) > 1 and (self.total_bytes > self.max_bytes or len(self._models) > self.max_models):
+            (name, _, _), _ = self._models.popitem(last=False)
+            metrics.increment("model_evictions", model=name)
+
+    def loaded(self) -> list:
+        """
+        Returns the loaded models, the least recently used first.
+        """
+        with self._lock:
+            return [{"model": name, "version": version, "format": model_format, "bytes": size}
+                    for (name, version, model_format), (_, size) in self._models.items()]
@@ -0,0 +1,263 @@
+import hashlib, json, os, platform, shutil, time
+from pathlib import Path
+from typing import Callable, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+
+STORE_DIR = "src/models/store"
+STORE_CONFIG_PATH = "src/config/model_store.json"
+MODEL_FILE_NAME = "model.pkl"
+METADATA_FILE_NAME = "metadata.json"
+COMPACT_FILE_NAME = "model.npz"
+EVALUATION_FILE_NAME = "evaluation.json"
+
+
+def load_store_settings(config_file_path: str = STORE_CONFIG_PATH) -> dict:
+    """
+    Loads the model store settings.
+
+    Returns:
+        dict: `store_dir` (folder of the artifacts), `keep_last` (number of artifacts kept),
+        `compact_export` (whether a compact copy of the model is exported) and `compress`
+        (whether that copy is compressed).
+    """
+    settings = {"store_dir": STORE_DIR, "keep_last": 5, "compact_export": False, "compress": False}
+    if os.path.exists(config_file_path):
+        with open(config_file_path, "r") as file:
+            settings.update(json.load(file))
+    return settings
+
+
+def library_versions() -> dict:
+    """
+    Returns the versions of the libraries a fitted model depends on.
+    """
+    return {
+        "python": platform.python_version(),
+        "scikit-learn": sklearn.__version__,
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "joblib": joblib.__version__,
+    }
+
+
+def training_fingerprint(X_train: pd.DataFrame, y_train: pd.Series, resolved_params: dict) -> str:
+    """
+    Computes the fingerprint of a training run: a hash of the processed training data
+    (values, column names and labels), of the resolved parameters and of the library versions.
+
+    Args:
+        X_train (DataFrame): Training data (features).
+        y_train (Series): Training labels (target).
+        resolved_params (dict): All the parameters of the model, defaults included.
+
+    Returns:
+        str: The hexadecimal sha256 fingerprint.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps([str(column) for column in X_train.columns]).encode())
+    digest.update(pd.util.hash_pandas_object(X_train, index=False).to_numpy().tobytes())
+    digest.update(pd.util.hash_pandas_object(pd.Series(y_train).astype(str), index=False).to_numpy().tobytes())
+    digest.update(json.dumps(resolved_params, sort_keys=True, default=str).encode())
+    digest.update(json.dumps(library_versions(), sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def find_artifact(fingerprint: str, store_dir: str = STORE_DIR) -> Optional[dict]:
+    """
+    Returns the metadata of the stored artifact with this fingerprint, or None.
+    """
+    artifact_dir = Path(store_dir) / fingerprint
+    if not (artifact_dir / MODEL_FILE_NAME).exists() or not (artifact_dir / METADATA_FILE_NAME).exists():
+        return None
+    with open(artifact_dir / METADATA_FILE_NAME, "r") as file:
+        return json.load(file)
+
+
+def _write_metadata(metadata: dict, store_dir: str):
+    path = Path(store_dir) / metadata["fingerprint"] / METADATA_FILE_NAME
+    temporary_path = path.with_suffix(".tmp")
+    with open(temporary_path, "w") as file:
+        json.dump(metadata, file, indent=4)
+    os.replace(temporary_path, path)
+
+
+def store_artifact(fingerprint: str, model, metadata: dict, store_dir: str = STORE_DIR) -> dict:
+    """
+    Saves a fitted model and its metadata in `store_dir/<fingerprint>`.
+
+    Args:
+        fingerprint (str): The training fingerprint.
+        model: The fitted model.
+        metadata (dict): Information saved with the model (parameters, rows...).
+        store_dir (str): The folder of the store.
+
+    Returns:
+        dict: The complete metadata.
+    """
+    artifact_dir = Path(store_dir) / fingerprint
+    artifact_dir.mkdir(parents=True, exist_ok=True)
+    joblib.dump(model, artifact_dir / MODEL_FILE_NAME)
+
+    now = time.time()
+    metadata = dict(metadata, fingerprint=fingerprint, versions=library_versions(), created_at=now, last_used_at=now)
+    _write_metadata(metadata, store_dir)
+    return metadata
+
+
+def artifact_paths(fingerprint: str, store_dir: str = STORE_DIR) -> tuple:
+    """
+    Returns the paths of the model and of its compact copy in the store.
+    """
+    artifact_dir = Path(store_dir) / fingerprint
+    return str(artifact_dir / MODEL_FILE_NAME), str(artifact_dir / COMPACT_FILE_NAME)
+
+
+def write_evaluation(fingerprint: str, evaluation: dict, store_dir: str = STORE_DIR):
+    """
+    Saves the evaluation of a stored model next to it.
+    """
+    path = Path(store_dir) / fingerprint / EVALUATION_FILE_NAME
+    temporary_path = path.with_suffix(".tmp")
+    with open(temporary_path, "w") as file:
+        json.dump(evaluation, file, indent=4)
+    os.replace(temporary_path, path)
+
+
+def read_evaluation(fingerprint: str, store_dir: str = STORE_DIR) -> Optional[dict]:
+    """
+    Returns the evaluation of a stored model, or None if it has none.
+    """
+    path = Path(store_dir) / fingerprint / EVALUATION_FILE_NAME
+    if not path.exists():
+        return None
+    with open(path, "r") as file:
+        return json.load(file)
+
+
+def compact_path(model_path: str) -> str:
+    """
+    Returns the path of the compact copy of a model, `<model path without extension>.npz`.
+    """
+    return os.path.splitext(model_path)[0] + ".npz"
+
+
+def _copy_atomically(source: Path, destination: str):
+    temporary_path = f"{destination}.tmp"
+    shutil.copyfile(source, temporary_path)
+    os.replace(temporary_path, destination)
+
+
+def activate_artifact(fingerprint: str, active_path: str, store_dir: str = STORE_DIR) -> dict:
+    """
+    Makes a stored artifact the served model, by copying it to `active_path`, and its
+    compact copy, if any, next to it.
+
+    Returns:
+        dict: The metadata of the artifact.
+    """
+    metadata = find_artifact(fingerprint, store_dir)
+    if metadata is None:
+        raise FileNotFoundError(f"No artifact with fingerprint '{fingerprint}'.")
+
+    os.makedirs(os.path.dirname(active_path) or ".", exist_ok=True)
+    artifact_dir = Path(store_dir) / fingerprint
+    _copy_atomically(artifact_dir / MODEL_FILE_NAME, active_path)
+    if (artifact_dir / COMPACT_FILE_NAME).exists():
+        _copy_atomically(artifact_dir / COMPACT_FILE_NAME, compact_path(active_path))
+    elif os.path.exists(compact_path(active_path)):
+        os.remove(compact_path(active_path))
+
+    metadata["last_used_at"] = time.time()
+    _write_metadata(metadata, store_dir)
+    return metadata
+
+
+def list_artifacts(store_dir: str = STORE_DIR) -> list:
+    """
+    Returns the metadata of the stored artifacts, the most recently used first.
+    """
+    if not os.path.isdir(store_dir):
+        return []
+    artifacts = [find_artifact(path.name, store_dir) for path in Path(store_dir).iterdir() if path.is_dir()]
+    return sorted((artifact for artifact in artifacts if artifact), key=lambda artifact: artifact["last_used_at"], reverse=True)
+
+
+def prune_store(keep_last: int, store_dir: str = STORE_DIR) -> list:
+    """
+    Removes the artifacts beyond the `keep_last` most recently used ones.
+
+    Returns:
+        list: The fingerprints removed.
+    """
+    removed = []
+    for artifact in list_artifacts(store_dir)[max(keep_last, 1):]:
+        shutil.rmtree(Path(store_dir) / artifact["fingerprint"], ignore_errors=True)
+        removed.append(artifact["fingerprint"])
+    return removed
+
+
+def train_with_cache(X_train: pd.DataFrame, y_train: pd.Series, model_params: dict, resolved_params: dict,
+                     fit: Callable, active_path: str, settings: Optional[dict] = None,
+                     export: Optional[Callable] = None, evaluate: Optional[Callable] = None) -> dict:
+    """
+    Activates the stored model trained on the same data with the same parameters and library
+    versions, or fits, stores and activates a new one.
+
+    Args:
+        X_train (DataFrame): Training data (features).
+        y_train (Series): Training labels (target).
+        model_params (dict): The parameters passed to `fit`.
+        resolved_params (dict): The same parameters with the library defaults, used in the fingerprint.
+        fit (callable): `fit(X_train, y_train, model_params)` returning the fitted model.
+        active_path (str): Where the served model is written.
+        settings (dict, optional): The store settings, read from the JSON file by default.
+        export (callable, optional): `export(model, X_train, path, compress)` writing the compact
+            copy of a new model, called when `compact_export` is set.
+        evaluate (callable, optional): `evaluate(model, fit_seconds)` returning the evaluation
+            of a new model, stored with it. On a cache hit, the stored evaluation is returned,
+            or computed once for an artifact stored without one.
+
+    Returns:
+        dict: `cache` ("hit" or "miss"), `fingerprint`, the artifact `metadata`, its
+        `evaluation` (None without `evaluate`) and the fingerprints `removed` from the store.
+    """
+    settings = settings or load_store_settings()
+    store_dir = settings["store_dir"]
+    fingerprint = training_fingerprint(X_train, y_train, resolved_params)
+
+    if find_artifact(fingerprint, store_dir) is not None:
+        metadata = activate_artifact(fingerprint, active_path, store_dir)
+        evaluation = read_evaluation(fingerprint, store_dir)
+        if evaluation is None and evaluate is not None:
+            evaluation = evaluate(joblib.load(Path(store_dir) / fingerprint / MODEL_FILE_NAME), metadata["fit_seconds"])
+            write_evaluation(fingerprint, evaluation, store_dir)
+        return {"cache": "hit", "fingerprint": fingerprint, "metadata": metadata, "evaluation": evaluation, "removed": []}
+
+    start = time.perf_counter()
+    model = fit(X_train, y_train, model_params)
+    fit_seconds = time.perf_counter() - start
+    compact = None
+    if export is not None and settings.get("compact_export"):
+        artifact_dir = Path(store_dir) / fingerprint
+        artifact_dir.mkdir(parents=True, exist_ok=True)
+        compact_file = artifact_dir / COMPACT_FILE_NAME
+        export(model, X_train, str(compact_file), settings.get("compress", False))
+        compact = {"bytes": compact_file.stat().st_size, "compressed": bool(settings.get("compress", False))}
+    store_artifact(fingerprint, model, {
+        "params": model_params,
+        "rows": int(len(X_train)),
+        "features": [str(column) for column in X_train.columns],
+        "fit_seconds": fit_seconds,
+        "compact": compact,
+    }, store_dir)
+    evaluation = None
+    if evaluate is not None:
+        evaluation = evaluate(model, fit_seconds)
+        write_evaluation(fingerprint, evaluation, store_dir)
+    metadata = activate_artifact(fingerprint, active_path, store_dir)
+    removed = prune_store(settings["keep_last"], store_dir)
+    return {"cache": "miss", "fingerprint": fingerprint, "metadata": metadata, "evaluation": evaluation, "removed": removed}
@@ -0,0 +1,176 @@
+import copy, json, multiprocessing, os, threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+TRAINING_CONFIG_PATH = "src/config/training.json"
+
+_executor_lock = threading.Lock()
+_executor = None
+_executor_key = None
+
+
+def load_training_settings(config_file_path: str = TRAINING_CONFIG_PATH) -> dict:
+    """
+    Loads the training engine settings.
+
+    Returns:
+        dict: `engine` ("single", the default, or "sharded", which only pays off for forests
+        that take seconds to fit), `n_shards` (number of tree shards, which
+        defines the model), `n_workers` (processes used to fit them, null for all the cores)
+        and `start_method` (multiprocessing start method of the workers).
+    """
+    settings = {"engine": "single", "n_shards": 8, "n_workers": None, "start_method": "spawn"}
+    if os.path.exists(config_file_path):
+        with open(config_file_path, "r") as file:
+            settings.update(json.load(file))
+    return settings
+
+
+def available_cores() -> int:
+    """
+    Returns the number of cores the process may run on.
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def shard_sizes(n_estimators: int, n_shards: int) -> list:
+    """
+    Splits `n_estimators` trees in at most `n_shards` shards of nearly equal size.
+    """
+    n_shards = max(1, min(n_shards, n_estimators))
+    base, extra = divmod(n_estimators, n_shards)
+    return [base + (1 if index < extra else 0) for index in range(n_shards)]
+
+
+def shard_seeds(random_state: Optional[int], n_shards: int) -> list:
+    """
+    Derives one independent seed per shard from the model `random_state`.
+    The same `random_state` always gives the same seeds.
+    """
+    return [int(seed) for seed in np.random.SeedSequence(random_state).generate_state(n_shards)]
+
+
+def _fit_shard(X_train, y_train, model_params: dict, n_estimators: int, seed: int) -> RandomForestClassifier:
+    params = dict(model_params, n_estimators=n_estimators, random_state=seed, n_jobs=1)
+    return RandomForestClassifier(**params).fit(X_train, y_train)
+
+
+def merge_forests(forests: list) -> RandomForestClassifier:
+    """
+    Merges forests fitted on the same data into a single forest, in the order of the list.
+
+    Args:
+        forests (list): The fitted RandomForestClassifier shards.
+
+    Returns:
+        RandomForestClassifier: A forest with the trees of all the shards.
+
+    Raises:
+        ValueError: If the shards were not fitted on the same classes and features.
+    """
+    merged = copy.deepcopy(forests[0])
+    for forest in forests[1:]:
+        if not np.array_equal(forest.classes_, merged.classes_) or forest.n_features_in_ != merged.n_features_in_:
+            raise ValueError("Forests fitted on different classes or features cannot be merged.")
+        merged.estimators_ += forest.estimators_
+    merged.n_estimators = len(merged.estimators_)
+    for attribute in ("oob_score_", "oob_decision_function_"):
+        if hasattr(merged, attribute):
+            delattr(merged, attribute)
+    return merged
+
+
+def _get_executor(n_workers: int, start_method: str) -> ProcessPoolExecutor:
+    global _executor, _executor_key
+    with _executor_lock:
+        if _executor is None or _executor_key != (n_workers, start_method):
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ProcessPoolExecutor(max_workers=n_workers, mp_context=multiprocessing.get_context(start_method))
+            _executor_key = (n_workers, start_method)
+        return _executor
+
+
+def shutdown_executor(wait: bool = True):
+    """
+    Stops the worker processes of the sharded engine, if they were started.
+    """
+    global _executor, _executor_key
+    with _executor_lock:
+        executor, _executor, _executor_key = _executor, None, None
+    if executor is not None:
+        executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def fit_sharded(X_train, y_train, model_params: dict, n_shards: int = 8, n_workers: Optional[int] = None,
+                start_method: str = "spawn") -> RandomForestClassifier:
+    """
+    Fits a RandomForest by splitting its trees in shards fitted in parallel worker processes,
+    each with its own seed, then merged into one forest.
+
+    The merged forest only depends on the parameters and `n_shards`: fitting it with 1 or
+    N workers gives the same trees, hence the same predictions.
+
+    Args:
+        X_train (DataFrame): Training data (features).
+        y_train (Series): Training labels (target).
+        model_params (dict): The RandomForest parameters.
+        n_shards (int): The number of shards the trees are split in.
+        n_workers (int, optional): The number of worker processes, all the cores by default.
+        start_method (str): The multiprocessing start method of the workers.
+
+    Returns:
+        RandomForestClassifier: The merged forest.
+    """
+    sizes = shard_sizes(model_params.get("n_estimators", 100), n_shards)
+    seeds = shard_seeds(model_params.get("random_state"), len(sizes))
+    n_workers = min(n_workers or available_cores(), len(sizes))
+
+    if n_workers <= 1:
+        forests = [_fit_shard(X_train, y_train, model_params, size, seed) for size, seed in zip(sizes, seeds)]
+    else:
+        executor = _get_executor(n_workers, start_method)
+        futures = [executor.submit(_fit_shard, X_train, y_train, model_params, size, seed) for size, seed in zip(sizes, seeds)]
+        forests = [future.result() for future in futures]
+
+    merged = merge_forests(forests)
+    merged.random_state = model_params.get("random_state")
+    merged.n_jobs = model_params.get("n_jobs")
+    return merged
+
+
+def engine_fingerprint(settings: dict) -> dict:
+    """
+    Returns the training settings that change the fitted model, to add to the training fingerprint.
+    The number of workers is left out since it does not change the model.
+    """
+    if settings["engine"] != "sharded":
+        return {"engine": "single"}
+    return {"engine": "sharded", "n_shards": settings["n_shards"]}
+
+
+def make_fit(single_fit, settings: Optional[dict] = None):
+    """
+    Returns the fit function of the configured engine, `fit(X_train, y_train, model_params)`.
+
+    Args:
+        single_fit (callable): The single-process fit function, used by the "single" engine.
+        settings (dict, optional): The training settings, read from the JSON file by default.
+
+    Returns:
+        callable: The fit function.
+    """
+    settings = settings or load_training_settings()
+    if settings["engine"] != "sharded":
+        return single_fit
+
+    def fit(X_train, y_train, model_params):
+        return fit_sharded(X_train, y_train, model_params, settings["n_shards"], settings["n_workers"], settings["start_method"])
+
+    return fit
@@ -0,0 +1,269 @@
+import copy, json, os, random, threading, time
+from typing import Callable, Optional
+
+from google.cloud import firestore
+
+from src.services import metrics
+
+PARAMETER_SYNC_CONFIG_PATH = "src/config/parameter_sync.json"
+
+
+def load_sync_settings(config_file_path: str = PARAMETER_SYNC_CONFIG_PATH) -> dict:
+    """
+    Loads the Firestore parameter sync settings.
+
+    Returns:
+        dict: `mode` ("listener", "poll" or "off"), `collection` and `document` of the
+        parameters, `poll_interval_seconds` and `max_backoff_seconds` of the polling,
+        `retrain_on_change` and `retrain_debounce_seconds`.
+    """
+    settings = {
+        "mode": "listener",
+        "collection": "parameters",
+        "document": "parameters",
+        "poll_interval_seconds": 30.0,
+        "max_backoff_seconds": 300.0,
+        "retrain_on_change": False,
+        "retrain_debounce_seconds": 10.0,
+    }
+    if os.path.exists(config_file_path):
+        with open(config_file_path, "r") as file:
+            settings.update(json.load(file))
+    return settings
+
+
+class ParameterSnapshot:
+    """
+    A version of the Firestore parameters held in memory.
+
+    Args:
+        data (dict, optional): The document, None if it does not exist.
+        version (int): Incremented each time the document changes, 0 before the first read.
+        source (str): Where it came from: "listener", "poll", "read" or "write".
+        synced_at (float, optional): When it was received (time.time()).
+        read_at (float, optional): When the read that returned it started, or when the write
+            completed (time.monotonic()); older reads are ignored.
+    """
+
+    def __init__(self, data: Optional[dict] = None, version: int = 0, source: str = "none",
+                 synced_at: Optional[float] = None, read_at: Optional[float] = None):
+        self.data = data
+        self.version = version
+        self.source = source
+        self.synced_at = synced_at
+        self.read_at = read_at
+
+    @property
+    def exists(self) -> bool:
+        return self.data is not None
+
+
+class ParameterSync:
+    """
+    Keeps the Firestore parameters document in memory. With the "listener" mode, Firestore
+    pushes every change through a snapshot listener; clients without listeners (or the
+    "poll" mode) read the document every `poll_interval_seconds`, backing off exponentially,
+    up to `max_backoff_seconds`, while the reads fail.
+
+    Args:
+        settings (dict): The sync settings, see `load_sync_settings`.
+        client_factory (callable, optional): Returns the Firestore client, `firestore.Client()` by default.
+    """
+
+    def __init__(self, settings: dict, client_factory: Optional[Callable] = None):
+        self.settings = settings
+        self._client_factory = client_factory or (lambda: firestore.Client())
+        self._snapshot = ParameterSnapshot()
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stopped = threading.Event()
+        self._listeners = []
+        self._watch = None
+        self._thread = None
+
+    @property
+    def mode(self) -> str:
+        """
+        The running mode: "listener", "poll", or "off" when not started.
+        """
+        if self._watch is not None:
+            return "listener"
+        return "poll" if self._thread is not None else "off"
+
+    def _document(self):
+        return self._client_factory().collection(self.settings["collection"]).document(self.settings["document"])
+
+    def add_listener(self, listener: Callable):
+        """
+        Registers `listener(previous, snapshot)`, called after each change of the document
+        (not for the first read).
+        """
+        self._listeners.append(listener)
+
+    def snapshot(self) -> ParameterSnapshot:
+        """
+        Returns a copy of the current snapshot.
+        """
+        with self._lock:
+            return ParameterSnapshot(copy.deepcopy(self._snapshot.data), self._snapshot.version,
+                                     self._snapshot.source, self._snapshot.synced_at, self._snapshot.read_at)
+
+    def apply(self, data: Optional[dict], source: str, read_at: Optional[float] = None) -> bool:
+        """
+        Replaces the snapshot by a newer document. The version only changes with the content.
+
+        A document read before the current snapshot was read or written is ignored: a poll
+        that started before a `/UpdateCollection` write and returns after it would otherwise
+        bring the old document back.
+
+        Args:
+            data (dict, optional): The document, None if it does not exist.
+            source (str): Where it comes from: "listener", "poll", "read" or "write".
+            read_at (float, optional): When the read started (time.monotonic()), now by default,
+                which is right for a write that just completed.
+
+        Returns:
+            bool: Whether the document changed.
+        """
+        read_at = time.monotonic() if read_at is None else read_at
+        with self._lock:
+            if self._snapshot.read_at is not None and read_at < self._snapshot.read_at:
+                metrics.increment("parameter_stale_reads", source=source)
+                return False
+            first = not self._ready.is_set()
+            self._ready.set()
+            if not first and data == self._snapshot.data:
+                self._snapshot.synced_at = time.time()
+                self._snapshot.read_at = read_at
+                return False
+            previous = self._snapshot
+            self._snapshot = ParameterSnapshot(copy.deepcopy(data), previous.version + 1, source, time.time(), read_at)
+            current = self._snapshot
+        metrics.set_gauge("parameters_version", current.version)
+        if not first:
+            metrics.increment("parameter_changes", source=source)
+            for listener in self._listeners:
+                listener(previous, current)
+        return True
+
+    def refresh(self) -> ParameterSnapshot:
+        """
+        Reads the document from Firestore and applies it.
+
+        Raises:
+            Exception: The error of the Firestore read.
+        """
+        read_at = time.monotonic()
+        document = self._document().get()
+        self.apply(document.to_dict() if document.exists else None, "read", read_at)
+        return self.snapshot()
+
+    def start(self):
+        """
+        Starts the snapshot listener, or the polling thread if listeners are not available or
+        the mode is "poll". Does nothing with the "off" mode.
+        """
+        if self.settings["mode"] == "off" or self.mode != "off":
+            return
+        self._stopped.clear()
+        if self.settings["mode"] == "listener":
+            try:
+                self._watch = self._document().on_snapshot(self._on_snapshot)
+                return
+            except Exception:
+                metrics.increment("parameter_sync_errors", mode="listener")
+        self._thread = threading.Thread(target=self._poll, name="parameter-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops the listener or the polling thread.
+        """
+        self._stopped.set()
+        if self._watch is not None:
+            self._watch.unsubscribe()
+            self._watch = None
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def wait_until_ready(self, timeout: float) -> bool:
+        """
+        Waits for the first snapshot.
+
+        Returns:
+            bool: Whether a snapshot was received.
+        """
+        return self._ready.wait(timeout)
+
+    def _on_snapshot(self, documents, changes, read_time):
+        document = documents[0] if documents else None
+        self.apply(document.to_dict() if document is not None and document.exists else None, "listener")
+
+    def _poll(self):
+        interval = self.settings["poll_interval_seconds"]
+        failures = 0
+        delay = 0.0
+        while not self._stopped.wait(delay):
+            try:
+                read_at = time.monotonic()
+                document = self._document().get()
+                self.apply(document.to_dict() if document.exists else None, "poll", read_at)
+                failures = 0
+                delay = interval
+            except Exception:
+                metrics.increment("parameter_sync_errors", mode="poll")
+                failures += 1
+                delay = min(interval * 2 ** failures, self.settings["max_backoff_seconds"]) * random.uniform(0.8, 1.0)
+
+
+class DebouncedTrigger:
+    """
+    Runs an action `delay_seconds` after the last of a burst of `schedule()` calls, in a
+    background thread. A call during a run schedules one more run after it.
+
+    Args:
+        delay_seconds (float): The quiet time before the action runs.
+        action (callable): The action, called without arguments.
+    """
+
+    def __init__(self, delay_seconds: float, action: Callable):
+        self.delay_seconds = delay_seconds
+        self.action = action
+        self.runs = 0
+        self._lock = threading.Lock()
+        self._timer = None
+        self._running = False
+        self._pending = False
+
+    def schedule(self):
+        with self._lock:
+            if self._running:
+                self._pending = True
+                return
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay_seconds, self._run)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _run(self):
+        with self._lock:
+            self._timer = None
+            self._running = True
+        try:
+            self.action()
+        finally:
+            with self._lock:
+                self.runs += 1
+                self._running = False
+                pending, self._pending = self._pending, False
+            if pending:
+                self.schedule()
+
+    def cancel(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._pending = False
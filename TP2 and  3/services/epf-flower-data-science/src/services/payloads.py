@@ -0,0 +1,225 @@
+import io, json
+
+import numpy as np
+import pandas as pd
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:
+    pa = None
+
+JSON = "application/json"
+NPY = "application/x-npy"
+MSGPACK = "application/x-msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+
+_ALIASES = {
+    "application/msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+    "application/vnd.apache.arrow.file": ARROW,
+}
+
+
+class UnsupportedFormat(ValueError):
+    """
+    Raised when a payload format is unknown or its optional library is not installed.
+    """
+
+
+def _normalize(media_type: str) -> str:
+    media_type = media_type.split(";")[0].strip().lower()
+    return _ALIASES.get(media_type, media_type)
+
+
+def available_formats() -> list:
+    """
+    Returns the media types usable with the installed libraries, JSON first.
+    NPY only needs NumPy, MessagePack needs `msgpack` and Arrow needs `pyarrow`.
+    """
+    formats = [JSON, NPY]
+    if msgpack is not None:
+        formats.append(MSGPACK)
+    if pa is not None:
+        formats.append(ARROW)
+    return formats
+
+
+def negotiate(accept: str, supported: list) -> str:
+    """
+    Picks the response media type from an `Accept` header.
+
+    Args:
+        accept (str): The Accept header, possibly with q-values. Empty means JSON.
+        supported (list): The media types the endpoint can produce, the default one first.
+
+    Returns:
+        str: The chosen media type.
+
+    Raises:
+        UnsupportedFormat: If none of the accepted media types is supported.
+    """
+    if not accept:
+        return supported[0]
+
+    candidates = []
+    for position, item in enumerate(accept.split(",")):
+        parts = item.split(";")
+        quality = 1.0
+        for parameter in parts[1:]:
+            name, _, value = parameter.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            candidates.append((-quality, position, _normalize(parts[0])))
+
+    for _, _, media_type in sorted(candidates):
+        if media_type in ("*/*", "application/*"):
+            return supported[0]
+        if media_type in supported:
+            return media_type
+
+    raise UnsupportedFormat(f"None of the accepted formats is supported: {', '.join(supported)}.")
+
+
+def _as_matrix(values: np.ndarray) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        values = values.reshape(1, -1)
+    if values.ndim != 2:
+        raise ValueError(f"Expected a 2 dimensional feature matrix, got {values.ndim} dimensions.")
+    return values
+
+
+def _pack_array(values: np.ndarray) -> dict:
+    values = np.ascontiguousarray(values)
+    return {"dtype": values.dtype.str, "shape": list(values.shape), "data": values.tobytes()}
+
+
+def _unpack_array(packed: dict) -> np.ndarray:
+    return np.frombuffer(packed["data"], dtype=np.dtype(packed["dtype"])).reshape(packed["shape"])
+
+
+def decode_features(body: bytes, content_type: str) -> np.ndarray:
+    """
+    Parses a feature matrix straight into a NumPy array.
+
+    - JSON: `{"features": [...]}` with one row or a list of rows.
+    - NPY: the output of `numpy.save`, pickles are refused.
+    - MessagePack: `{"dtype": "<f8", "shape": [n, m], "data": <raw bytes>}`, read without copy.
+    - Arrow IPC stream: one numeric column per feature.
+
+    Args:
+        body (bytes): The request body.
+        content_type (str): The Content-Type header.
+
+    Returns:
+        np.ndarray: A (n_rows, n_features) float64 matrix.
+
+    Raises:
+        UnsupportedFormat: If the format is unknown or its library is missing.
+        ValueError: If the payload is not a valid feature matrix.
+    """
+    media_type = _normalize(content_type or JSON)
+    if media_type not in available_formats():
+        raise UnsupportedFormat(f"Unsupported Content-Type '{content_type}'.")
+
+    if media_type == JSON:
+        payload = json.loads(body)
+        if not isinstance(payload, dict) or "features" not in payload:
+            raise ValueError("The JSON body must contain a 'features' list.")
+        return _as_matrix(payload["features"])
+    if media_type == NPY:
+        return _as_matrix(np.load(io.BytesIO(body), allow_pickle=False))
+    if media_type == MSGPACK:
+        return _as_matrix(_unpack_array(msgpack.unpackb(body)))
+
+    table = pa.ipc.open_stream(body).read_all()
+    return _as_matrix(np.column_stack([column.to_numpy() for column in table.columns]))
+
+
+def encode_array(values: np.ndarray, media_type: str, name: str = "prediction") -> bytes:
+    """
+    Serializes a 1 or 2 dimensional result array (predictions, probabilities...).
+
+    Args:
+        values (np.ndarray): The array.
+        media_type (str): One of the binary media types.
+        name (str): The column name used by Arrow.
+
+    Returns:
+        bytes: The payload.
+    """
+    values = np.asarray(values)
+    if media_type == NPY:
+        if values.dtype == object:
+            values = values.astype(str)
+        buffer = io.BytesIO()
+        np.save(buffer, values, allow_pickle=False)
+        return buffer.getvalue()
+    if media_type == MSGPACK:
+        if values.dtype.kind in "biuf":
+            return msgpack.packb(_pack_array(values))
+        return msgpack.packb(values.tolist())
+    if media_type == ARROW:
+        table = pa.table({name: values}) if values.ndim == 1 else pa.table(
+            {f"{name}_{index}": values[:, index] for index in range(values.shape[1])}
+        )
+        return _write_arrow(table)
+    raise UnsupportedFormat(f"Unsupported media type '{media_type}'.")
+
+
+def encode_dataframe(dataset: pd.DataFrame, media_type: str) -> bytes:
+    """
+    Serializes a dataset without going through a list of records.
+
+    - MessagePack: `{"columns": [...], "data": {column: packed array or list}}`, numeric
+      columns being raw buffers as in `decode_features`.
+    - Arrow IPC stream: the table.
+
+    Returns:
+        bytes: The payload.
+    """
+    if media_type == MSGPACK:
+        data = {}
+        for column in dataset.columns:
+            values = dataset[column].to_numpy()
+            data[str(column)] = _pack_array(values) if values.dtype.kind in "biuf" else dataset[column].astype(object).where(dataset[column].notna(), None).tolist()
+        return msgpack.packb({"columns": [str(column) for column in dataset.columns], "data": data})
+    if media_type == ARROW:
+        return _write_arrow(pa.Table.from_pandas(dataset, preserve_index=False))
+    raise UnsupportedFormat(f"Unsupported media type '{media_type}'.")
+
+
+def estimate_encoded_bytes(dataset: pd.DataFrame, media_type: str) -> int:
+    """
+    Estimates the memory needed to serialize a dataset, to check it against a memory ceiling
+    before rendering. JSON goes through a list of records, with one Python object per cell
+    (about 128 bytes each with its dictionary slot and its text); MessagePack only boxes the
+    non-numeric columns, which it copies once more; Arrow copies the columns once.
+
+    Returns:
+        int: The estimated peak allocation, in bytes.
+    """
+    deep_bytes = int(dataset.memory_usage(deep=True, index=False).sum())
+    if media_type == ARROW:
+        return 2 * deep_bytes
+    if media_type == MSGPACK:
+        boxed_cells = sum(len(dataset) for column in dataset.columns if dataset[column].dtype.kind not in "biuf")
+        return 2 * deep_bytes + 160 * boxed_cells
+    return deep_bytes + 128 * dataset.size
+
+
+def _write_arrow(table) -> bytes:
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
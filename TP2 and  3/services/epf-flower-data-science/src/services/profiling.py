@@ -0,0 +1,207 @@
+import cProfile, hmac, io, itertools, json, os, pstats, threading, time, uuid
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qs
+
+PROFILING_CONFIG_PATH = "src/config/profiling.json"
+PROFILING_TOKEN_ENV = "PROFILING_ADMIN_TOKEN"
+PROFILE_HEADER = b"x-profile-token"
+PROFILE_QUERY_PARAM = "profile_token"
+
+_current_session: ContextVar[Optional["ProfileSession"]] = ContextVar("profile_session", default=None)
+
+
+class ProfilingSettings:
+    """
+    Settings of the opt-in profiler.
+
+    Args:
+        token (str, optional): Admin token allowing a client to ask for a profile of its request.
+        sample_rates (dict): Route path -> N, meaning 1 request out of N is profiled. 0 disables sampling.
+        output_dir (str): Folder where the pstats files are written.
+        max_profiles (int): Number of profiles kept on disk, the oldest ones are removed.
+    """
+
+    def __init__(self, token: Optional[str] = None, sample_rates: Optional[dict] = None,
+                 output_dir: str = "src/profiles", max_profiles: int = 50):
+        self.token = token or None
+        self.sample_rates = {path: int(rate) for path, rate in (sample_rates or {}).items() if int(rate) > 0}
+        self.output_dir = output_dir
+        self.max_profiles = max_profiles
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.token or self.sample_rates)
+
+
+def load_profiling_settings(config_file_path: str = PROFILING_CONFIG_PATH) -> ProfilingSettings:
+    """
+    Builds the profiler settings from the JSON file and the admin token environment variable.
+
+    Args:
+        config_file_path (str): The path of the profiling configuration file.
+
+    Returns:
+        ProfilingSettings: The settings, disabled if neither a token nor a sample rate is configured.
+    """
+    config = {}
+    if os.path.exists(config_file_path):
+        with open(config_file_path, "r") as file:
+            config = json.load(file)
+
+    return ProfilingSettings(
+        token=os.environ.get(PROFILING_TOKEN_ENV),
+        sample_rates=config.get("sample_rates"),
+        output_dir=config.get("output_dir", "src/profiles"),
+        max_profiles=config.get("max_profiles", 50),
+    )
+
+
+class ProfileSession:
+    """
+    A profile requested for one HTTP request. The endpoint decorated with `profiled`
+    writes its stats in `output_dir/<profile_id>.pstats`.
+    """
+
+    def __init__(self, route: str, settings: ProfilingSettings):
+        self.route = route
+        self.settings = settings
+        self.profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{route.strip('/').replace('/', '_') or 'root'}-{uuid.uuid4().hex[:8]}"
+
+    def save(self, profiler: cProfile.Profile) -> str:
+        os.makedirs(self.settings.output_dir, exist_ok=True)
+        path = os.path.join(self.settings.output_dir, f"{self.profile_id}.pstats")
+        profiler.dump_stats(path)
+        _prune_profiles(self.settings.output_dir, self.settings.max_profiles)
+        return path
+
+
+def _prune_profiles(output_dir: str, max_profiles: int):
+    profiles = sorted(Path(output_dir).glob("*.pstats"), key=lambda p: p.stat().st_mtime)
+    for old_profile in profiles[:max(len(profiles) - max_profiles, 0)]:
+        old_profile.unlink(missing_ok=True)
+
+
+def profiled(func):
+    """
+    Decorator for the endpoints that can be profiled. When the current request has
+    no profile session the endpoint is called directly, so it costs a single context lookup.
+
+    Args:
+        func (callable): The synchronous endpoint function.
+
+    Returns:
+        callable: The wrapped endpoint, with the same signature for FastAPI.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        session = _current_session.get()
+        if session is None:
+            return func(*args, **kwargs)
+
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(func, *args, **kwargs)
+        finally:
+            session.save(profiler)
+
+    return wrapper
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware opening a profile session when the request carries the admin token
+    (header `X-Profile-Token` or query parameter `profile_token`) or is picked by the
+    1-in-N sampling of its route. The id of the profile is sent back in `X-Profile-Id`.
+
+    It is only installed when profiling is configured, so it adds no overhead otherwise.
+    """
+
+    def __init__(self, app, settings: ProfilingSettings):
+        self.app = app
+        self.settings = settings
+        self._counters = {path: itertools.count() for path in settings.sample_rates}
+        self._lock = threading.Lock()
+
+    def _is_admin_request(self, scope) -> bool:
+        if not self.settings.token:
+            return False
+        candidates = [value.decode("latin-1") for key, value in scope.get("headers", []) if key == PROFILE_HEADER]
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        candidates += query.get(PROFILE_QUERY_PARAM, [])
+        return any(hmac.compare_digest(candidate, self.settings.token) for candidate in candidates)
+
+    def _is_sampled(self, path: str) -> bool:
+        rate = self.settings.sample_rates.get(path)
+        if not rate:
+            return False
+        with self._lock:
+            return next(self._counters[path]) % rate == 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not (self._is_admin_request(scope) or self._is_sampled(scope["path"])):
+            await self.app(scope, receive, send)
+            return
+
+        session = ProfileSession(scope["path"], self.settings)
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", session.profile_id.encode())]
+            await send(message)
+
+        token = _current_session.set(session)
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            _current_session.reset(token)
+
+
+def is_admin_token(token: Optional[str], settings: ProfilingSettings) -> bool:
+    """
+    Checks a token against the configured profiling admin token.
+    """
+    return bool(settings.token and token and hmac.compare_digest(token, settings.token))
+
+
+def list_profiles(output_dir: str) -> list:
+    """
+    Lists the stored profiles, most recent first.
+
+    Args:
+        output_dir (str): Folder where the pstats files are written.
+
+    Returns:
+        list: The profile ids.
+    """
+    if not os.path.isdir(output_dir):
+        return []
+    profiles = sorted(Path(output_dir).glob("*.pstats"), key=lambda p: p.stat().st_mtime, reverse=True)
+    return [profile.stem for profile in profiles]
+
+
+def read_profile_report(output_dir: str, profile_id: str, sort_by: str = "cumulative", limit: int = 40) -> str:
+    """
+    Renders a stored profile as the text report of `pstats`.
+
+    Args:
+        output_dir (str): Folder where the pstats files are written.
+        profile_id (str): The id returned in the `X-Profile-Id` header.
+        sort_by (str): The pstats sort key.
+        limit (int): The number of functions in the report.
+
+    Returns:
+        str: The report.
+
+    Raises:
+        FileNotFoundError: If the profile does not exist.
+    """
+    path = Path(output_dir) / f"{Path(profile_id).name}.pstats"
+    if not path.exists():
+        raise FileNotFoundError(f"Profile '{profile_id}' not found.")
+
+    stream = io.StringIO()
+    pstats.Stats(str(path), stream=stream).sort_stats(sort_by).print_stats(limit)
+    return stream.getvalue()
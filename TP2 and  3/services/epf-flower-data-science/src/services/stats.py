@@ -0,0 +1,252 @@
+import json, os, tempfile
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+STATS_FILE_NAME = "stats.json"
+STATS_FORMAT = 2
+HISTOGRAM_BINS = 20
+MAX_CATEGORIES = 100
+QUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+
+
+def _numeric_statistics(values: np.ndarray) -> dict:
+    valid = values[~np.isnan(values)]
+    mean = float(valid.mean()) if valid.size else None
+    stats = {
+        "kind": "numeric",
+        "count": int(valid.size),
+        "nulls": int(values.size - valid.size),
+        "mean": mean,
+        "m2": float(np.square(valid - mean).sum()) if valid.size else 0.0,
+        "min": float(valid.min()) if valid.size else None,
+        "max": float(valid.max()) if valid.size else None,
+    }
+    if valid.size:
+        counts, edges = np.histogram(valid, bins=HISTOGRAM_BINS)
+        stats["histogram"] = {"edges": edges.tolist(), "counts": counts.tolist()}
+    else:
+        stats["histogram"] = {"edges": [], "counts": []}
+    return stats
+
+
+def _categorical_statistics(column: pd.Series) -> dict:
+    counts = column.value_counts(dropna=True)
+    return {
+        "kind": "categorical",
+        "count": int(counts.sum()),
+        "nulls": int(column.isna().sum()),
+        "frequencies": {str(value): int(count) for value, count in counts.head(MAX_CATEGORIES).items()},
+        "other_count": int(counts.iloc[MAX_CATEGORIES:].sum()),
+    }
+
+
+def _histogram_quantiles(histogram: dict, quantiles: list) -> dict:
+    counts = np.asarray(histogram["counts"], dtype=float)
+    edges = np.asarray(histogram["edges"], dtype=float)
+    if counts.sum() == 0:
+        return {}
+    cumulative = np.concatenate([[0.0], np.cumsum(counts)]) / counts.sum()
+    values = np.interp(quantiles, cumulative, edges)
+    return {str(q): float(value) for q, value in zip(quantiles, values)}
+
+
+def _merge_moments(old: dict, new: dict):
+    # Chan et al. parallel update of the count, mean and sum of squared deviations (M2):
+    # exact, and without the cancellation of sum_squares / count - mean ** 2.
+    if not new["count"]:
+        return
+    if not old["count"]:
+        old.update(count=new["count"], mean=new["mean"], m2=new["m2"])
+        return
+    count = old["count"] + new["count"]
+    delta = new["mean"] - old["mean"]
+    old["mean"] += delta * new["count"] / count
+    old["m2"] += new["m2"] + delta ** 2 * old["count"] * new["count"] / count
+    old["count"] = count
+
+
+def _finalize(column_stats: dict) -> dict:
+    if column_stats["kind"] != "numeric":
+        return column_stats
+    count = column_stats["count"]
+    column_stats["std"] = float(np.sqrt(column_stats["m2"] / count)) if count else None
+    column_stats["quantiles"] = _histogram_quantiles(column_stats["histogram"], QUANTILES)
+    return column_stats
+
+
+def compute_statistics(dataset: pd.DataFrame) -> dict:
+    """
+    Computes the statistics of a dataset with one vectorized pass per column.
+
+    Numeric columns get count, nulls, min, max, mean, std, a histogram and approximate
+    quantiles (interpolated from the histogram). The other columns get the frequencies
+    of their categories.
+
+    Args:
+        dataset (pd.DataFrame): The dataset.
+
+    Returns:
+        dict: The number of rows and the statistics of each column.
+    """
+    columns = {}
+    for name in dataset.columns:
+        column = dataset[name]
+        if pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column):
+            column_stats = _numeric_statistics(column.to_numpy(dtype=float, na_value=np.nan))
+        else:
+            column_stats = _categorical_statistics(column)
+        column_stats["dtype"] = str(column.dtype)
+        columns[str(name)] = _finalize(column_stats)
+
+    return {"format": STATS_FORMAT, "version": 1, "rows": int(len(dataset)), "columns": columns}
+
+
+def _merge_histograms(old: dict, values: np.ndarray) -> dict:
+    if not old["edges"]:
+        if not values.size:
+            return old
+        counts, edges = np.histogram(values, bins=HISTOGRAM_BINS)
+        return {"edges": edges.tolist(), "counts": counts.tolist()}
+
+    edges = np.asarray(old["edges"])
+    low = min(edges[0], values.min()) if values.size else edges[0]
+    high = max(edges[-1], values.max()) if values.size else edges[-1]
+    if low < edges[0] or high > edges[-1]:
+        new_edges = np.linspace(low, high, len(edges))
+        midpoints = (edges[:-1] + edges[1:]) / 2
+        counts, _ = np.histogram(midpoints, bins=new_edges, weights=np.asarray(old["counts"], dtype=float))
+        edges = new_edges
+    else:
+        counts = np.asarray(old["counts"], dtype=float)
+
+    new_counts, _ = np.histogram(values, bins=edges)
+    return {"edges": edges.tolist(), "counts": (counts + new_counts).astype(int).tolist()}
+
+
+def conform_rows(stats: dict, rows: list, columns) -> pd.DataFrame:
+    """
+    Builds the frame of rows to append with the columns of the dataset, each cast to the kind
+    recorded in the statistics: missing values of a categorical column stay categorical
+    instead of becoming a float column, and nulls in a numeric column keep it numeric.
+    Columns that are not in the dataset are dropped.
+
+    Args:
+        stats (dict): The statistics of the dataset.
+        rows (list): The rows, as dictionaries.
+        columns (list): The columns of the dataset, in file order.
+
+    Raises:
+        ValueError: If a value of a numeric column is not a number.
+
+    Returns:
+        pd.DataFrame: The rows.
+    """
+    new_rows = pd.DataFrame(rows).reindex(columns=columns)
+
+    for name in columns:
+        column_stats = stats["columns"].get(str(name))
+        if column_stats is None:
+            continue
+        column = new_rows[name]
+        if column_stats["kind"] == "numeric":
+            converted = pd.to_numeric(column, errors="coerce")
+            invalid = converted.isna() & column.notna()
+            if invalid.any():
+                raise ValueError(f"Column '{name}' is numeric, got {column[invalid].iloc[0]!r}.")
+            new_rows[name] = converted
+        else:
+            new_rows[name] = column.astype(object).where(column.notna(), None)
+    return new_rows
+
+
+def update_statistics(stats: dict, new_rows: pd.DataFrame) -> dict:
+    """
+    Updates the statistics with appended rows, without reading the existing data again.
+
+    Counts, means, standard deviations, min and max are exact: the means and the sums of
+    squared deviations are merged with Chan's parallel update. The histogram keeps its number of bins: when the
+    new values are out of its range the bins are widened and the old counts moved to the
+    bin of their midpoint, so the quantiles stay approximate.
+
+    Args:
+        stats (dict): The statistics computed by `compute_statistics`.
+        new_rows (pd.DataFrame): The appended rows, see `conform_rows`.
+
+    Raises:
+        ValueError: If a column of the rows is not of the kind recorded in the statistics.
+
+    Returns:
+        dict: The updated statistics.
+    """
+    added = compute_statistics(new_rows)
+    for name, new_stats in added["columns"].items():
+        old_stats = stats["columns"].get(name)
+        if old_stats is None or old_stats["kind"] != new_stats["kind"]:
+            if old_stats is not None:
+                raise ValueError(f"Column '{name}' changed from {old_stats['kind']} to {new_stats['kind']}.")
+            new_stats["nulls"] += stats["rows"]
+            stats["columns"][name] = new_stats
+            continue
+
+        old_stats["nulls"] += new_stats["nulls"]
+        if old_stats["kind"] == "numeric":
+            values = new_rows[name].to_numpy(dtype=float, na_value=np.nan)
+            values = values[~np.isnan(values)]
+            old_stats["histogram"] = _merge_histograms(old_stats["histogram"], values)
+            _merge_moments(old_stats, new_stats)
+            bounds = [value for value in (old_stats["min"], new_stats["min"]) if value is not None]
+            old_stats["min"] = min(bounds) if bounds else None
+            bounds = [value for value in (old_stats["max"], new_stats["max"]) if value is not None]
+            old_stats["max"] = max(bounds) if bounds else None
+            _finalize(old_stats)
+        else:
+            old_stats["count"] += new_stats["count"]
+            frequencies = old_stats["frequencies"]
+            for value, count in new_stats["frequencies"].items():
+                frequencies[value] = frequencies.get(value, 0) + count
+            top = sorted(frequencies.items(), key=lambda item: item[1], reverse=True)
+            old_stats["frequencies"] = dict(top[:MAX_CATEGORIES])
+            old_stats["other_count"] += new_stats["other_count"] + sum(count for _, count in top[MAX_CATEGORIES:])
+
+    for name, old_stats in stats["columns"].items():
+        if name not in added["columns"]:
+            old_stats["nulls"] += len(new_rows)
+
+    stats["rows"] += len(new_rows)
+    stats["version"] += 1
+    return stats
+
+
+def write_statistics(stats: dict, dataset_dir: Path):
+    """
+    Writes the statistics sidecar next to the dataset files. Each writer uses its own
+    temporary file, so concurrent writes replace the sidecar whole, the last one winning.
+    """
+    path = Path(dataset_dir) / STATS_FILE_NAME
+    with tempfile.NamedTemporaryFile("w", dir=path.parent, prefix=f"{path.stem}.", suffix=".tmp",
+                                     delete=False) as file:
+        temporary_path = file.name
+        try:
+            json.dump(stats, file, indent=4)
+        except BaseException:
+            file.close()
+            os.remove(temporary_path)
+            raise
+    os.replace(temporary_path, path)
+
+
+def read_statistics(dataset_dir: Path) -> Optional[dict]:
+    """
+    Reads the statistics sidecar of a dataset.
+
+    Returns:
+        dict: The statistics, or None if the sidecar does not exist.
+    """
+    path = Path(dataset_dir) / STATS_FILE_NAME
+    if not path.exists():
+        return None
+    with open(path, "r") as file:
+        return json.load(file)
@@ -0,0 +1,178 @@
+import asyncio, json, math, os
+from typing import Callable
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+DEFAULT_MAX_BATCH_SIZE = 256
+DEFAULT_MAX_WAIT_MS = 5.0
+DEFAULT_MAX_PENDING = 1024
+STREAMING_CONFIG_PATH = "src/config/streaming.json"
+
+_END_OF_STREAM = object()
+
+
+def load_streaming_settings(config_file_path: str = STREAMING_CONFIG_PATH) -> dict:
+    """
+    Loads the prediction stream settings.
+
+    Returns:
+        dict: `limits`, the largest `max_batch_size`, `max_wait_ms` and `max_pending` a
+        client may ask for; larger values are lowered to the limit.
+    """
+    settings = {"limits": {"max_batch_size": 1024, "max_wait_ms": 100.0, "max_pending": 4096}}
+    if os.path.exists(config_file_path):
+        with open(config_file_path, "r") as file:
+            settings.update(json.load(file))
+    return settings
+
+
+def clamp_stream_parameters(settings: dict, max_batch_size: int, max_wait_ms: float, max_pending: int) -> dict:
+    """
+    Bounds the stream parameters asked by a client with the limits of the settings, so that
+    a client cannot turn off the backpressure or hold rows for long.
+
+    Returns:
+        dict: `max_batch_size`, `max_wait_ms` and `max_pending`, the arguments of `stream_predictions`.
+    """
+    limits = settings["limits"]
+    if math.isnan(max_wait_ms):
+        max_wait_ms = DEFAULT_MAX_WAIT_MS
+    return {
+        "max_batch_size": min(max(max_batch_size, 1), limits["max_batch_size"]),
+        "max_wait_ms": min(max(max_wait_ms, 0.0), limits["max_wait_ms"]),
+        "max_pending": min(max(max_pending, 1), limits["max_pending"]),
+    }
+
+
+def _is_feature_row(features, n_features: int) -> bool:
+    return isinstance(features, list) and len(features) == n_features and all(
+        isinstance(value, (int, float)) and not isinstance(value, bool) for value in features
+    )
+
+
+async def _receive_rows(websocket: WebSocket, queue: asyncio.Queue, n_features: int):
+    """
+    Reads the rows sent by the client and queues them as (id, features, error). When the
+    queue is full, `put` waits, so the socket is not read anymore and the client is slowed
+    down by TCP backpressure. Invalid rows and binary frames are queued with their error, so
+    that only the batch loop writes to the socket. The end of the stream is always queued,
+    except when the task is cancelled by the batch loop.
+    """
+    cancelled = False
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("text") is None:
+                await queue.put((None, None, "Binary frames are not supported, send JSON text messages."))
+                continue
+            try:
+                message = json.loads(message["text"])
+            except ValueError:
+                message = None
+            row_id = message.get("id") if isinstance(message, dict) else None
+            features = message.get("features") if isinstance(message, dict) else None
+            if not _is_feature_row(features, n_features):
+                await queue.put((row_id, None, f"'features' must be a list of {n_features} numbers."))
+                continue
+            await queue.put((row_id, features, None))
+    except asyncio.CancelledError:
+        cancelled = True
+        raise
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if not cancelled:
+            await queue.put(_END_OF_STREAM)
+
+
+async def _next_batch(queue: asyncio.Queue, max_batch_size: int, max_wait: float) -> tuple:
+    """
+    Waits for a first row, then collects rows until the batch is full or `max_wait`
+    seconds have passed since the first row.
+
+    Returns:
+        tuple: The batch of (id, features) and whether the stream has ended.
+    """
+    first = await queue.get()
+    if first is _END_OF_STREAM:
+        return [], True
+
+    batch = [first]
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_wait
+    while len(batch) < max_batch_size:
+        if not queue.empty():
+            item = queue.get_nowait()
+        else:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+        if item is _END_OF_STREAM:
+            return batch, True
+        batch.append(item)
+    return batch, False
+
+
+async def stream_predictions(websocket: WebSocket, predict_batch: Callable, n_features: int,
+                             max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                             max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+                             max_pending: int = DEFAULT_MAX_PENDING):
+    """
+    Serves a stream of feature rows on an accepted WebSocket.
+
+    The client sends `{"id": ..., "features": [...]}` messages. The rows are micro-batched
+    (up to `max_batch_size` rows or `max_wait_ms` after the first row of the batch), each batch
+    is predicted with one vectorized call in the threadpool, and the results are sent back as
+    `{"results": [{"id": ..., "prediction": ...}, ...]}`. Invalid rows and binary frames get
+    `{"id": ..., "error": ...}` results in the batch they arrived with; all the messages are
+    sent by this loop, never concurrently.
+
+    At most `max_pending` rows wait for a batch: beyond that the socket is not read until
+    the results have been sent, so a client that does not read its results is slowed down.
+
+    Args:
+        websocket (WebSocket): The accepted WebSocket.
+        predict_batch (callable): Takes a (n_rows, n_features) matrix and returns the predictions.
+        n_features (int): The number of features of a row.
+        max_batch_size (int): The maximum number of rows of a batch.
+        max_wait_ms (float): The maximum time a row waits for its batch to fill.
+        max_pending (int): The maximum number of rows waiting for a batch.
+    """
+    queue = asyncio.Queue(maxsize=max_pending)
+    receiver = asyncio.create_task(_receive_rows(websocket, queue, n_features))
+    try:
+        finished = False
+        while not finished:
+            batch, finished = await _next_batch(queue, max_batch_size, max_wait_ms / 1000)
+            if not batch:
+                continue
+
+            results = [{"id": row_id, "error": error} for row_id, _, error in batch if error is not None]
+            rows = [(row_id, features) for row_id, features, error in batch if error is None]
+            ids = [row_id for row_id, _ in rows]
+            try:
+                if rows:
+                    matrix = np.asarray([features for _, features in rows], dtype=np.float64)
+                    predictions = await run_in_threadpool(predict_batch, matrix)
+                    results += [{"id": row_id, "prediction": prediction} for row_id, prediction in zip(ids, np.asarray(predictions).tolist())]
+            except Exception as e:
+                results += [{"id": row_id, "error": f"An error occurred during prediction: {str(e)}"} for row_id in ids]
+
+            try:
+                await websocket.send_json({"results": results})
+            except (WebSocketDisconnect, RuntimeError):
+                break
+    finally:
+        receiver.cancel()
+        try:
+            await receiver
+        except (asyncio.CancelledError, WebSocketDisconnect):
+            pass
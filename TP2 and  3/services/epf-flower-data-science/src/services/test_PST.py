@@ -1,7 +1,7 @@
 import unittest
 import pandas as pd
 import json
-from PST import process_dataset, split_dataset, load_model_parameters, train_model
+from PST import process_dataset, split_dataset, load_model_parameters, resolve_model_parameters, train_model
 
 class TestModelPipeline(unittest.TestCase):
 
@@ -49,6 +49,13 @@ class TestModelPipeline(unittest.TestCase):
         self.assertListEqual(list(X_train.columns), ["sepal_length", "sepal_width", "petal_length", "petal_width"])
         self.assertEqual(len(X_train), len(y_train))
 
+    def test_resolve_model_parameters_ignores_runtime_parameters(self):
+        resolved = resolve_model_parameters(self.model_parameters)
+
+        self.assertEqual(resolve_model_parameters(dict(self.model_parameters, n_jobs=4, verbose=1)), resolved)
+        self.assertNotIn("n_jobs", resolved)
+        self.assertNotEqual(resolve_model_parameters(dict(self.model_parameters, max_depth=3)), resolved)
+
     def test_load_model_parameters(self):
         file_path = "test_parameters.json"
         with open(file_path, "w") as file:
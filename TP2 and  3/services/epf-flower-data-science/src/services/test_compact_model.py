@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from sklearn.datasets import load_iris, make_classification
+from sklearn.ensemble import RandomForestClassifier
+from compact_model import CompactForest, export_compact_model, _float32_thresholds
+
+
+@pytest.fixture(scope="module")
+def forest_and_data():
+    X, y = make_classification(n_samples=2000, n_features=8, n_informative=5, n_classes=3, random_state=0)
+    forest = RandomForestClassifier(n_estimators=30, random_state=0).fit(X[:1500], y[:1500])
+    return forest, X
+
+
+def test_float32_thresholds_keep_branches():
+    """
+    Test that the float32 thresholds send every float32 value to the same branch.
+    """
+    thresholds = np.array([0.1, 2.35, 1e-8, -3.3])
+    values = np.nextafter(thresholds.astype(np.float32), np.float32(np.inf))
+
+    rounded = _float32_thresholds(thresholds)
+
+    assert rounded.dtype == np.float32
+    np.testing.assert_array_equal(values <= rounded, values.astype(np.float64) <= thresholds)
+
+
+def test_same_predictions(forest_and_data):
+    """
+    Test that the compact forest gives exactly the probabilities of the forest.
+    """
+    forest, X = forest_and_data
+
+    compact = CompactForest.from_forest(forest)
+
+    np.testing.assert_array_equal(compact.predict_proba(X), forest.predict_proba(X))
+    np.testing.assert_array_equal(compact.predict(X), forest.predict(X))
+
+
+def test_identical_subtrees_are_shared():
+    """
+    Test that the node table is smaller than the trees once identical subtrees are shared.
+    """
+    X, y = load_iris(return_X_y=True)
+    forest = RandomForestClassifier(n_estimators=20, random_state=42).fit(X, y)
+
+    compact = CompactForest.from_forest(forest)
+
+    assert len(compact.feature) < sum(tree.tree_.node_count for tree in forest.estimators_)
+    assert compact.left.dtype.itemsize <= 2
+    assert compact.threshold.dtype == np.float32
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_export_and_load(forest_and_data, tmp_path, compress):
+    """
+    Test that an exported forest is read back with the same predictions.
+    """
+    forest, X = forest_and_data
+    path = str(tmp_path / "model.npz")
+
+    export_compact_model(forest, X[:1500], path, compress=compress)
+    loaded = CompactForest.load(path)
+
+    np.testing.assert_array_equal(loaded.predict(X), forest.predict(X))
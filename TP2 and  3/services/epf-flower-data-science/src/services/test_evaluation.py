@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import confusion_matrix, precision_score, recall_score
+from evaluation import UnknownLabels, classification_metrics, evaluate_forest, forest_pass
+from parallel_training import fit_sharded
+
+
+@pytest.fixture
+def dataset():
+    X, y = make_classification(n_samples=300, n_features=6, n_informative=4, n_classes=3, random_state=0)
+    labels = np.array(["a", "b", "c"])[y]
+    return pd.DataFrame(X[:240]), pd.Series(labels[:240]), pd.DataFrame(X[240:]), pd.Series(labels[240:])
+
+
+def test_classification_metrics_match_scikit_learn():
+    """
+    Test the accuracy, precision, recall and confusion matrix against sklearn.metrics.
+    """
+    y_true = np.array(["b", "a", "c", "a", "b", "c", "a"])
+    y_pred = np.array(["b", "a", "a", "a", "c", "c", "b"])
+    classes = np.array(["a", "b", "c"])
+
+    metrics = classification_metrics(y_true, y_pred, classes)
+
+    assert metrics["accuracy"] == pytest.approx(4 / 7)
+    assert metrics["confusion_matrix"]["matrix"] == confusion_matrix(y_true, y_pred, labels=classes).tolist()
+    precision = precision_score(y_true, y_pred, labels=classes, average=None)
+    recall = recall_score(y_true, y_pred, labels=classes, average=None)
+    for i, label in enumerate(classes):
+        assert metrics["per_class"][label]["precision"] == pytest.approx(precision[i])
+        assert metrics["per_class"][label]["recall"] == pytest.approx(recall[i])
+
+
+def test_classification_metrics_rejects_unknown_labels():
+    """
+    Test that labels outside the classes raise instead of being counted as another class.
+    """
+    classes = np.array(["a", "b", "c"])
+
+    with pytest.raises(UnknownLabels, match="bb"):
+        classification_metrics(np.array(["a", "bb"]), np.array(["a", "b"]), classes)
+    with pytest.raises(UnknownLabels, match="z"):
+        classification_metrics(np.array(["a", "b"]), np.array(["a", "z"]), classes)
+
+
+def test_oob_matches_scikit_learn(dataset):
+    """
+    Test that the out-of-bag probabilities and the held-out ones are the forest's own.
+    """
+    X_train, y_train, X_test, _ = dataset
+    forest = RandomForestClassifier(n_estimators=30, oob_score=True, random_state=1).fit(X_train, y_train)
+
+    predictions = forest_pass(forest, X_train, X_test)
+    probabilities, counts = predictions["oob"]
+
+    np.testing.assert_allclose(probabilities / counts[:, None], forest.oob_decision_function_)
+    np.testing.assert_allclose(predictions["test"], forest.predict_proba(X_test))
+
+
+def test_evaluate_sharded_forest(dataset):
+    """
+    Test that a forest merged from shards, which has no OOB attributes, gets OOB metrics.
+    """
+    X_train, y_train, X_test, y_test = dataset
+    forest = fit_sharded(X_train, y_train, {"n_estimators": 40, "random_state": 42}, n_shards=4, n_workers=1)
+
+    evaluation = evaluate_forest(forest, X_train, y_train, X_test, y_test, fit_seconds=60.0,
+                                 settings={"oob": True, "budget_pct": 10})
+
+    assert evaluation["oob"]["coverage"] == 1.0
+    assert 0.5 < evaluation["oob"]["accuracy"] <= 1.0
+    assert evaluation["holdout"]["accuracy"] == pytest.approx((forest.predict(X_test) == y_test).mean())
+    assert evaluation["within_budget"]
+
+
+def test_evaluate_skips_oob_over_budget(dataset):
+    """
+    Test that the OOB metrics are skipped, and the held-out ones kept, when the budget is exceeded.
+    """
+    X_train, y_train, X_test, y_test = dataset
+    forest = RandomForestClassifier(n_estimators=20, random_state=1).fit(X_train, y_train)
+
+    evaluation = evaluate_forest(forest, X_train, y_train, X_test, y_test, fit_seconds=1e-9,
+                                 settings={"oob": True, "budget_pct": 10})
+
+    assert evaluation["oob"] == {"skipped": "over budget"}
+    assert evaluation["holdout"]["rows"] == len(X_test)
+    assert not evaluation["within_budget"]
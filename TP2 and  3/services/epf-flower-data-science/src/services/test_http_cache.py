@@ -0,0 +1,65 @@
+import gzip
+from http_cache import BodyCache, compress, encoded_etag, file_digest, load_http_cache_settings, negotiate_encoding, not_modified, strong_etag
+
+
+def test_not_modified_matches_encoded_and_weak_etags():
+    """
+    Test that If-None-Match matches the ETag with or without content coding suffix or weak prefix.
+    """
+    etag = strong_etag("digest", "Load", "application/json")
+
+    assert not_modified(etag, etag)
+    assert not_modified(f'"other", {encoded_etag(etag, "gzip")}', etag)
+    assert not_modified(f"W/{etag}", etag)
+    assert not_modified("*", etag)
+    assert not not_modified('"other"', etag)
+    assert not not_modified(None, etag)
+
+
+def test_negotiate_encoding():
+    """
+    Test that the accepted coding with the highest q-value wins, in the server order on ties.
+    """
+    assert negotiate_encoding("gzip, br", ["br", "gzip"]) == "br"
+    assert negotiate_encoding("gzip;q=1, br;q=0.5", ["br", "gzip"]) == "gzip"
+    assert negotiate_encoding("br", ["gzip"]) == "identity"
+    assert negotiate_encoding("*", ["gzip"]) == "gzip"
+    assert negotiate_encoding(None, ["gzip"]) == "identity"
+
+
+def test_gzip_is_deterministic():
+    """
+    Test that gzip bodies do not depend on the time, so that they can be cached.
+    """
+    settings = load_http_cache_settings()
+    body = b"x" * 10000
+
+    assert compress(body, "gzip", settings) == compress(body, "gzip", settings)
+    assert gzip.decompress(compress(body, "gzip", settings)) == body
+
+
+def test_file_digest_follows_changes(tmp_path):
+    """
+    Test that the digest changes with the content of the file.
+    """
+    path = tmp_path / "data.csv"
+    path.write_text("a\n1\n")
+    first = file_digest(path)
+    path.write_text("a\n1\n2\n")
+
+    assert file_digest(path) != first
+
+
+def test_body_cache_byte_budget():
+    """
+    Test that the least recently used bodies are removed beyond the budget.
+    """
+    cache = BodyCache(max_bytes=10)
+    cache.put('"a"', "gzip", b"12345")
+    cache.put('"b"', "gzip", b"12345")
+    cache.get('"a"', "gzip")
+    cache.put('"c"', "gzip", b"12345")
+
+    assert cache.get('"b"', "gzip") is None
+    assert cache.get('"a"', "gzip") == b"12345"
+    assert cache.total_bytes == 10
@@ -0,0 +1,108 @@
+import os
+import random
+import threading
+import time
+import pandas as pd
+import pytest
+import load
+from load import append_to_dataset, download_kaggle_files, read_dataset
+
+ROWS = 500
+
+
+class SlowKaggleApi:
+    """
+    Extracts a CSV in chunks after a random delay, like unzips started at different times.
+    """
+    fail = False
+    downloads = 0
+
+    def authenticate(self):
+        pass
+
+    def dataset_download_files(self, dataset, path=".", unzip=False):
+        if self.fail:
+            raise RuntimeError("download failed")
+        SlowKaggleApi.downloads += 1
+        time.sleep(random.uniform(0, 0.01))
+        with open(os.path.join(path, "data.csv"), "w") as file:
+            file.write("a,b\n")
+            for i in range(ROWS):
+                file.write(f"{i},{i * 2}\n")
+                if i % 100 == 0:
+                    file.flush()
+                    time.sleep(0.001)
+
+
+@pytest.fixture
+def kaggle(monkeypatch, tmp_path):
+    monkeypatch.setattr(load, "KaggleApi", SlowKaggleApi)
+    monkeypatch.setattr(SlowKaggleApi, "downloads", 0)
+    monkeypatch.setattr(load, "DATA_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_concurrent_downloads_read_complete_files(kaggle):
+    """
+    Test that requests loading the same dataset at the same time never read a partly extracted
+    file, and share the downloads running when they arrive.
+    """
+    row_counts, errors = [], []
+
+    def load_dataset():
+        try:
+            row_counts.append(len(read_dataset(download_kaggle_files("https://www.kaggle.com/datasets/owner/race"))))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=load_dataset) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert row_counts == [ROWS] * 8
+    assert SlowKaggleApi.downloads < 8
+    assert sorted(path.name for path in kaggle.iterdir()) == ["race"]
+
+
+def test_failed_download_keeps_previous_files(kaggle, monkeypatch):
+    """
+    Test that a failed download leaves the dataset already there and no temporary folder.
+    """
+    csv_file = download_kaggle_files("https://www.kaggle.com/datasets/owner/kept")
+    monkeypatch.setattr(SlowKaggleApi, "fail", True)
+
+    with pytest.raises(RuntimeError):
+        download_kaggle_files("https://www.kaggle.com/datasets/owner/kept")
+
+    assert len(read_dataset(csv_file)) == ROWS
+    assert sorted(path.name for path in kaggle.iterdir()) == ["kept"]
+
+
+def test_download_keeps_appended_rows(kaggle):
+    """
+    Test that the rows appended to a dataset are added again to the file of the next download.
+    """
+    csv_file = download_kaggle_files("https://www.kaggle.com/datasets/owner/appended")
+    append_to_dataset(csv_file, pd.DataFrame({"a": [-1], "b": [-2]}))
+
+    csv_file = download_kaggle_files("https://www.kaggle.com/datasets/owner/appended")
+
+    dataset = read_dataset(csv_file)
+    assert len(dataset) == ROWS + 1
+    assert dataset.iloc[-1].tolist() == [-1, -2]
+    assert SlowKaggleApi.downloads == 2
+
+
+def test_recent_download_is_reused(kaggle):
+    """
+    Test that a dataset downloaded less than `max_age_seconds` ago is not downloaded again.
+    """
+    first = download_kaggle_files("https://www.kaggle.com/datasets/owner/recent", max_age_seconds=60)
+    second = download_kaggle_files("https://www.kaggle.com/datasets/owner/recent", max_age_seconds=60)
+
+    assert first == second
+    assert SlowKaggleApi.downloads == 1
+    assert load.load_download_settings(config_file_path="missing.json") == {"max_age_seconds": 3600}
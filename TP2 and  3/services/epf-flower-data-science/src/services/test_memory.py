@@ -0,0 +1,73 @@
+import pytest
+from memory import MemoryTracker, MemoryLimitExceeded, load_memory_settings
+
+
+def test_tracker_reports_stages():
+    """
+    Test that every stage is reported with its peak and retained bytes.
+    """
+    with MemoryTracker("test", use_tracemalloc=True) as tracker:
+        with tracker.stage("allocate"):
+            kept = bytearray(2_000_000)
+        with tracker.stage("temporary"):
+            temporary = bytearray(4_000_000)
+            del temporary
+
+    report = tracker.report()
+
+    assert [stage["stage"] for stage in report["stages"]] == ["allocate", "temporary"]
+    assert report["stages"][0]["retained_bytes"] >= 2_000_000
+    assert report["stages"][1]["peak_bytes"] >= 4_000_000
+    assert report["stages"][1]["retained_bytes"] < 1_000_000
+    assert report["peak_bytes"] >= 6_000_000
+    assert len(kept) == 2_000_000
+
+
+def test_tracker_aborts_over_ceiling():
+    """
+    Test that a stage going over the ceiling raises MemoryLimitExceeded.
+    """
+    with pytest.raises(MemoryLimitExceeded) as error:
+        with MemoryTracker("test", ceiling_bytes=1_000_000, use_tracemalloc=True) as tracker:
+            with tracker.stage("allocate"):
+                data = bytearray(3_000_000)
+
+    assert error.value.stage == "allocate"
+    assert error.value.ceiling_bytes == 1_000_000
+
+
+def test_ensure_fits():
+    """
+    Test that an estimated allocation over the ceiling is refused before it happens.
+    """
+    with MemoryTracker("test", ceiling_bytes=1_000_000, use_tracemalloc=True) as tracker:
+        tracker.ensure_fits(1000, "load")
+        with pytest.raises(MemoryLimitExceeded):
+            tracker.ensure_fits(5_000_000, "load")
+
+
+def test_for_job_uses_job_ceiling(tmp_path):
+    """
+    Test that the ceiling of the job overrides the default one.
+    """
+    settings = {"ceiling_bytes": 100, "job_ceilings": {"pst": 200}, "tracemalloc_jobs": ["pst"]}
+
+    assert MemoryTracker.for_job("pst", settings).ceiling_bytes == 200
+    assert MemoryTracker.for_job("pst", settings).use_tracemalloc
+    assert MemoryTracker.for_job("load", settings).ceiling_bytes == 100
+    assert load_memory_settings(str(tmp_path / "missing.json"))["ceiling_bytes"] is None
+
+
+def test_concurrent_job_keeps_its_peak():
+    """
+    Test that a stage of another traced job does not reset the peak of a running one.
+    """
+    with MemoryTracker("first", use_tracemalloc=True) as first:
+        with first.stage("allocate"):
+            temporary = bytearray(4_000_000)
+            del temporary
+            with MemoryTracker("second", use_tracemalloc=True) as second:
+                with second.stage("small"):
+                    pass
+
+    assert first.report()["stages"][0]["peak_bytes"] >= 4_000_000
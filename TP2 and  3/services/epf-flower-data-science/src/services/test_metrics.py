@@ -0,0 +1,20 @@
+from metrics import increment, observe, set_gauge, snapshot, reset
+
+
+def test_metrics_snapshot():
+    """
+    Test that counters, gauges and summaries are reported by series of labels.
+    """
+    reset()
+    increment("loads", job="load")
+    increment("loads", job="load")
+    set_gauge("models_in_memory", 3)
+    observe("latency_seconds", 0.5, model="iris")
+    observe("latency_seconds", 1.5, model="iris")
+
+    metrics = snapshot()
+
+    assert metrics["counters"] == [{"name": "loads", "labels": {"job": "load"}, "value": 2}]
+    assert metrics["gauges"] == [{"name": "models_in_memory", "labels": {}, "value": 3}]
+    assert metrics["summaries"][0]["value"] == {"count": 2, "sum": 2.0, "max": 1.5, "last": 1.5}
+    reset()
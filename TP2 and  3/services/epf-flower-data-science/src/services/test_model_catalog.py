@@ -0,0 +1,131 @@
+import joblib
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from model_catalog import ModelCache, register_model, get_model_entry, forget_fingerprints, load_catalog
+from src.services.compact_model import CompactForest, export_compact_model
+from src.services import metrics
+
+FEATURES = ["sepal_length", "sepal_width", "petal_length", "petal_width"]
+
+
+@pytest.fixture
+def model_file(tmp_path):
+    X_train = pd.DataFrame([[5.1, 3.5, 1.4, 0.2], [6.7, 3.0, 5.2, 2.3]], columns=FEATURES)
+    model = RandomForestClassifier(n_estimators=3, random_state=42).fit(X_train, ["setosa", "virginica"])
+    path = tmp_path / "model.pkl"
+    joblib.dump(model, path)
+    return str(path)
+
+
+def test_register_model_versions(model_file, tmp_path):
+    """
+    Test that a new fingerprint adds a version and a known one activates it again.
+    """
+    catalog_path = str(tmp_path / "catalog.json")
+
+    first = register_model("iris", "iris", FEATURES, "species", model_file, fingerprint="a", catalog_path=catalog_path)
+    second = register_model("iris", "iris", FEATURES, "species", model_file, fingerprint="b", catalog_path=catalog_path)
+    again = register_model("iris", "iris", FEATURES, "species", model_file, fingerprint="a", catalog_path=catalog_path)
+
+    assert (first, second, again) == ("1", "2", "1")
+    version, entry = get_model_entry("iris", catalog_path=catalog_path)
+    assert version == "1"
+    assert entry["features"] == FEATURES
+    assert get_model_entry("iris", "2", catalog_path=catalog_path)[0] == "2"
+    with pytest.raises(KeyError):
+        get_model_entry("cityride", catalog_path=catalog_path)
+
+
+def test_catalog_created_from_template(model_file, tmp_path):
+    """
+    Test that a missing catalog is created from its template on first read, and is empty
+    without one.
+    """
+    (tmp_path / "catalog.default.json").write_text(
+        '{"models": {"iris": {"versions": {"1": {"model_path": "model.pkl"}}, "active_version": "1"}}}')
+
+    assert get_model_entry("iris", catalog_path=str(tmp_path / "catalog.json"))[0] == "1"
+    assert (tmp_path / "catalog.json").exists()
+    assert load_catalog(str(tmp_path / "other.json")) == {"models": {}}
+    assert register_model("iris", "iris", FEATURES, "species", model_file, fingerprint="a",
+                          catalog_path=str(tmp_path / "catalog.json")) == "2"
+
+
+def test_forget_fingerprints_keeps_active_version(model_file, tmp_path):
+    """
+    Test that removed artifacts are dropped from the catalog, except the active version.
+    """
+    catalog_path = str(tmp_path / "catalog.json")
+    register_model("iris", "iris", FEATURES, "species", model_file, fingerprint="a", catalog_path=catalog_path)
+    register_model("iris", "iris", FEATURES, "species", model_file, fingerprint="b", catalog_path=catalog_path)
+
+    forget_fingerprints(["a", "b"], catalog_path=catalog_path)
+
+    assert list(load_catalog(catalog_path)["models"]["iris"]["versions"]) == ["2"]
+
+
+def test_model_cache_evicts_least_recently_used(model_file):
+    """
+    Test that the cache loads models once, evicts the least recently used one and loads it again.
+    """
+    metrics.reset()
+    cache = ModelCache(max_bytes=10**9, max_models=2)
+    info = {"model_path": model_file}
+
+    first = cache.get("a", "1", info)
+    assert cache.get("a", "1", info) is first
+    cache.get("b", "1", info)
+    cache.get("a", "1", info)
+    cache.get("c", "1", info)
+
+    assert [loaded["model"] for loaded in cache.loaded()] == ["a", "c"]
+    cache.get("b", "1", info)
+    counters = {(serie["name"], serie["labels"].get("model")): serie["value"] for serie in metrics.snapshot()["counters"]}
+    assert counters[("model_loads", "a")] == 1
+    assert counters[("model_loads", "b")] == 2
+    assert counters[("model_evictions", "b")] == 1
+
+
+def test_model_cache_byte_budget(model_file):
+    """
+    Test that the byte budget keeps only the last model when two do not fit.
+    """
+    cache = ModelCache(max_bytes=1, max_models=8)
+    info = {"model_path": model_file}
+
+    cache.get("a", "1", info)
+    cache.get("b", "1", info)
+
+    assert [loaded["model"] for loaded in cache.loaded()] == ["b"]
+
+
+def test_model_cache_uses_pickle_for_large_batches(model_file, tmp_path):
+    """
+    Test that small batches get the compact copy and batches over the threshold the pickle.
+    """
+    model = joblib.load(model_file)
+    compact_path = str(tmp_path / "model.npz")
+    export_compact_model(model, pd.DataFrame([[5.1, 3.5, 1.4, 0.2], [6.7, 3.0, 5.2, 2.3]], columns=FEATURES), compact_path)
+    cache = ModelCache(max_bytes=10**9, max_models=8, compact_max_batch_rows=100)
+    info = {"model_path": model_file, "compact_model_path": compact_path}
+
+    assert isinstance(cache.get("iris", "1", info, batch_rows=1), CompactForest)
+    assert isinstance(cache.get("iris", "1", info), CompactForest)
+    assert isinstance(cache.get("iris", "1", info, batch_rows=1000), RandomForestClassifier)
+    assert [loaded["format"] for loaded in cache.loaded()] == ["compact", "pickle"]
+
+
+def test_model_cache_failed_load_is_retried(model_file, tmp_path):
+    """
+    Test that a failed load leaves no loading state behind and is retried on the next call.
+    """
+    cache = ModelCache(max_bytes=10**9, max_models=8)
+    missing = {"model_path": str(tmp_path / "missing.pkl")}
+
+    with pytest.raises(FileNotFoundError):
+        cache.get("a", "1", missing)
+    assert cache._loading == {}
+
+    assert cache.get("a", "1", {"model_path": model_file}) is not None
+    assert cache._loading == {}
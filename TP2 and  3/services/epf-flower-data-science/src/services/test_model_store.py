@@ -0,0 +1,103 @@
+import os
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from model_store import training_fingerprint, train_with_cache, list_artifacts, prune_store, find_artifact, read_evaluation
+
+
+@pytest.fixture
+def training_data():
+    X_train = pd.DataFrame({
+        "sepal_length": [5.1, 4.9, 6.7, 6.3],
+        "sepal_width": [3.5, 3.0, 3.0, 2.9],
+        "petal_length": [1.4, 1.4, 5.2, 5.6],
+        "petal_width": [0.2, 0.2, 2.3, 1.8],
+    })
+    y_train = pd.Series(["setosa", "setosa", "virginica", "virginica"])
+    return X_train, y_train
+
+
+@pytest.fixture
+def settings(tmp_path):
+    return {"store_dir": str(tmp_path / "store"), "keep_last": 2}
+
+
+def fit(X_train, y_train, params):
+    return RandomForestClassifier(**params).fit(X_train, y_train)
+
+
+def test_fingerprint_depends_on_data_and_parameters(training_data):
+    """
+    Test that the fingerprint is stable and changes with the data or the parameters.
+    """
+    X_train, y_train = training_data
+    params = {"n_estimators": 5, "random_state": 42}
+
+    fingerprint = training_fingerprint(X_train, y_train, params)
+
+    assert fingerprint == training_fingerprint(X_train.copy(), y_train.copy(), dict(params))
+    assert fingerprint != training_fingerprint(X_train, y_train, {"n_estimators": 6, "random_state": 42})
+    changed = X_train.copy()
+    changed.iloc[0, 0] = 5.2
+    assert fingerprint != training_fingerprint(changed, y_train, params)
+
+
+def test_train_with_cache_hit_skips_fit(training_data, settings, tmp_path):
+    """
+    Test that the second training with the same inputs activates the stored model without fitting.
+    """
+    X_train, y_train = training_data
+    params = {"n_estimators": 5, "random_state": 42}
+    active_path = str(tmp_path / "active.pkl")
+    calls = []
+
+    def counting_fit(*args):
+        calls.append(args)
+        return fit(*args)
+
+    first = train_with_cache(X_train, y_train, params, params, counting_fit, active_path, settings)
+    os.remove(active_path)
+    second = train_with_cache(X_train, y_train, params, params, counting_fit, active_path, settings)
+
+    assert (first["cache"], second["cache"]) == ("miss", "hit")
+    assert first["fingerprint"] == second["fingerprint"]
+    assert len(calls) == 1
+    assert os.path.exists(active_path)
+
+
+def test_store_keeps_last_artifacts(training_data, settings, tmp_path):
+    """
+    Test that only the keep_last most recently used artifacts are kept.
+    """
+    X_train, y_train = training_data
+    active_path = str(tmp_path / "active.pkl")
+
+    results = [
+        train_with_cache(X_train, y_train, {"n_estimators": n}, {"n_estimators": n}, fit, active_path, settings)
+        for n in (2, 3, 4)
+    ]
+
+    assert len(list_artifacts(settings["store_dir"])) == 2
+    assert find_artifact(results[0]["fingerprint"], settings["store_dir"]) is None
+    assert prune_store(1, settings["store_dir"]) == [results[1]["fingerprint"]]
+
+
+def test_evaluation_stored_with_artifact(training_data, settings, tmp_path):
+    """
+    Test that the evaluation of a new model is stored and returned on a cache hit without evaluating again.
+    """
+    X_train, y_train = training_data
+    params = {"n_estimators": 5, "random_state": 42}
+    active_path = str(tmp_path / "active.pkl")
+    calls = []
+
+    def evaluate(model, fit_seconds):
+        calls.append(fit_seconds)
+        return {"accuracy": 1.0}
+
+    first = train_with_cache(X_train, y_train, params, params, fit, active_path, settings, evaluate=evaluate)
+    second = train_with_cache(X_train, y_train, params, params, fit, active_path, settings, evaluate=evaluate)
+
+    assert first["evaluation"] == second["evaluation"] == {"accuracy": 1.0}
+    assert read_evaluation(first["fingerprint"], settings["store_dir"]) == {"accuracy": 1.0}
+    assert len(calls) == 1
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+from sklearn.datasets import load_iris
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+import parallel_training
+from parallel_training import shard_sizes, shard_seeds, fit_sharded, merge_forests, make_fit, engine_fingerprint, shutdown_executor
+
+PARAMS = {"n_estimators": 40, "max_depth": None, "max_features": "sqrt", "random_state": 42}
+
+
+@pytest.fixture(scope="module")
+def iris_split():
+    X, y = load_iris(return_X_y=True)
+    return train_test_split(X, y, test_size=0.2, random_state=42)
+
+
+def test_shard_sizes():
+    """
+    Test that all the trees are shared between the shards.
+    """
+    assert shard_sizes(100, 8) == [13, 13, 13, 13, 12, 12, 12, 12]
+    assert shard_sizes(3, 8) == [1, 1, 1]
+
+
+def test_shard_seeds_are_deterministic():
+    """
+    Test that the shard seeds only depend on the random_state.
+    """
+    assert shard_seeds(42, 4) == shard_seeds(42, 4)
+    assert len(set(shard_seeds(42, 4))) == 4
+
+
+def test_merged_accuracy_matches_single_process(iris_split):
+    """
+    Test that the merged forest is as accurate as a forest fitted in a single process.
+    """
+    X_train, X_test, y_train, y_test = iris_split
+
+    single = RandomForestClassifier(**PARAMS).fit(X_train, y_train)
+    merged = fit_sharded(X_train, y_train, PARAMS, n_shards=4, n_workers=1)
+
+    assert len(merged.estimators_) == PARAMS["n_estimators"]
+    assert merged.score(X_test, y_test) == pytest.approx(single.score(X_test, y_test), abs=0.05)
+
+
+def test_predictions_do_not_depend_on_workers(iris_split):
+    """
+    Test that fitting the shards in 1 or 2 worker processes gives the same predictions.
+    """
+    X_train, X_test, y_train, _ = iris_split
+
+    in_process = fit_sharded(X_train, y_train, PARAMS, n_shards=4, n_workers=1)
+    in_workers = fit_sharded(X_train, y_train, PARAMS, n_shards=4, n_workers=2)
+
+    np.testing.assert_array_equal(in_process.predict_proba(X_test), in_workers.predict_proba(X_test))
+
+
+def test_shutdown_executor_stops_workers(iris_split):
+    """
+    Test that the worker processes are stopped, and started again by the next sharded fit.
+    """
+    X_train, _, y_train, _ = iris_split
+    fit_sharded(X_train, y_train, PARAMS, n_shards=2, n_workers=2)
+    executor = parallel_training._executor
+
+    shutdown_executor()
+
+    assert parallel_training._executor is None
+    with pytest.raises(RuntimeError):
+        executor.submit(int)
+    assert len(fit_sharded(X_train, y_train, PARAMS, n_shards=2, n_workers=2).estimators_) == PARAMS["n_estimators"]
+    shutdown_executor()
+
+
+def test_merge_rejects_different_classes(iris_split):
+    """
+    Test that forests fitted on different classes are not merged.
+    """
+    X_train, _, y_train, _ = iris_split
+    first = RandomForestClassifier(n_estimators=2).fit(X_train, y_train)
+    second = RandomForestClassifier(n_estimators=2).fit(X_train[y_train < 2], y_train[y_train < 2])
+
+    with pytest.raises(ValueError):
+        merge_forests([first, second])
+
+
+def test_make_fit_single_engine():
+    """
+    Test that the single engine keeps the given fit function and fingerprint.
+    """
+    def single_fit(X_train, y_train, params):
+        return None
+
+    assert make_fit(single_fit, {"engine": "single"}) is single_fit
+    assert engine_fingerprint({"engine": "sharded", "n_shards": 8, "n_workers": 4}) == {"engine": "sharded", "n_shards": 8}
@@ -0,0 +1,181 @@
+import threading
+import time
+from unittest.mock import MagicMock
+from parameter_sync import ParameterSync, DebouncedTrigger, load_sync_settings
+from PST import merge_model_parameters
+
+
+def sync_settings(**overrides):
+    settings = load_sync_settings(config_file_path="missing.json")
+    settings.update(overrides)
+    return settings
+
+
+def client_with_document(data, on_snapshot=None):
+    client = MagicMock()
+    document_ref = client.collection.return_value.document.return_value
+    document_ref.get.return_value.exists = data is not None
+    document_ref.get.return_value.to_dict.return_value = data
+    if on_snapshot is None:
+        document_ref.on_snapshot.side_effect = AttributeError("on_snapshot")
+    else:
+        document_ref.on_snapshot.side_effect = on_snapshot
+    return client
+
+
+def test_version_changes_with_content_only():
+    """
+    Test that the snapshot version only increments when the document changes, and that the
+    listeners are called for changes but not for the first read.
+    """
+    sync = ParameterSync(sync_settings())
+    changes = []
+    sync.add_listener(lambda previous, current: changes.append((previous.version, current.version)))
+
+    assert sync.apply({"n_estimators": 10}, "read")
+    assert not sync.apply({"n_estimators": 10}, "poll")
+    assert sync.apply({"n_estimators": 20}, "write")
+
+    snapshot = sync.snapshot()
+    assert snapshot.version == 2
+    assert snapshot.data == {"n_estimators": 20}
+    assert snapshot.source == "write"
+    assert changes == [(1, 2)]
+
+    snapshot.data["n_estimators"] = 30
+    assert sync.snapshot().data == {"n_estimators": 20}
+
+
+def test_listener_mode_uses_on_snapshot():
+    """
+    Test that the listener mode subscribes to the document and applies pushed snapshots.
+    """
+    callbacks, watch = [], MagicMock()
+
+    def on_snapshot(callback):
+        callbacks.append(callback)
+        return watch
+
+    client = client_with_document({"criterion": "gini"}, on_snapshot=on_snapshot)
+    sync = ParameterSync(sync_settings(), client_factory=lambda: client)
+
+    sync.start()
+    assert sync.mode == "listener"
+    document = MagicMock(exists=True, **{"to_dict.return_value": {"criterion": "entropy"}})
+    callbacks[0]([document], [], None)
+
+    assert sync.wait_until_ready(1)
+    assert sync.snapshot().data == {"criterion": "entropy"}
+    assert sync.snapshot().source == "listener"
+    sync.stop()
+    watch.unsubscribe.assert_called_once()
+    assert sync.mode == "off"
+
+
+def test_poll_fallback_without_listeners():
+    """
+    Test that a client without snapshot listeners is polled instead.
+    """
+    client = client_with_document({"max_depth": 3})
+    sync = ParameterSync(sync_settings(poll_interval_seconds=0.01), client_factory=lambda: client)
+
+    sync.start()
+    try:
+        assert sync.mode == "poll"
+        assert sync.wait_until_ready(2)
+        assert sync.snapshot().data == {"max_depth": 3}
+        assert sync.snapshot().source == "poll"
+    finally:
+        sync.stop()
+
+
+def test_poll_backs_off_on_errors():
+    """
+    Test that failing reads are retried with growing delays instead of every interval.
+    """
+    client = MagicMock()
+    client.collection.return_value.document.return_value.get.side_effect = RuntimeError("unavailable")
+    sync = ParameterSync(sync_settings(mode="poll", poll_interval_seconds=0.05, max_backoff_seconds=10),
+                         client_factory=lambda: client)
+
+    sync.start()
+    time.sleep(0.5)
+    sync.stop()
+
+    # Without backoff, about 10 reads; with it, 0.1 + 0.2 + 0.4 seconds of waits at most.
+    assert 1 <= client.collection.return_value.document.return_value.get.call_count <= 4
+    assert not sync.wait_until_ready(0)
+
+
+def test_debounced_trigger_runs_once_per_burst():
+    """
+    Test that a burst of changes runs the action once, after the burst.
+    """
+    ran = threading.Event()
+    trigger = DebouncedTrigger(0.1, ran.set)
+
+    for _ in range(20):
+        trigger.schedule()
+    assert not ran.is_set()
+
+    assert ran.wait(2)
+    time.sleep(0.2)
+    assert trigger.runs == 1
+
+
+def test_debounced_trigger_reruns_after_change_during_run():
+    """
+    Test that a change during a run schedules exactly one more run.
+    """
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def action():
+        calls.append(1)
+        started.set()
+        release.wait(2)
+
+    trigger = DebouncedTrigger(0.01, action)
+    trigger.schedule()
+    assert started.wait(2)
+    trigger.schedule()
+    trigger.schedule()
+    release.set()
+
+    deadline = time.monotonic() + 2
+    while trigger.runs < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.1)
+    assert len(calls) == 2
+
+
+def test_merge_model_parameters_keeps_forest_parameters():
+    """
+    Test that the Firestore parameters override the file ones, other keys being ignored.
+    """
+    merged = merge_model_parameters({"n_estimators": 100, "max_depth": None},
+                                    {"n_estimators": 50, "n_samples": 20})
+
+    assert merged["n_estimators"] == 50
+    assert "n_samples" not in merged
+    assert merge_model_parameters({"n_estimators": 100}, {"n_estimators": "many"}) == {}
+
+
+def test_stale_poll_does_not_undo_write():
+    """
+    Test that a poll started before a write and applied after it is ignored.
+    """
+    sync = ParameterSync(sync_settings())
+    changes = []
+    sync.add_listener(lambda previous, current: changes.append(current.data))
+    sync.apply({"n_estimators": 10}, "read")
+
+    poll_started = time.monotonic()
+    sync.apply({"n_estimators": 20}, "write")
+    assert not sync.apply({"n_estimators": 10}, "poll", poll_started)
+
+    assert sync.snapshot().data == {"n_estimators": 20}
+    assert sync.snapshot().version == 2
+    assert changes == [{"n_estimators": 20}]
+    assert sync.apply({"n_estimators": 20}, "poll", time.monotonic()) is False
+    assert sync.snapshot().version == 2
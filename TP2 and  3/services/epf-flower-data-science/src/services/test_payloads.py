@@ -0,0 +1,89 @@
+import io, json
+import numpy as np
+import pandas as pd
+import pytest
+import payloads
+from payloads import decode_features, encode_array, encode_dataframe, negotiate, UnsupportedFormat
+
+
+FEATURES = np.array([[5.1, 3.5, 1.4, 0.2], [6.7, 3.0, 5.2, 2.3]])
+
+
+def test_negotiate():
+    """
+    Test the choice of the response format from the Accept header.
+    """
+    supported = [payloads.JSON, payloads.NPY]
+
+    assert negotiate(None, supported) == payloads.JSON
+    assert negotiate("*/*", supported) == payloads.JSON
+    assert negotiate("application/x-npy", supported) == payloads.NPY
+    assert negotiate("application/json;q=0.5, application/x-npy", supported) == payloads.NPY
+    with pytest.raises(UnsupportedFormat):
+        negotiate("text/csv", supported)
+
+
+def test_decode_json_single_row():
+    """
+    Test that a flat JSON list is read as one row.
+    """
+    matrix = decode_features(json.dumps({"features": [5.1, 3.5, 1.4, 0.2]}).encode(), "application/json")
+
+    assert matrix.shape == (1, 4)
+
+
+def test_npy_round_trip():
+    """
+    Test that a NPY matrix is read as sent, and that string predictions are written as NPY.
+    """
+    buffer = io.BytesIO()
+    np.save(buffer, FEATURES)
+
+    np.testing.assert_array_equal(decode_features(buffer.getvalue(), payloads.NPY), FEATURES)
+    predictions = np.array(["Iris-setosa", "Iris-virginica"], dtype=object)
+    assert np.load(io.BytesIO(encode_array(predictions, payloads.NPY))).tolist() == predictions.tolist()
+
+
+@pytest.mark.skipif(payloads.msgpack is None, reason="msgpack is not installed")
+def test_msgpack_round_trip():
+    """
+    Test that a MessagePack raw buffer is read without going through lists.
+    """
+    body = encode_array(FEATURES, payloads.MSGPACK)
+
+    np.testing.assert_array_equal(decode_features(body, "application/msgpack"), FEATURES)
+
+
+@pytest.mark.skipif(payloads.pa is None, reason="pyarrow is not installed")
+def test_arrow_dataframe_round_trip():
+    """
+    Test that a dataset is written as an Arrow stream and features are read from one.
+    """
+    dataset = pd.DataFrame(FEATURES, columns=["a", "b", "c", "d"])
+    body = encode_dataframe(dataset, payloads.ARROW)
+
+    np.testing.assert_array_equal(decode_features(body, payloads.ARROW), FEATURES)
+
+
+def test_decode_rejects_pickles():
+    """
+    Test that NPY payloads containing Python objects are refused.
+    """
+    buffer = io.BytesIO()
+    np.save(buffer, np.array([{"a": 1}], dtype=object), allow_pickle=True)
+
+    with pytest.raises(ValueError):
+        decode_features(buffer.getvalue(), payloads.NPY)
+
+
+def test_estimate_encoded_bytes():
+    """
+    Test that rendering a dataset as JSON records is estimated above its columnar formats.
+    """
+    dataset = pd.DataFrame({"x": np.arange(1000, dtype=np.float64), "label": ["alpha"] * 1000})
+
+    json_bytes = payloads.estimate_encoded_bytes(dataset, payloads.JSON)
+
+    assert json_bytes >= 128 * dataset.size
+    assert payloads.estimate_encoded_bytes(dataset, payloads.MSGPACK) < json_bytes
+    assert payloads.estimate_encoded_bytes(dataset, payloads.ARROW) < json_bytes
@@ -0,0 +1,76 @@
+import os
+import pytest
+from profiling import ProfilingSettings, ProfilingMiddleware, ProfileSession, _current_session, profiled, list_profiles, read_profile_report
+
+
+def test_settings_disabled_without_token_or_rates():
+    """
+    Test that profiling is off when nothing is configured.
+    """
+    settings = ProfilingSettings(token=None, sample_rates={"/PST": 0})
+
+    assert not settings.enabled
+    assert settings.sample_rates == {}
+
+
+def test_sampling_one_in_n():
+    """
+    Test that 1 request out of N is picked for a sampled route, and none for the others.
+    """
+    middleware = ProfilingMiddleware(app=None, settings=ProfilingSettings(sample_rates={"/PST": 3}))
+
+    picked = [middleware._is_sampled("/PST") for _ in range(9)]
+
+    assert picked.count(True) == 3
+    assert not middleware._is_sampled("/Predict")
+
+
+def test_admin_token_in_header_or_query():
+    """
+    Test that the admin token is accepted from the header and the query string only.
+    """
+    middleware = ProfilingMiddleware(app=None, settings=ProfilingSettings(token="secret"))
+
+    assert middleware._is_admin_request({"headers": [(b"x-profile-token", b"secret")]})
+    assert middleware._is_admin_request({"headers": [], "query_string": b"profile_token=secret"})
+    assert not middleware._is_admin_request({"headers": [(b"x-profile-token", b"wrong")]})
+
+
+def test_profiled_without_session():
+    """
+    Test that a decorated function is called directly when no profile is requested.
+    """
+    @profiled
+    def endpoint(value):
+        return value * 2
+
+    assert endpoint(21) == 42
+
+
+def test_profiled_with_session(tmp_path):
+    """
+    Test that a decorated function writes a pstats file when a profile session is active.
+    """
+    settings = ProfilingSettings(token="secret", output_dir=str(tmp_path))
+    session = ProfileSession("/PST", settings)
+
+    @profiled
+    def endpoint():
+        return sum(range(1000))
+
+    token = _current_session.set(session)
+    try:
+        assert endpoint() == 499500
+    finally:
+        _current_session.reset(token)
+
+    assert list_profiles(str(tmp_path)) == [session.profile_id]
+    assert "endpoint" in read_profile_report(str(tmp_path), session.profile_id)
+
+
+def test_read_missing_profile(tmp_path):
+    """
+    Test that reading an unknown profile raises FileNotFoundError.
+    """
+    with pytest.raises(FileNotFoundError):
+        read_profile_report(str(tmp_path), "missing")
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+import pytest
+from stats import compute_statistics, conform_rows, update_statistics, read_statistics, write_statistics
+
+
+@pytest.fixture
+def dataset():
+    return pd.DataFrame({
+        "length": [1.0, 2.0, np.nan, 4.0],
+        "species": ["setosa", "setosa", "virginica", None],
+    })
+
+
+def test_compute_statistics(dataset):
+    """
+    Test the statistics of a numeric and a categorical column.
+    """
+    stats = compute_statistics(dataset)
+
+    length = stats["columns"]["length"]
+    assert stats["rows"] == 4
+    assert (length["count"], length["nulls"], length["min"], length["max"]) == (3, 1, 1.0, 4.0)
+    assert length["mean"] == pytest.approx(7 / 3)
+    assert sum(length["histogram"]["counts"]) == 3
+    assert stats["columns"]["species"]["frequencies"] == {"setosa": 2, "virginica": 1}
+    assert stats["columns"]["species"]["nulls"] == 1
+
+
+def test_update_statistics_matches_full_computation(dataset):
+    """
+    Test that appending rows gives the same exact statistics as recomputing them on all the rows.
+    """
+    new_rows = pd.DataFrame({"length": [10.0, -3.0], "species": ["versicolor", "setosa"]})
+
+    updated = update_statistics(compute_statistics(dataset), new_rows)
+    expected = compute_statistics(pd.concat([dataset, new_rows], ignore_index=True))
+
+    for key in ["count", "nulls", "min", "max", "mean", "std"]:
+        assert updated["columns"]["length"][key] == pytest.approx(expected["columns"]["length"][key])
+    assert sum(updated["columns"]["length"]["histogram"]["counts"]) == 5
+    assert updated["columns"]["species"]["frequencies"] == expected["columns"]["species"]["frequencies"]
+    assert updated["rows"] == 6
+    assert updated["version"] == 2
+
+
+def test_write_and_read_statistics(tmp_path, dataset):
+    """
+    Test that the sidecar is written next to the dataset and read back.
+    """
+    stats = compute_statistics(dataset)
+
+    assert read_statistics(tmp_path) is None
+    write_statistics(stats, tmp_path)
+    assert read_statistics(tmp_path) == stats
+
+
+def test_conform_rows_keeps_column_kinds(dataset):
+    """
+    Test that a partial row and a null value keep the kinds recorded in the statistics.
+    """
+    stats = compute_statistics(dataset)
+    new_rows = conform_rows(stats, [{"length": 5.0}, {"length": None, "species": "setosa"}], ["length", "species"])
+
+    updated = update_statistics(stats, new_rows)
+
+    assert updated["columns"]["length"]["kind"] == "numeric"
+    assert updated["columns"]["length"]["nulls"] == 2
+    assert updated["columns"]["species"]["kind"] == "categorical"
+    assert updated["columns"]["species"]["nulls"] == 2
+    assert updated["columns"]["species"]["frequencies"]["setosa"] == 3
+
+
+def test_conform_rows_rejects_non_numeric(dataset):
+    """
+    Test that a value that is not a number is refused for a numeric column.
+    """
+    with pytest.raises(ValueError):
+        conform_rows(compute_statistics(dataset), [{"length": "long", "species": "setosa"}], ["length", "species"])
+
+
+def test_concurrent_writes_use_their_own_temporary_file(tmp_path, dataset, monkeypatch):
+    """
+    Test that every write goes through a distinct temporary file that does not remain.
+    """
+    import stats as stats_module
+
+    replaced = []
+    replace = stats_module.os.replace
+    monkeypatch.setattr(stats_module.os, "replace", lambda source, target: (replaced.append(source), replace(source, target)))
+
+    write_statistics(compute_statistics(dataset), tmp_path)
+    write_statistics(compute_statistics(dataset), tmp_path)
+
+    assert len(set(replaced)) == 2
+    assert [path.name for path in tmp_path.iterdir()] == ["stats.json"]
+
+
+def test_std_of_large_values_after_appends():
+    """
+    Test that the standard deviation of values with a large mean stays exact when computed
+    and merged batch by batch.
+    """
+    generator = np.random.default_rng(0)
+    values = 1e8 + generator.normal(size=3000)
+    batches = [pd.DataFrame({"x": batch}) for batch in np.array_split(values, 3)]
+
+    stats = compute_statistics(batches[0])
+    for batch in batches[1:]:
+        stats = update_statistics(stats, batch)
+
+    assert compute_statistics(pd.DataFrame({"x": values}))["columns"]["x"]["std"] == pytest.approx(values.std(), rel=1e-6)
+    assert stats["columns"]["x"]["std"] == pytest.approx(values.std(), rel=1e-6)
+    assert stats["columns"]["x"]["mean"] == pytest.approx(values.mean(), rel=1e-12)
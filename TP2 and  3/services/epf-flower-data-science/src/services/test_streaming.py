@@ -0,0 +1,62 @@
+import asyncio
+from streaming import _next_batch, _is_feature_row, _END_OF_STREAM, clamp_stream_parameters, load_streaming_settings
+
+
+def run_batch(items, max_batch_size, max_wait, maxsize=0):
+    async def scenario():
+        queue = asyncio.Queue(maxsize=maxsize)
+        for item in items:
+            queue.put_nowait(item)
+        return await _next_batch(queue, max_batch_size, max_wait)
+    return asyncio.run(scenario())
+
+
+def test_batch_limited_by_size():
+    """
+    Test that a batch stops at max_batch_size rows.
+    """
+    batch, finished = run_batch([(i, [0.0]) for i in range(10)], max_batch_size=4, max_wait=1)
+
+    assert [row_id for row_id, _ in batch] == [0, 1, 2, 3]
+    assert not finished
+
+
+def test_batch_limited_by_time():
+    """
+    Test that a batch is closed after max_wait when no more rows arrive.
+    """
+    batch, finished = run_batch([(0, [0.0])], max_batch_size=100, max_wait=0.01)
+
+    assert len(batch) == 1
+    assert not finished
+
+
+def test_batch_end_of_stream():
+    """
+    Test that the rows received before the end of the stream are still predicted.
+    """
+    batch, finished = run_batch([(0, [0.0]), (1, [0.0]), _END_OF_STREAM], max_batch_size=100, max_wait=1)
+
+    assert len(batch) == 2
+    assert finished
+
+
+def test_is_feature_row():
+    """
+    Test the validation of the rows sent by the client.
+    """
+    assert _is_feature_row([1, 2.5], 2)
+    assert not _is_feature_row([1], 2)
+    assert not _is_feature_row([1, "2"], 2)
+    assert not _is_feature_row([True, 2], 2)
+
+
+def test_clamp_stream_parameters():
+    """
+    Test that the parameters asked by a client are bounded by the configured limits.
+    """
+    settings = load_streaming_settings(config_file_path="missing.json")
+
+    assert clamp_stream_parameters(settings, 10**9, 10**9, 10**9) == settings["limits"]
+    assert clamp_stream_parameters(settings, 0, -5, 0) == {"max_batch_size": 1, "max_wait_ms": 0.0, "max_pending": 1}
+    assert clamp_stream_parameters(settings, 8, float("nan"), 16)["max_wait_ms"] == 5.0
@@ -0,0 +1,78 @@
+import pytest
+from fastapi.testclient import TestClient
+
+
+class TestAppendRoute:
+    @pytest.fixture
+    def client(self) -> TestClient:
+        """
+        Test client for integration tests
+        """
+
+        from main import get_application
+
+        app = get_application()
+
+        client = TestClient(app, base_url="http://testserver")
+
+        return client
+
+    @pytest.fixture
+    def dataset_dir(self, monkeypatch, tmp_path):
+        import src.api.routes.data as data
+
+        (tmp_path / "Iris.csv").write_text("Id,Length,Species\n1,5.1,setosa\n2,6.7,virginica\n")
+        monkeypatch.setattr(data, "load_config", lambda path: {"iris": {"url": "https://www.kaggle.com/datasets/local/iris"}})
+        monkeypatch.setattr(data, "dataset_directory", lambda url: tmp_path)
+        return tmp_path
+
+    def test_append_partial_row_and_null(self, client, dataset_dir):
+        partial = client.post("/Append?dataset_name=iris", json={"rows": [{"Id": 3, "Length": 4.9}]})
+        response = client.post("/Append?dataset_name=iris", json={"rows": [{"Id": 4, "Length": None, "Species": "setosa"}]})
+        stats = client.get("/Stats?dataset_name=iris").json()["stats"]
+
+        assert (partial.status_code, response.status_code) == (200, 200)
+        assert response.json()["rows"] == 4
+        assert (dataset_dir / "Iris.csv").read_text().splitlines()[-2:] == ["3,4.9,", "4,,setosa"]
+        assert stats["columns"]["Species"]["kind"] == "categorical"
+        assert stats["columns"]["Length"]["nulls"] == 1
+
+    def test_rejected_rows_leave_dataset_unchanged(self, client, dataset_dir):
+        client.post("/Append?dataset_name=iris", json={"rows": [{"Id": 3, "Length": 4.9, "Species": "setosa"}]})
+        csv_before = (dataset_dir / "Iris.csv").read_text()
+        stats_before = (dataset_dir / "stats.json").read_text()
+
+        response = client.post("/Append?dataset_name=iris", json={"rows": [{"Id": 5, "Length": "long"}]})
+
+        assert response.status_code == 400
+        assert (dataset_dir / "Iris.csv").read_text() == csv_before
+        assert (dataset_dir / "stats.json").read_text() == stats_before
+
+    def test_reload_keeps_appended_rows(self, client, monkeypatch, tmp_path):
+        import src.api.routes.data as data
+        import src.services.load as load
+
+        class KaggleApi:
+            def authenticate(self):
+                pass
+
+            def dataset_download_files(self, dataset, path=".", unzip=False):
+                with open(f"{path}/Iris.csv", "w") as file:
+                    file.write("Id,Length,Species\n1,5.1,setosa\n2,6.7,virginica\n")
+
+        monkeypatch.setattr(load, "KaggleApi", KaggleApi)
+        monkeypatch.setattr(load, "DATA_DIR", str(tmp_path))
+        monkeypatch.setattr(data, "download_settings", {"max_age_seconds": 0})
+        monkeypatch.setattr(data, "load_config", lambda path: {"iris": {"url": "https://www.kaggle.com/datasets/local/iris"}})
+
+        first = client.get("/Load?dataset_name=iris")
+        client.post("/Append?dataset_name=iris", json={"rows": [{"Id": 3, "Length": 4.9, "Species": "setosa"}]})
+        reloaded = client.get("/Load?dataset_name=iris", headers={"If-None-Match": first.headers["etag"]})
+        stats = client.get("/Stats?dataset_name=iris").json()["stats"]
+
+        assert reloaded.status_code == 200
+        assert [row["Id"] for row in reloaded.json()["data"]] == [1, 2, 3]
+        assert stats["rows"] == 3
+
+        (tmp_path / "iris" / "Iris.csv").write_text("Id,Length,Species\n1,5.1,setosa\n")
+        assert client.get("/Stats?dataset_name=iris").json()["stats"]["rows"] == 1
@@ -0,0 +1,49 @@
+import pytest
+from fastapi.testclient import TestClient
+
+
+class TestConditionalGetRoutes:
+    @pytest.fixture
+    def client(self) -> TestClient:
+        """
+        Test client for integration tests
+        """
+
+        from main import get_application
+
+        app = get_application()
+
+        client = TestClient(app, base_url="http://testserver")
+
+        return client
+
+    def test_list_not_modified(self, client):
+        response = client.get("/List")
+        etag = response.headers["etag"]
+
+        repeated = client.get("/List", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert repeated.status_code == 304
+        assert repeated.content == b""
+        assert client.get("/Info?dataset_name=iris", headers={"If-None-Match": etag}).status_code == 200
+
+    def test_load_compressed_and_not_modified(self, client, monkeypatch, tmp_path):
+        import src.api.routes.data as data
+
+        csv_file = tmp_path / "Iris.csv"
+        csv_file.write_text("a,b\n" + "".join(f"{i},{i * 2}\n" for i in range(500)))
+        monkeypatch.setattr(data, "download_kaggle_files", lambda url, max_age_seconds=0: csv_file)
+
+        response = client.get("/Load?dataset_name=iris", headers={"Accept-Encoding": "gzip"})
+        repeated = client.get("/Load?dataset_name=iris", headers={"If-None-Match": response.headers["etag"]})
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.json()["data"]) == 500
+        assert repeated.status_code == 304
+
+        csv_file.write_text("a,b\n1,2\n")
+        changed = client.get("/Load?dataset_name=iris", headers={"If-None-Match": response.headers["etag"]})
+        assert changed.status_code == 200
+        assert changed.json()["data"] == [{"a": 1, "b": 2}]
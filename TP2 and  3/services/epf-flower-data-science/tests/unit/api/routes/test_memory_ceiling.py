@@ -0,0 +1,32 @@
+import pytest
+from fastapi.testclient import TestClient
+
+
+class TestMemoryCeilingRoutes:
+    @pytest.fixture
+    def client(self) -> TestClient:
+        """
+        Test client for integration tests
+        """
+
+        from main import get_application
+
+        app = get_application()
+
+        client = TestClient(app, base_url="http://testserver")
+
+        return client
+
+    def test_load_refuses_render_over_ceiling(self, client, monkeypatch, tmp_path):
+        import src.api.routes.data as data
+
+        csv_file = tmp_path / "data.csv"
+        csv_file.write_text("a,b\n" + "".join(f"{i},{i * 2}\n" for i in range(20000)))
+        monkeypatch.setattr(data, "download_kaggle_files", lambda url, max_age_seconds=0: csv_file)
+        monkeypatch.setattr(data, "memory_settings", {"ceiling_bytes": None, "job_ceilings": {"load": 3_000_000},
+                                                      "tracemalloc_jobs": ["load"]})
+
+        response = client.get("/Load?url=https://www.kaggle.com/datasets/local/ceiling")
+
+        assert response.status_code == 507
+        assert "load/process" in response.json()["detail"]
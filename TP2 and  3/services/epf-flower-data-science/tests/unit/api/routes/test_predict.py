@@ -0,0 +1,43 @@
+import io
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+
+class TestPredictRoute:
+    @pytest.fixture
+    def client(self) -> TestClient:
+        """
+        Test client for integration tests
+        """
+
+        from main import get_application
+
+        app = get_application()
+
+        client = TestClient(app, base_url="http://testserver")
+
+        return client
+
+    def test_predict(self, client):
+        response = client.post("/Predict", json={"features": [5.1, 3.5, 1.4, 0.2]})
+
+        assert response.status_code == 200
+        assert response.json()["prediction"] == ["Iris-setosa"]
+
+    def test_predict_wrong_feature_width(self, client):
+        response = client.post("/Predict", json={"features": [5.1, 3.5]})
+
+        assert response.status_code == 422
+        assert "expects 4 features" in response.json()["detail"]
+
+    def test_predict_without_rows(self, client):
+        buffer = io.BytesIO()
+        np.save(buffer, np.empty((0, 4)))
+
+        empty_list = client.post("/Predict", json={"features": []})
+        empty_matrix = client.post("/Predict", content=buffer.getvalue(), headers={"Content-Type": "application/x-npy"})
+
+        assert empty_list.status_code == 422
+        assert empty_matrix.status_code == 422
+        assert "at least one row" in empty_matrix.json()["detail"]
@@ -0,0 +1,53 @@
+import pytest
+from fastapi.testclient import TestClient
+
+
+class TestPredictStreamRoute:
+    @pytest.fixture
+    def client(self) -> TestClient:
+        """
+        Test client for integration tests
+        """
+
+        from main import get_application
+
+        app = get_application()
+
+        client = TestClient(app, base_url="http://testserver")
+
+        return client
+
+    def test_predict_stream(self, client):
+        rows = {f"event-{i}": [5.1, 3.5, 1.4, 0.2] for i in range(5)}
+
+        with client.websocket_connect("/PredictStream?max_batch_size=2&max_wait_ms=50") as websocket:
+            for row_id, features in rows.items():
+                websocket.send_json({"id": row_id, "features": features})
+
+            results = []
+            while len(results) < len(rows):
+                message = websocket.receive_json()
+                assert len(message["results"]) <= 2
+                results += message["results"]
+
+        assert sorted(result["id"] for result in results) == sorted(rows)
+        assert all(result["prediction"] == "Iris-setosa" for result in results)
+
+    def test_predict_stream_invalid_row(self, client):
+        with client.websocket_connect("/PredictStream") as websocket:
+            websocket.send_json({"id": "bad", "features": [1.0]})
+
+            message = websocket.receive_json()
+
+        assert message["results"][0]["id"] == "bad"
+        assert "error" in message["results"][0]
+
+    def test_predict_stream_binary_frame(self, client):
+        with client.websocket_connect("/PredictStream") as websocket:
+            websocket.send_bytes(b"\x00\x01")
+            error = websocket.receive_json()
+            websocket.send_json({"id": "after", "features": [5.1, 3.5, 1.4, 0.2]})
+            prediction = websocket.receive_json()
+
+        assert "Binary frames" in error["results"][0]["error"]
+        assert prediction["results"] == [{"id": "after", "prediction": "Iris-setosa"}]
@@ -0,0 +1,50 @@
+import pytest
+from fastapi.testclient import TestClient
+
+
+class TestPSTRoute:
+    @pytest.fixture
+    def client(self) -> TestClient:
+        """
+        Test client for integration tests
+        """
+
+        from main import get_application
+
+        app = get_application()
+
+        client = TestClient(app, base_url="http://testserver")
+
+        return client
+
+    def test_pst_and_retrain_use_same_parameters(self, client, monkeypatch):
+        import src.api.routes.data as data
+        from src.services.parameter_sync import ParameterSync
+
+        trained = []
+        monkeypatch.setattr(data, "train_iris_model", lambda params: trained.append(params) or {"cache": "miss"})
+        sync = ParameterSync(data.sync_settings)
+        sync.apply({"n_estimators": 7, "n_samples": 20}, "read")
+        monkeypatch.setattr(data, "parameter_sync", sync)
+
+        response = client.post("/PST")
+        data.retrain_from_parameters()
+
+        assert response.status_code == 200
+        assert trained[0]["n_estimators"] == 7
+        assert "n_samples" not in trained[0]
+        assert trained[0] == trained[1]
+
+    def test_pst_unknown_label_is_unprocessable(self, client, monkeypatch):
+        import src.api.routes.data as data
+        from src.services.evaluation import UnknownLabels
+
+        def train_iris_model(params):
+            raise UnknownLabels(["Iris-unseen"])
+
+        monkeypatch.setattr(data, "train_iris_model", train_iris_model)
+
+        response = client.post("/PST")
+
+        assert response.status_code == 422
+        assert "Iris-unseen" in response.json()["detail"]